@@ -0,0 +1,16 @@
+"""
+Celery application for background work (image processing, periodic jobs).
+
+Workers are started with ``celery -A backend worker``. Without a broker
+configured, tasks run eagerly in the calling process (see settings).
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+app = Celery('backend')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
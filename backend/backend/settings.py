@@ -14,6 +14,7 @@ from datetime import timedelta
 from pathlib import Path
 import os 
 from dotenv import load_dotenv
+from celery.schedules import crontab
 load_dotenv()  # loads the configs from .env
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -58,6 +59,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Instrumentation goes first so it sees every query of the request
+    'pets.middleware.MetricsMiddleware',
+    'pets.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -68,8 +72,23 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request SQL query counts/DB time in a Server-Timing header and a log line
+SQL_INSTRUMENTATION_ENABLED = os.getenv('SQL_INSTRUMENTATION_ENABLED', 'False').lower() == 'true'
+SQL_INSTRUMENTATION_REPEAT_THRESHOLD = int(os.getenv('SQL_INSTRUMENTATION_REPEAT_THRESHOLD', 5))  # Identical statements per request flagged as a likely N+1
+
+# Prometheus metrics at /metrics; set PROMETHEUS_MULTIPROC_DIR to aggregate across worker processes
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+
+# /api/health/ and /api/ready/ answer from dependency checks run in the background every PROBE_INTERVAL seconds
+PROBE_INTERVAL = float(os.getenv('PROBE_INTERVAL', 10))
+PROBE_TIMEOUT = float(os.getenv('PROBE_TIMEOUT', 2))  # Seconds before a check counts as failed
+
 ROOT_URLCONF = 'backend.urls'
 
+# Mount the async variants of the read-heavy endpoints (lists, dashboard, probes).
+# Only worth it under ASGI (SERVER_MODE=asgi); under WSGI every async view costs an extra thread hop
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False').lower() == 'true'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -111,6 +130,95 @@ else:
     }
 
 
+# Cache
+# Redis when REDIS_URL is set (Docker/production), per-process memory for local development
+
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            },
+            'KEY_PREFIX': 'milkandbutter',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# How long a cached dashboard overview lives (seconds); writes invalidate it sooner
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', 300))
+
+
+# Celery
+# Tasks run eagerly in-process unless a broker is configured (local development, tests)
+
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', '')
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', str(not CELERY_BROKER_URL)).lower() == 'true'
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_TASK_IGNORE_RESULT = True
+
+# Periodic jobs, run by `celery -A backend beat`
+CELERY_BEAT_SCHEDULE = {
+    'send-vaccination-reminders': {
+        'task': 'pets.tasks.send_vaccination_reminders',
+        'schedule': crontab(hour=int(os.getenv('VACCINATION_REMINDER_HOUR', 8)), minute=0),
+    },
+    'detect-health-anomalies': {
+        'task': 'pets.tasks.detect_health_anomalies',
+        'schedule': crontab(minute=int(os.getenv('HEALTH_ALERT_MINUTE', 15))),  # Hourly
+    },
+    'compact-health-data': {
+        'task': 'pets.tasks.compact_health_data',
+        'schedule': crontab(hour=int(os.getenv('HEALTH_COMPACTION_HOUR', 3)), minute=30),
+    },
+    'manage-health-partitions': {
+        'task': 'pets.tasks.manage_health_partitions',
+        'schedule': crontab(hour=int(os.getenv('HEALTH_PARTITION_HOUR', 2)), minute=45),
+    },
+}
+
+# Retention: readings older than HEALTH_RETENTION_MONTHS are compacted into daily aggregates (0 keeps them all raw)
+HEALTH_RETENTION_MONTHS = int(os.getenv('HEALTH_RETENTION_MONTHS', 24))
+HEALTH_COMPACTION_BATCH_SIZE = int(os.getenv('HEALTH_COMPACTION_BATCH_SIZE', 5000))  # Readings read and compacted per transaction
+
+# Monthly partitions of the readings table (PostgreSQL only): created this many months ahead, and
+# dropped whole, readings and all, once older than HEALTH_PARTITION_RETENTION_MONTHS (0 keeps them all)
+HEALTH_PARTITION_MONTHS_AHEAD = int(os.getenv('HEALTH_PARTITION_MONTHS_AHEAD', 3))
+HEALTH_PARTITION_RETENTION_MONTHS = int(os.getenv('HEALTH_PARTITION_RETENTION_MONTHS', 0))
+
+# Health alerts: readings compared with the HEALTH_ALERT_WINDOW readings of the same series before them (and after, for change points)
+HEALTH_ALERT_WINDOW = int(os.getenv('HEALTH_ALERT_WINDOW', 14))
+HEALTH_ALERT_MIN_HISTORY = int(os.getenv('HEALTH_ALERT_MIN_HISTORY', 7))  # Readings needed before a z-score counts
+HEALTH_ALERT_ZSCORE = float(os.getenv('HEALTH_ALERT_ZSCORE', 3.0))  # |z| flagged as an outlier
+HEALTH_ALERT_SHIFT = float(os.getenv('HEALTH_ALERT_SHIFT', 2.0))  # Level shift (in pooled standard deviations) flagged as a change point
+HEALTH_ALERT_MIN_CHANGE = float(os.getenv('HEALTH_ALERT_MIN_CHANGE', 0.05))  # Smallest change flagged, relative to the baseline
+HEALTH_ALERT_PET_BATCH_SIZE = int(os.getenv('HEALTH_ALERT_PET_BATCH_SIZE', 200))  # Pets loaded and scanned per query
+
+# Vaccination reminders: one email per owner listing the vaccinations due soon or recently missed
+VACCINATION_REMINDER_DAYS = int(os.getenv('VACCINATION_REMINDER_DAYS', 7))  # Days ahead; also the default window of /api/vaccination/upcoming/
+VACCINATION_REMINDER_OVERDUE_DAYS = int(os.getenv('VACCINATION_REMINDER_OVERDUE_DAYS', 30))  # Older missed vaccinations get no reminder
+VACCINATION_REMINDER_BATCH_SIZE = int(os.getenv('VACCINATION_REMINDER_BATCH_SIZE', 100))  # Emails sent per batch over one SMTP connection
+
+# Outgoing email (e.g. EMAIL_PORT=1025 for a local SMTP stand-in)
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'False').lower() == 'true'
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'Milk and Butter <no-reply@localhost>')
+
+# Longest-edge sizes of the thumbnails generated for avatars and tag proofs
+IMAGE_THUMBNAIL_SIZES = [64, 256, 512]
+IMAGE_MAX_DIMENSION = 2048  # Uploaded images are re-encoded no larger than this
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -152,6 +260,28 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Protected media (avatars, tag proofs) is checked by Django and then sent by
+# nginx via X-Accel-Redirect from this internal location when enabled
+MEDIA_ACCEL_REDIRECT = os.getenv('MEDIA_ACCEL_REDIRECT', 'False').lower() == 'true'
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_CACHE_MAX_AGE = int(os.getenv('MEDIA_CACHE_MAX_AGE', 300))  # Seconds clients may reuse media before revalidating
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'pets': {
+            'handlers': ['console'],
+            'level': os.getenv('PETS_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -160,7 +290,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'pets.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
@@ -174,6 +304,13 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
 }
 
+# request.user for JWT requests comes from a cache instead of an auth_user query
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60))  # Seconds, shared cache (Redis)
+AUTH_USER_LOCAL_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_LOCAL_CACHE_TIMEOUT', 5))  # Seconds, per process; not invalidated across processes
+AUTH_USER_LOCAL_CACHE_SIZE = 1024
+# Build request.user from the token claims alone, never querying auth_user
+JWT_USER_FROM_CLAIMS = os.getenv('JWT_USER_FROM_CLAIMS', 'False').lower() == 'true'
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [ 'https://milkandbutter.tannedcung.com' ]
 
@@ -209,6 +346,9 @@ LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 
 # Google OAuth settings
+GOOGLE_OAUTH_CLIENT_ID = os.getenv('GOOGLE_OAUTH_CLIENT_ID', '150416007830-pr16pii17ta44b6netma2qah4fp8rt1q.apps.googleusercontent.com')
+# Where GoogleLogin gets the ID-token signing certificates from (a class with get_certificates())
+GOOGLE_CERTIFICATE_SOURCE = 'pets.google_auth.HTTPCertificateSource'
 SOCIALACCOUNT_PROVIDERS = {
     'google': {
         'SCOPE' : [
@@ -4,6 +4,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from pets.views.health import metrics
 
 
 urlpatterns = [
@@ -17,6 +18,7 @@ urlpatterns = [
     path('accounts/', include('allauth.urls')),
     path('auth/', include('dj_rest_auth.urls')),
     path('auth/registration/', include('dj_rest_auth.registration.urls')),
+    path('metrics', metrics, name='metrics'),  # Prometheus scrape target
 ]
 
 # Serve media files during development
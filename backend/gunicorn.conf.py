@@ -0,0 +1,27 @@
+"""
+gunicorn settings, picked up automatically when gunicorn is started from the
+backend directory (e.g. `gunicorn backend.wsgi:application`).
+"""
+import os
+import shutil
+import tempfile
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', 3))
+
+# Workers write their Prometheus samples here so /metrics can add them up.
+# It must be set before prometheus_client is imported by any process.
+prometheus_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'milkandbutter-prometheus')
+)
+
+
+def on_starting(server):
+    # Samples of a previous run would otherwise be added to this one's
+    shutil.rmtree(prometheus_dir, ignore_errors=True)
+    os.makedirs(prometheus_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,7 +1,8 @@
 from django.contrib import admin
-from .models import Owner, Pet, HealthStatus
+from .models import Owner, Pet, HealthStatus, HealthAlert
 
 # Make sure to register the Owner model
 admin.site.register(Owner)
 admin.site.register(Pet)
 admin.site.register(HealthStatus)
+admin.site.register(HealthAlert)
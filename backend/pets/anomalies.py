@@ -0,0 +1,267 @@
+import logging
+import numpy as np
+from django.conf import settings
+from django.db.models import BooleanField, Case, DateTimeField, ExpressionWrapper, F, Max, Min, Q, Value, When, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+from .models import HealthAlert, HealthAlertScan, HealthStatus, Pet
+
+logger = logging.getLogger(__name__)
+
+
+def load_series(pet_ids, since_reading_id=None):
+    """
+    The numeric readings of the pets in one query, as arrays sorted by
+    (pet, attribute, measured_at), plus the offset where each series starts.
+    `weights` holds the readings each row stands for: 1, or the sample_count
+    of a compacted daily aggregate.
+
+    With since_reading_id, only what readings newer than it can change is
+    loaded: each series from the pet's earliest new reading on, plus the
+    history_size() readings before it. The oldest readings of a cut series
+    lack the history their scores need, so `history` marks them as context
+    only. Returns None when there is nothing to scan.
+    """
+    readings = HealthStatus.objects.filter(pet_id__in=pet_ids, value__isnull=False)
+    first_new = {}
+    if since_reading_id is not None:
+        first_new = dict(
+            readings.filter(id__gt=since_reading_id).order_by().values('pet_id')
+            .annotate(first_new=Min('measured_at')).values_list('pet_id', 'first_new')
+        )
+        if not first_new:
+            return None
+        bound = Case(*(When(pet_id=pet_id, then=Value(measured_at)) for pet_id, measured_at in first_new.items()), output_field=DateTimeField())
+        before = ExpressionWrapper(Q(measured_at__lt=bound), output_field=BooleanField())
+        readings = readings.filter(pet_id__in=first_new).annotate(
+            position=Window(
+                RowNumber(), partition_by=[F('pet_id'), F('attribute_name'), before], order_by=[F('measured_at').desc(), F('id').desc()]
+            ),
+        ).filter(Q(measured_at__gte=bound) | Q(position__lte=history_size()))
+    rows = list(
+        readings.order_by('pet_id', 'attribute_name', 'measured_at', 'id')
+        .values_list('id', 'pet_id', 'attribute_name', 'measured_at', 'value', 'sample_count')
+    )
+    if not rows:
+        return None
+    reading_ids, pets, attributes, measured_at, values, weights = (np.asarray(column, dtype=object) for column in zip(*rows))
+    pets = pets.astype(np.int64)
+    starts = np.flatnonzero(np.concatenate(([True], (pets[1:] != pets[:-1]) | (attributes[1:] != attributes[:-1]))))
+
+    history = np.zeros(len(rows), dtype=bool)
+    if first_new:
+        # A series with history_size() readings before the new ones may have been cut short
+        before = np.array([measured < first_new[pet] for pet, measured in zip(pets, measured_at)])
+        series_start, _ = series_offsets(starts, len(rows))
+        cut = np.repeat(np.add.reduceat(before.astype(np.int64), starts) == history_size(), np.diff(np.append(starts, len(rows))))
+        history = cut & (np.arange(len(rows)) - series_start <= settings.HEALTH_ALERT_WINDOW)
+
+    return {
+        'reading_ids': reading_ids.astype(np.int64),
+        'pets': pets,
+        'attributes': attributes,
+        'measured_at': measured_at,
+        'values': values.astype(np.float64),
+        'weights': weights.astype(np.float64),
+        'history': history,
+        'starts': starts,
+    }
+
+
+def history_size():
+    """
+    Readings before a series' first new one that its scores can depend on:
+    a change point's window reaches HEALTH_ALERT_WINDOW readings back, its
+    windows another HEALTH_ALERT_WINDOW, and telling it is a peak needs the
+    score of the reading before; plus one to see whether a series was cut.
+    """
+    return 2 * settings.HEALTH_ALERT_WINDOW + 2
+
+
+def series_offsets(starts, length):
+    """For every element, the index where its series starts and where it ends (exclusive)."""
+    sizes = np.diff(np.append(starts, length))
+    return np.repeat(starts, sizes), np.repeat(starts + sizes, sizes)
+
+
+# Readings whose windows are gathered at a time, bounding the (rows x window) scratch arrays
+CHUNK_SIZE = 65536
+
+
+def window_stats(values, weights, lo, hi, width):
+    """
+    Count, mean and standard deviation of values[lo:hi], weighted by
+    weights[lo:hi], for every pair of bounds at once (hi - lo <= width).
+    The windows are gathered into a (rows x width) array, chunk by chunk,
+    and reduced two-pass, so long series don't lose precision the way
+    running sums would. A spread within rounding error of the mean counts
+    as none.
+    """
+    count = np.zeros(len(lo))
+    mean = np.full(len(lo), np.nan)
+    std = np.full(len(lo), np.nan)
+    offsets = np.arange(width)
+    for chunk in range(0, len(lo), CHUNK_SIZE):
+        part = slice(chunk, chunk + CHUNK_SIZE)
+        index = np.minimum(lo[part, None] + offsets, len(values) - 1)
+        window = values[index]
+        window_weights = np.where(lo[part, None] + offsets < hi[part, None], weights[index], 0.0)
+        part_count = window_weights.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            part_mean = (window_weights * window).sum(axis=1) / part_count
+            part_std = np.sqrt((window_weights * (window - part_mean[:, None]) ** 2).sum(axis=1) / part_count)
+        part_std[part_std <= 1e-9 * np.abs(part_mean)] = 0.0
+        count[part], mean[part], std[part] = part_count, part_mean, part_std
+    return count, mean, std
+
+
+def rolling_zscores(values, weights, starts, window, min_history):
+    """
+    z-score of every reading against the (up to) `window` readings before it
+    in the same series, for all series at once. Returns (baseline, z) with z
+    NaN where there is too little history or no spread.
+    """
+    series_start, _ = series_offsets(starts, len(values))
+    index = np.arange(len(values))
+    lo = np.maximum(series_start, index - window)
+    count, mean, std = window_stats(values, weights, lo, index, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (values - mean) / std
+    z[(count < min_history) | ~(std > 0)] = np.nan
+    return mean, z
+
+
+def mean_shifts(values, weights, starts, window):
+    """
+    Level shift at every reading: mean of the `window` readings from it on
+    minus the mean of the `window` before it, in pooled standard deviations.
+    Returns (baseline, shift) with shift NaN where either side is incomplete.
+    """
+    series_start, series_end = series_offsets(starts, len(values))
+    index = np.arange(len(values))
+    before_lo = index - window
+    after_hi = index + window
+    complete = (before_lo >= series_start) & (after_hi <= series_end)
+    before_lo = np.where(complete, before_lo, index)
+    after_hi = np.where(complete, after_hi, index + 1)
+
+    _, mean_before, std_before = window_stats(values, weights, before_lo, index, window)
+    _, mean_after, std_after = window_stats(values, weights, index, after_hi, window)
+    pooled = np.sqrt((std_before ** 2 + std_after ** 2) / 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shift = (mean_after - mean_before) / pooled
+    shift[~complete | ~(pooled > 0)] = np.nan
+    return mean_before, shift
+
+
+def change_points(shift, starts):
+    """Readings where |shift| peaks: larger than the previous and at least the next one in the same series."""
+    magnitude = np.nan_to_num(np.abs(shift), nan=0.0)
+    series_start, series_end = series_offsets(starts, len(shift))
+    index = np.arange(len(shift))
+    previous = np.where(index > series_start, np.roll(magnitude, 1), 0.0)
+    following = np.where(index + 1 < series_end, np.roll(magnitude, -1), 0.0)
+    return (magnitude > previous) & (magnitude >= following)
+
+
+def detect(series):
+    """
+    Flag outliers and change points across all the loaded series at once.
+    Compacted daily aggregates count, weighted, as history, but are never
+    flagged themselves: their days were scanned while still raw. Neither
+    are readings loaded only as history.
+    Returns HealthAlert instances (unsaved).
+    """
+    values, weights, starts = series['values'], series['weights'], series['starts']
+    raw = (weights == 1) & ~series['history']
+    window = settings.HEALTH_ALERT_WINDOW
+    min_change = settings.HEALTH_ALERT_MIN_CHANGE
+
+    def large_enough(baseline):
+        # Ignore statistically unusual but tiny changes, e.g. 0.1 kg on a very steady weight
+        with np.errstate(invalid='ignore'):
+            return np.abs(values - baseline) >= min_change * np.abs(baseline)
+
+    baseline, z = rolling_zscores(values, weights, starts, window, settings.HEALTH_ALERT_MIN_HISTORY)
+    with np.errstate(invalid='ignore'):
+        outliers = raw & (np.abs(z) >= settings.HEALTH_ALERT_ZSCORE) & large_enough(baseline)
+
+    level, shift = mean_shifts(values, weights, starts, window)
+    with np.errstate(invalid='ignore'):
+        shifts = raw & (np.abs(shift) >= settings.HEALTH_ALERT_SHIFT) & change_points(shift, starts) & large_enough(level)
+
+    alerts = []
+    for kind, flagged, baselines, scores in (('zscore', outliers, baseline, z), ('change_point', shifts, level, shift)):
+        for index in np.flatnonzero(flagged):
+            alerts.append(HealthAlert(
+                pet_id=int(series['pets'][index]),
+                attribute_name=series['attributes'][index],
+                kind=kind,
+                reading_id=int(series['reading_ids'][index]),
+                value=float(values[index]),
+                measured_at=series['measured_at'][index],
+                baseline=float(baselines[index]),
+                score=float(scores[index]),
+            ))
+    return alerts
+
+
+def pets_to_scan(since_reading_id, up_to_reading_id):
+    """Pets with readings added after the previous scan (found through the primary key index)."""
+    return list(
+        HealthStatus.objects.filter(id__gt=since_reading_id, id__lte=up_to_reading_id)
+        .order_by().values_list('pet_id', flat=True).distinct()
+    )
+
+
+def scan(pet_ids=None, full=False, batch_size=None):
+    """
+    Run the detectors over the series of every pet with readings newer than
+    the last finished scan (all pets with full=True, or just `pet_ids`),
+    batch_size pets per query, and store the new alerts.
+
+    Pets are picked by reading id: a reading committed after the scan began
+    but with a lower id than its newest one is only looked at once its pet
+    gets another reading (or with full=True).
+
+    Each series is rescanned from shortly before its pet's earliest new
+    reading (whole, with full=True or `pet_ids`), so a change point is found
+    once enough readings after it have arrived; alerts already stored are
+    skipped.
+    Returns the finished HealthAlertScan.
+    """
+    batch_size = batch_size or settings.HEALTH_ALERT_PET_BATCH_SIZE
+    previous = HealthAlertScan.objects.filter(finished_at__isnull=False).order_by('-last_reading_id').first()
+    up_to = HealthStatus.objects.aggregate(last=Max('id'))['last'] or 0
+    run = HealthAlertScan.objects.create(last_reading_id=previous.last_reading_id if previous else 0)
+
+    # Scanning a few chosen pets says nothing about the others, so it doesn't move the watermark
+    advance = pet_ids is None
+    since = None
+    if pet_ids is None:
+        if full or previous is None:
+            pet_ids = list(Pet.objects.order_by('id').values_list('id', flat=True))
+        else:
+            since = previous.last_reading_id
+            pet_ids = pets_to_scan(since, up_to)
+
+    created = 0
+    for offset in range(0, len(pet_ids), batch_size):
+        batch = pet_ids[offset:offset + batch_size]
+        series = load_series(batch, since_reading_id=since)
+        if series is None:
+            continue
+        existing = set(HealthAlert.objects.filter(pet_id__in=batch).values_list('reading_id', 'kind'))
+        alerts = [alert for alert in detect(series) if (alert.reading_id, alert.kind) not in existing]
+        # ignore_conflicts covers a concurrent run inserting the same alerts
+        HealthAlert.objects.bulk_create(alerts, batch_size=1000, ignore_conflicts=True)
+        created += len(alerts)
+
+    if advance:
+        run.last_reading_id = max(up_to, run.last_reading_id)
+    run.pets_scanned = len(pet_ids)
+    run.alerts_created = created
+    run.finished_at = timezone.now()
+    run.save()
+    logger.info('Health alert scan: %s pets, %s new alerts, readings up to %s', run.pets_scanned, created, run.last_reading_id)
+    return run
@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+# All the cached user carries besides its primary key; never the password hash or personal data
+CACHED_USER_FIELDS = ('is_active', 'is_staff')
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def build_user(user_id, **fields):
+    """
+    A User loaded with just the primary key and `fields`: any other field is
+    deferred, so it is fetched if something reads it, and save() only writes
+    the loaded ones.
+    """
+    user_model = get_user_model()
+    values = {user_model._meta.get_field(api_settings.USER_ID_FIELD).attname: user_id, **fields}
+    # from_db() takes the values in the order the model declares its fields, whatever the order of the names
+    names = [field.attname for field in user_model._meta.concrete_fields if field.attname in values]
+    return user_model.from_db(DEFAULT_DB_ALIAS, names, [values[name] for name in names])
+
+
+class LocalUserCache:
+    """
+    Small per-process TTL cache in front of the shared cache. Other processes
+    can't invalidate it, so its TTL bounds how long they may serve a stale user.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires < time.monotonic():
+                del self.entries[user_id]
+                return None
+            return user
+
+    def set(self, user_id, user):
+        with self.lock:
+            self.entries[user_id] = (time.monotonic() + settings.AUTH_USER_LOCAL_CACHE_TIMEOUT, user)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > settings.AUTH_USER_LOCAL_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def delete(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_users = LocalUserCache()
+
+
+def invalidate_user(user_id):
+    local_users.delete(user_id)
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves request.user from a short-lived cache
+    (in-process first, then the shared cache) instead of querying auth_user on
+    every request. Only the primary key and CACHED_USER_FIELDS are cached; the
+    other fields of request.user are deferred. Entries are dropped whenever a User
+    is saved or deleted.
+
+    With JWT_USER_FROM_CLAIMS the user is built from the token alone and the
+    database is never touched, at the price of deactivated users keeping
+    access until their token expires.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if settings.JWT_USER_FROM_CLAIMS:
+            return self.user_from_claims(user_id, validated_token)
+
+        fields = local_users.get(user_id)
+        if fields is None:
+            fields = cache.get(user_cache_key(user_id))
+            if fields is None:
+                # Raises AuthenticationFailed for unknown and inactive users, which are never cached
+                user = super().get_user(validated_token)
+                fields = {name: getattr(user, name) for name in CACHED_USER_FIELDS}
+                cache.set(user_cache_key(user_id), fields, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+            local_users.set(user_id, fields)
+        # Every request gets its own instance, so nothing a view does to it leaks into the cache
+        return build_user(user_id, **fields)
+
+    def user_from_claims(self, user_id, validated_token):
+        """
+        A User carrying just the primary key (plus the username if the token
+        has one). Enough for filtering on and assigning owner=request.user.
+        """
+        fields = {'is_active': True}
+        if 'username' in validated_token:
+            fields['username'] = validated_token['username']
+        return build_user(user_id, **fields)
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Document CachedJWTAuthentication in the OpenAPI schema like plain JWTAuthentication."""
+    target_class = 'pets.authentication.CachedJWTAuthentication'
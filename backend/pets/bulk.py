@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from django.db import connection
+
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def copy_rows(model, columns, rows):
+    """
+    Load rows (tuples of values in `columns` order) into the model's table with
+    PostgreSQL COPY, the fastest path into a table. Bypasses save() and signals.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(value) for value in row])
+    buffer.seek(0)
+
+    table = connection.ops.quote_name(model._meta.db_table)
+    column_list = ', '.join(connection.ops.quote_name(model._meta.get_field(column).column) for column in columns)
+    with connection.cursor() as cursor:
+        # Django's cursor wrapper hands copy_expert through to psycopg2
+        cursor.copy_expert(f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+
+
+def _insert_value(value):
+    if isinstance(value, datetime):
+        return connection.ops.adapt_datetimefield_value(value)
+    if isinstance(value, date):
+        return connection.ops.adapt_datefield_value(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def insert_rows(model, columns, rows):
+    """
+    Load already database-ready rows: COPY on PostgreSQL, a single executemany
+    INSERT elsewhere, storing the same values either way. Datetimes must be
+    naive UTC 'YYYY-MM-DD HH:MM:SS' strings or aware datetimes; JSON columns
+    take dicts and lists. Bypasses save(), auto_now_add and signals.
+    """
+    if connection.vendor == 'postgresql':
+        copy_rows(model, columns, rows)
+        return
+
+    rows = [[_insert_value(value) for value in row] for row in rows]
+
+    table = connection.ops.quote_name(model._meta.db_table)
+    column_list = ', '.join(connection.ops.quote_name(model._meta.get_field(column).column) for column in columns)
+    placeholders = ', '.join(['%s'] * len(columns))
+    with connection.cursor() as cursor:
+        cursor.executemany(f'INSERT INTO {table} ({column_list}) VALUES ({placeholders})', rows)
+
+
+def delete_rows(queryset):
+    """
+    Delete the queryset's rows with a single DELETE statement. Bypasses
+    delete signals and cascades, so only use it on tables nothing points to.
+    """
+    return queryset._raw_delete(queryset.db)
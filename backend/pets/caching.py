@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.cache import cache
+from . import metrics
+
+OVERVIEW_FILTERS = ('all', 'last7', 'last30')
+OVERVIEW_RESOLUTIONS = (None, 'hour', 'day', 'week')
+
+OVERVIEW_HITS_KEY = 'dashboard:overview:hits'
+OVERVIEW_MISSES_KEY = 'dashboard:overview:misses'
+
+
+def normalize_filter(filter_option):
+    # Unknown filters are served as 'all' by the view, so they share its entry
+    return filter_option if filter_option in OVERVIEW_FILTERS else 'all'
+
+
+def overview_key(user_id, filter_option, resolution=None):
+    return f"dashboard:overview:{user_id}:{normalize_filter(filter_option)}:{resolution or 'raw'}"
+
+
+def _increment(key):
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The counter was evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def get_overview(user_id, filter_option, resolution=None):
+    """Return the cached overview for this user/filter, or None on a miss."""
+    data = cache.get(overview_key(user_id, filter_option, resolution))
+    _increment(OVERVIEW_HITS_KEY if data is not None else OVERVIEW_MISSES_KEY)
+    metrics.record_cache_lookup('dashboard_overview', data is not None)
+    return data
+
+
+def set_overview(user_id, filter_option, resolution, data):
+    timeout = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300)
+    cache.set(overview_key(user_id, filter_option, resolution), data, timeout=timeout)
+
+
+def invalidate_overview(*user_ids):
+    """Drop every cached overview variant belonging to the given users."""
+    keys = [
+        overview_key(user_id, filter_option, resolution)
+        for user_id in set(user_ids) if user_id is not None
+        for filter_option in OVERVIEW_FILTERS
+        for resolution in OVERVIEW_RESOLUTIONS
+    ]
+    if keys:
+        cache.delete_many(keys)
+
+
+def overview_stats():
+    hits = cache.get(OVERVIEW_HITS_KEY) or 0
+    misses = cache.get(OVERVIEW_MISSES_KEY) or 0
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else None,
+    }
@@ -0,0 +1,89 @@
+import csv
+import json
+from datetime import time, timedelta
+from .models import HealthStatus, Vaccination
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+EXPORT_RECORD_TYPES = ('health', 'vaccination')
+
+# A compacted daily aggregate has value = the mean of its sample_count readings, which ranged from min_value to max_value
+HEALTH_FIELDS = [
+    'id', 'pet_id', 'attribute_name', 'value', 'unit', 'mood', 'coat_condition', 'measured_at', 'created_at',
+    'sample_count', 'min_value', 'max_value',
+]
+VACCINATION_FIELDS = ['id', 'pet_id', 'vaccination_name', 'vaccination_status', 'vaccinated_at', 'schedule_at', 'vaccination_notes']
+
+# One flat header for both record types; columns that don't apply are left empty
+EXPORT_COLUMNS = ['record_type'] + HEALTH_FIELDS + [field for field in VACCINATION_FIELDS if field not in HEALTH_FIELDS]
+
+CHUNK_SIZE = 2000  # Rows fetched per round trip of the server-side cursor
+ROWS_PER_WRITE = 500  # Rows encoded into each chunk of the streamed response
+
+
+def export_rows(pet, start=None, end=None, attributes=None, record_types=EXPORT_RECORD_TYPES):
+    """
+    Yield the pet's health readings, then its vaccinations, as dicts keyed by
+    EXPORT_COLUMNS, reading both tables through server-side cursors.
+    """
+    if 'health' in record_types:
+        readings = HealthStatus.objects.filter(pet=pet)
+        if start is not None:
+            readings = readings.filter(measured_at__gte=start)
+        if end is not None:
+            readings = readings.filter(measured_at__lt=end)
+        if attributes:
+            readings = readings.filter(attribute_name__in=attributes)
+        for row in readings.order_by('measured_at', 'id').values(*HEALTH_FIELDS).iterator(chunk_size=CHUNK_SIZE):
+            yield {'record_type': 'health', **row}
+
+    if 'vaccination' in record_types:
+        vaccinations = Vaccination.objects.filter(pet=pet)
+        if start is not None:
+            vaccinations = vaccinations.filter(schedule_at__gte=start.date())
+        if end is not None:
+            vaccinations = vaccinations.filter(schedule_at__lt=end.date() if end.time() == time.min else end.date() + timedelta(days=1))
+        for row in vaccinations.order_by('schedule_at', 'id').values(*VACCINATION_FIELDS).iterator(chunk_size=CHUNK_SIZE):
+            yield {'record_type': 'vaccination', **row}
+
+
+class _Echo:
+    """File-like object whose write() just returns the line, for csv.writer."""
+    def write(self, value):
+        return value
+
+
+def _format_csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def _json_default(value):
+    # Full-precision ISO 8601 so exported timestamps round-trip exactly
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    chunk = [writer.writerow(EXPORT_COLUMNS)]
+    for row in rows:
+        chunk.append(writer.writerow([_format_csv_value(row.get(column)) for column in EXPORT_COLUMNS]))
+        if len(chunk) >= ROWS_PER_WRITE:
+            yield ''.join(chunk)
+            chunk = []
+    yield ''.join(chunk)
+
+
+def stream_ndjson(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(row, default=_json_default, ensure_ascii=False) + '\n')
+        if len(chunk) >= ROWS_PER_WRITE:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
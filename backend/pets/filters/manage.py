@@ -0,0 +1,176 @@
+from datetime import datetime, time, timedelta
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+from ..models import HealthStatus
+
+ATTRIBUTE_NAMES = [choice[0] for choice in HealthStatus.ATTRIBUTE_CHOICES]
+
+
+# The health-status list and the export accept either name for each filter
+START_PARAMS = ('measured_after', 'start')
+END_PARAMS = ('measured_before', 'end')
+ATTRIBUTE_PARAMS = ('attribute_name', 'attribute')
+
+
+def parse_moment(name, value, end=False):
+    """
+    Parse an ISO date or datetime into an aware datetime. A date stands for
+    the start of that day, or with end=True for the start of the next one,
+    so that an (exclusive) end date covers its whole day.
+    """
+    try:
+        # Dates first: parse_datetime() reads a bare date as its midnight
+        day = parse_date(value)
+        if day is not None:
+            moment = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+        else:
+            moment = parse_datetime(value)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ValidationError({name: 'Must be an ISO 8601 date or datetime.'})
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def parse_bound(params, names, end=False):
+    """The first of the `names` query parameters that is given, parsed with parse_moment(), or None."""
+    for name in names:
+        if params.get(name):
+            return parse_moment(name, params[name], end=end)
+    return None
+
+
+def parse_number(name, value):
+    try:
+        return float(value)
+    except ValueError:
+        raise ValidationError({name: 'Must be a number.'})
+
+
+def parse_attribute_names(params, names=ATTRIBUTE_PARAMS):
+    """Attribute names from repeated and/or comma-separated parameters, validated against ATTRIBUTE_CHOICES."""
+    attribute_names = []
+    for name in names:
+        attributes = [attribute.strip() for value in params.getlist(name) for attribute in value.split(',') if attribute.strip()]
+        unknown = [attribute for attribute in attributes if attribute not in ATTRIBUTE_NAMES]
+        if unknown:
+            raise ValidationError({
+                name: f"Unknown attribute(s): {', '.join(unknown)}. Must be one of: {', '.join(ATTRIBUTE_NAMES)}"
+            })
+        attribute_names.extend(attributes)
+    return attribute_names
+
+
+class HealthStatusFilter(BaseFilterBackend):
+    """
+    Server-side filters for health status lists, each answered by the
+    (pet, attribute_name, measured_at/value) indexes:
+
+    - ?attribute_name= one or more attributes, repeated or comma-separated
+    - ?measured_after= / ?measured_before= bounds on measured_at: from a
+      datetime or the start of a date, up to (not including) a datetime or
+      the end of a date
+    - ?value_min= / ?value_max= inclusive bounds on value (numeric readings only)
+
+    ?attribute=, ?start= and ?end= are accepted too, as in the export.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        attribute_names = parse_attribute_names(params)
+        if attribute_names:
+            queryset = queryset.filter(attribute_name__in=attribute_names)
+
+        after = parse_bound(params, START_PARAMS)
+        if after is not None:
+            queryset = queryset.filter(measured_at__gte=after)
+        before = parse_bound(params, END_PARAMS, end=True)
+        if before is not None:
+            queryset = queryset.filter(measured_at__lt=before)
+
+        if params.get('value_min'):
+            queryset = queryset.filter(value__gte=parse_number('value_min', params['value_min']))
+        if params.get('value_max'):
+            queryset = queryset.filter(value__lte=parse_number('value_max', params['value_max']))
+        return queryset
+
+    def get_schema_operation_parameters(self, view):
+        def parameter(name, description, schema, explode=False):
+            return {
+                'name': name,
+                'required': False,
+                'in': 'query',
+                'description': description,
+                'schema': schema,
+                **({'style': 'form', 'explode': True} if explode else {}),
+            }
+
+        return [
+            parameter(
+                'attribute_name',
+                'Only these attributes; repeat the parameter or separate them with commas',
+                {'type': 'array', 'items': {'type': 'string', 'enum': ATTRIBUTE_NAMES}},
+                explode=True,
+            ),
+            parameter('measured_after', 'Measured at or after this ISO date/datetime', {'type': 'string'}),
+            parameter('measured_before', 'Measured before this ISO datetime, or on or before this ISO date', {'type': 'string'}),
+            parameter('attribute', 'Same as attribute_name', {'type': 'array', 'items': {'type': 'string', 'enum': ATTRIBUTE_NAMES}}, explode=True),
+            parameter('start', 'Same as measured_after', {'type': 'string'}),
+            parameter('end', 'Same as measured_before', {'type': 'string'}),
+            parameter('value_min', 'Value at least this', {'type': 'number'}),
+            parameter('value_max', 'Value at most this', {'type': 'number'}),
+        ]
+
+
+class HealthStatusOrderingFilter(OrderingFilter):
+    """
+    ?ordering= over the indexed columns. Unknown fields are rejected instead
+    of being ignored, and `id` is appended as a tie-breaker so pages stay
+    stable. Without ?ordering= the list keeps its usual order.
+
+    Cursor pages only accept a single timestamp (plus `id` in the same
+    direction): the keyset comparison drops rows whose leading column is
+    NULL, like the value of Mood readings, and a non-unique one such as
+    attribute_name makes the cursor fall back to an offset.
+    """
+    ordering_fields = ['measured_at', 'created_at', 'value', 'attribute_name', 'id']
+    cursor_ordering_fields = ['measured_at', 'created_at']
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not any(field.lstrip('-') == 'id' for field in ordering):
+            ordering = [*ordering, '-id' if ordering[0].startswith('-') else 'id']
+        if ordering and view.use_cursor_pagination():
+            self.check_cursor_ordering(ordering)
+        return ordering
+
+    def check_cursor_ordering(self, ordering):
+        descending = ordering[0].startswith('-')
+        if (
+            len(ordering) != 2
+            or ordering[0].lstrip('-') not in self.cursor_ordering_fields
+            or ordering[1] != ('-id' if descending else 'id')
+        ):
+            choices = [f'{prefix}{field}' for field in self.cursor_ordering_fields for prefix in ('', '-')]
+            raise ValidationError({
+                self.ordering_param: f"With cursor pagination, must be one of: {', '.join(choices)} (optionally followed by id in the same direction)."
+            })
+
+    def get_default_ordering(self, view):
+        # Cursor pagination needs an ordering; page numbers keep the unordered default
+        if view.use_cursor_pagination():
+            return list(view.cursor_pagination_class.ordering)
+        return None
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        valid_fields = super().remove_invalid_fields(queryset, fields, view, request)
+        if len(valid_fields) != len(fields):
+            raise ValidationError({
+                self.ordering_param: f"Must be a comma-separated list of: {', '.join(self.ordering_fields)} (prefix with - for descending)."
+            })
+        return valid_fields
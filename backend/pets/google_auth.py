@@ -0,0 +1,114 @@
+import logging
+import re
+import threading
+import time
+import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
+from google.auth import jwt
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = 'https://www.googleapis.com/oauth2/v1/certs'
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+
+DEFAULT_MAX_AGE = 300  # Seconds to keep certificates served without a Cache-Control max-age
+RETRY_AFTER = 30  # Seconds before retrying a failed refresh while the previous certificates are kept
+
+
+class CertificatesUnavailable(Exception):
+    """Google's signing certificates could not be fetched and none are cached."""
+
+
+class HTTPCertificateSource:
+    """
+    Google's signing certificates (key id -> PEM), kept for as long as the
+    response's Cache-Control max-age allows and fetched over a pooled session,
+    so only one login every few hours pays for the round trip.
+    """
+
+    def __init__(self, url=GOOGLE_CERTS_URL, session=None, timeout=5):
+        self.url = url
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.certificates = None
+        self.expires_at = 0
+        self.lock = threading.Lock()
+
+    def get_certificates(self):
+        if self.certificates is not None and time.monotonic() < self.expires_at:
+            return self.certificates
+        with self.lock:
+            # Another thread may have refreshed them while this one waited
+            if self.certificates is not None and time.monotonic() < self.expires_at:
+                return self.certificates
+            try:
+                response = self.session.get(self.url, timeout=self.timeout)
+                response.raise_for_status()
+                certificates = response.json()
+            except (requests.RequestException, ValueError) as e:
+                if self.certificates is None:
+                    raise CertificatesUnavailable(str(e))
+                # Keep verifying with the previous key set rather than failing every login
+                logger.warning('Could not refresh Google certificates, keeping the cached ones: %s', e)
+                self.expires_at = time.monotonic() + RETRY_AFTER
+                return self.certificates
+            self.certificates = certificates
+            self.expires_at = time.monotonic() + self.max_age(response.headers.get('Cache-Control', ''))
+            return certificates
+
+    @staticmethod
+    def max_age(cache_control):
+        match = re.search(r'max-age=(\d+)', cache_control)
+        return int(match.group(1)) if match else DEFAULT_MAX_AGE
+
+
+class StaticCertificateSource:
+    """A fixed key set, e.g. a local stand-in for Google's certificates in tests."""
+
+    def __init__(self, certificates):
+        self.certificates = certificates
+
+    def get_certificates(self):
+        return self.certificates
+
+
+class GoogleIDTokenVerifier:
+    """
+    Verify Google ID tokens locally against certificates from a pluggable
+    source. Raises ValueError for any invalid token, like
+    google.oauth2.id_token.verify_oauth2_token does.
+    """
+
+    def __init__(self, audience, certificate_source=None, clock_skew=10):
+        self.audience = audience
+        self.certificate_source = certificate_source or HTTPCertificateSource()
+        self.clock_skew = clock_skew
+
+    def verify(self, token):
+        if not token:
+            raise ValueError('No token provided')
+        idinfo = jwt.decode(
+            token,
+            certs=self.certificate_source.get_certificates(),
+            audience=self.audience,
+            clock_skew_in_seconds=self.clock_skew,
+        )
+        if idinfo.get('iss') not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer: {idinfo.get('iss')}")
+        return idinfo
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+
+def get_verifier():
+    """The process-wide verifier, so the certificate cache and HTTP pool are shared by all requests."""
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                source = import_string(settings.GOOGLE_CERTIFICATE_SOURCE)()
+                _verifier = GoogleIDTokenVerifier(settings.GOOGLE_OAUTH_CLIENT_ID, source)
+    return _verifier
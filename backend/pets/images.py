@@ -0,0 +1,66 @@
+import io
+import posixpath
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+JPEG_QUALITY = 85
+
+
+def _encode_jpeg(image):
+    buffer = io.BytesIO()
+    # Saving without an exif= argument drops all EXIF data (GPS, device, ...)
+    image.save(buffer, format='JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return ContentFile(buffer.getvalue())
+
+
+def _to_rgb(image):
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def process_upload(field_file):
+    """
+    Re-encode an uploaded image as a JPEG without EXIF, no larger than
+    IMAGE_MAX_DIMENSION, and write its thumbnails next to it.
+
+    Returns the storage name of the re-encoded image and a {size: name}
+    dict of the thumbnails; the caller records them and removes the original.
+    """
+    storage = field_file.storage
+    with storage.open(field_file.name, 'rb') as source:
+        image = Image.open(source)
+        # Apply the EXIF orientation before the EXIF data is dropped
+        image = _to_rgb(ImageOps.exif_transpose(image))
+
+    max_dimension = settings.IMAGE_MAX_DIMENSION
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+    directory, filename = posixpath.split(field_file.name)
+    stem = posixpath.splitext(filename)[0]
+    name = storage.save(posixpath.join(directory, f'{stem}.jpg'), _encode_jpeg(image))
+
+    variants = {}
+    for size in sorted(settings.IMAGE_THUMBNAIL_SIZES):
+        thumbnail = image.copy()
+        thumbnail.thumbnail((size, size), Image.Resampling.LANCZOS)
+        variants[str(size)] = storage.save(posixpath.join(directory, 'thumbs', f'{stem}_{size}.jpg'), _encode_jpeg(thumbnail))
+    return name, variants
+
+
+def pick_variant(original_name, variants, size):
+    """Smallest stored variant at least `size` pixels, falling back to the original."""
+    for variant_size in sorted(variants, key=int):
+        if int(variant_size) >= size:
+            return variants[variant_size]
+    return original_name
+
+
+def delete_files(storage, names):
+    for name in names:
+        if name:
+            storage.delete(name)
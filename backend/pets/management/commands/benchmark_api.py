@@ -0,0 +1,304 @@
+import json
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from pets import caching
+
+ENDPOINTS = ['/api/pets/', '/api/health-status/', '/api/vaccination/', '/api/dashboard/overview/']
+
+SERVER_START_TIMEOUT = 30  # Seconds to wait for the local server to answer /api/live/
+
+# gunicorn application and extra arguments per serving mode; asgi also mounts the async views
+SERVER_MODES = {
+    'wsgi': ('backend.wsgi:application', [], {}),
+    'asgi': ('backend.asgi:application', ['--worker-class', 'uvicorn.workers.UvicornWorker'], {'ASYNC_VIEWS': 'True'}),
+}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed mock data, start a local server and drive concurrent traffic against the main API endpoints, '
+        'reporting throughput, p50/p95/p99 latency and SQL query counts per endpoint as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            help='Benchmark an already running server instead of starting gunicorn locally'
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8765,
+            help='Port of the local server (default: 8765)'
+        )
+        parser.add_argument(
+            '--server-workers',
+            type=int,
+            default=2,
+            help='gunicorn worker processes of the local server (default: 2)'
+        )
+        parser.add_argument(
+            '--server',
+            choices=sorted(SERVER_MODES),
+            default='wsgi',
+            help='Serving mode of the local server: gunicorn sync workers (wsgi) or uvicorn workers with the async views (asgi) (default: wsgi)'
+        )
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help='Benchmark a local wsgi and then a local asgi server with the same traffic and report both side by side'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=10,
+            help='Mock users to seed and log in as, round-robin (default: 10)'
+        )
+        parser.add_argument(
+            '--password',
+            default='mockpassword',
+            help="Password of the mock users (default: 'mockpassword')"
+        )
+        parser.add_argument(
+            '--pets-per-user',
+            type=int,
+            default=2,
+            help='Pets per mock user (default: 2)'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Days of history per mock pet (default: 90)'
+        )
+        parser.add_argument(
+            '--skip-seed',
+            action='store_true',
+            help='Reuse the mock users already in the database instead of regenerating their data'
+        )
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            dest='endpoints',
+            help='Path to benchmark, may be repeated (default: the pets, health-status, vaccination and dashboard lists)'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Measured requests per endpoint (default: 200)'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=20,
+            help='Unmeasured requests per endpoint sent first (default: 20)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Concurrent client threads (default: 8)'
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=30,
+            help='Per-request timeout in seconds (default: 30)'
+        )
+        parser.add_argument(
+            '--output',
+            help='Also write the JSON report to this file'
+        )
+
+    def handle(self, *args, **options):
+        endpoints = options['endpoints'] or ENDPOINTS
+        self.timeout = options['timeout']
+
+        if options['compare'] and options['base_url']:
+            raise CommandError('--compare starts its own servers and cannot be combined with --base-url')
+
+        if not options['skip_seed']:
+            self.stderr.write(f"Seeding {options['users']} mock users")
+            call_command(
+                'generate_mock_data',
+                users=options['users'],
+                password=options['password'],
+                pets_per_user=options['pets_per_user'],
+                days=options['days'],
+                stdout=self.stderr,
+            )
+        usernames = [f'mockuser{i}' for i in range(1, options['users'] + 1)]
+
+        if options['compare']:
+            servers = {mode: self.benchmark(endpoints, usernames, options, mode) for mode in SERVER_MODES}
+            report = {'servers': servers, 'comparison': self.compare(servers['wsgi'], servers['asgi'])}
+        else:
+            report = self.benchmark(endpoints, usernames, options, options['server'])
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        self.stdout.write(output)
+
+    def benchmark(self, endpoints, usernames, options, mode):
+        server = None
+        base_url = options['base_url']
+        if base_url is None:
+            base_url = f"http://127.0.0.1:{options['port']}"
+            server = self.start_server(options['port'], options['server_workers'], base_url, mode)
+        base_url = base_url.rstrip('/')
+
+        try:
+            tokens = self.log_in(base_url, usernames, options['password'])
+            report = {
+                'base_url': base_url,
+                'server': mode if server is not None else None,
+                'users': len(tokens),
+                'concurrency': options['concurrency'],
+                'requests_per_endpoint': options['requests'],
+                'endpoints': {},
+            }
+            for path in endpoints:
+                self.stderr.write(f'Benchmarking {path}' + (f' ({mode})' if server is not None else ''))
+                result = self.run_endpoint(base_url, path, tokens, options['requests'], options['warmup'], options['concurrency'])
+                result['sql_queries'] = self.count_queries(path, usernames[0], tokens[0])
+                report['endpoints'][path] = result
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+        return report
+
+    def compare(self, wsgi, asgi):
+        """Per endpoint: asgi throughput relative to wsgi, and how much p99 latency moved."""
+        comparison = {}
+        for path, before in wsgi['endpoints'].items():
+            after = asgi['endpoints'][path]
+            comparison[path] = {
+                'throughput_ratio': (
+                    round(after['throughput_rps'] / before['throughput_rps'], 2)
+                    if before['throughput_rps'] and after['throughput_rps'] is not None else None
+                ),
+                'p99_delta_ms': (
+                    round(after['latency_ms']['p99'] - before['latency_ms']['p99'], 2)
+                    if before['latency_ms']['p99'] is not None and after['latency_ms']['p99'] is not None else None
+                ),
+            }
+        return comparison
+
+    def start_server(self, port, workers, base_url, mode='wsgi'):
+        """Start gunicorn on the configured database and wait until it answers."""
+        application, extra_args, extra_env = SERVER_MODES[mode]
+        server = subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn', application,
+                '--bind', f'127.0.0.1:{port}',
+                '--workers', str(workers),
+                '--log-level', 'warning',
+                *extra_args,
+            ],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, **extra_env},
+        )
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'gunicorn exited with status {server.returncode}')
+            try:
+                if requests.get(f'{base_url}/api/live/', timeout=1).status_code == 200:
+                    return server
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f'Server did not start within {SERVER_START_TIMEOUT}s')
+
+    def log_in(self, base_url, usernames, password):
+        tokens = []
+        with requests.Session() as session:
+            for username in usernames:
+                response = session.post(f'{base_url}/api/token/', data={'username': username, 'password': password}, timeout=self.timeout)
+                if response.status_code != 200:
+                    raise CommandError(f'Could not log in as {username}: HTTP {response.status_code}')
+                tokens.append(response.json()['access'])
+        return tokens
+
+    def run_endpoint(self, base_url, path, tokens, total, warmup, concurrency):
+        local = threading.local()
+        sessions = []
+
+        def fetch(index):
+            # One keep-alive session per client thread
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = requests.Session()
+                sessions.append(session)
+            started = time.perf_counter()
+            try:
+                response = session.get(
+                    base_url + path,
+                    headers={'Authorization': f'Bearer {tokens[index % len(tokens)]}'},
+                    timeout=self.timeout,
+                )
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            return time.perf_counter() - started, ok
+
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(fetch, range(warmup)))
+            started = time.perf_counter()
+            results = list(pool.map(fetch, range(total)))
+            elapsed = time.perf_counter() - started
+        for session in sessions:
+            session.close()
+
+        latencies = sorted(latency * 1000 for latency, _ in results)
+        return {
+            'requests': total,
+            'errors': sum(1 for _, ok in results if not ok),
+            'throughput_rps': round(total / elapsed, 1) if elapsed else None,
+            'latency_ms': {
+                'mean': round(sum(latencies) / len(latencies), 2) if latencies else None,
+                'p50': round(percentile(latencies, 50), 2) if latencies else None,
+                'p95': round(percentile(latencies, 95), 2) if latencies else None,
+                'p99': round(percentile(latencies, 99), 2) if latencies else None,
+                'max': round(latencies[-1], 2) if latencies else None,
+            },
+        }
+
+    def count_queries(self, path, username, token):
+        """
+        SQL queries one uncached request to `path` runs, measured in-process
+        against the configured database since the server's queries can't be seen.
+        """
+        user = User.objects.filter(username=username).first()
+        if user is not None:
+            caching.invalidate_overview(user.id)
+        with CaptureQueriesContext(connection) as queries:
+            response = Client().get(path, HTTP_AUTHORIZATION=f'Bearer {token}')
+        if response.status_code != 200:
+            return None
+        return len(queries)
@@ -0,0 +1,206 @@
+import re
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from pets import reminders, retention, stats
+from pets.bulk import insert_rows
+from pets.models import Pet, HealthStatus, Vaccination
+from pets.views.manage import HealthStatusViewSet, VaccinationViewSet
+from pets.views.overview import DashboardOverviewView
+
+# Tables whose hot queries must always be answered through an index
+GUARDED_TABLES = ['pets_healthstatus', 'pets_vaccination']
+
+# Pets of the checked user; the --pets seeded for other owners make owner-scoped queries as selective as in production
+CHECKED_USER_PETS = 2
+
+HEALTH_COLUMNS = ['pet_id', 'attribute_name', 'value', 'unit', 'measured_at', 'created_at', 'sample_count']
+VACCINATION_COLUMNS = ['pet_id', 'vaccination_name', 'vaccination_status', 'schedule_at', 'tag_proof_variants']
+
+# Partition names, and index names as EXPLAIN reports them: PostgreSQL index/bitmap scans, SQLite "USING [COVERING] INDEX"
+PARTITION = re.compile(r'\w+_(p\d{6}|default)$')
+PLAN_INDEX = re.compile(r'(?:Index (?:Only )?Scan (?:Backward )?using|Bitmap Index Scan on|USING (?:COVERING )?INDEX) (\w+)')
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot HealthStatus/Vaccination queries and fail unless each one is answered by the index meant for it'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            help='Explain the queries for this existing user instead of seeding temporary data'
+        )
+        parser.add_argument(
+            '--pets',
+            type=int,
+            default=1000,
+            help='Number of pets to seed for other owners (default: 1000)'
+        )
+        parser.add_argument(
+            '--readings-per-pet',
+            type=int,
+            default=500,
+            help='Number of health readings to seed per pet (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        # Everything runs in a transaction that is rolled back, so seeded data never sticks
+        with transaction.atomic():
+            if options['user_id']:
+                try:
+                    user = User.objects.get(id=options['user_id'])
+                except User.DoesNotExist:
+                    raise CommandError(f"User with ID {options['user_id']} does not exist.")
+            else:
+                user = self.seed(options['pets'], options['readings_per_pet'])
+
+            # Plans come from real statistics, so a skipped index shows up just like a missing one
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE pets_pet, pets_healthstatus, pets_vaccination' if connection.vendor == 'postgresql' else 'ANALYZE')
+            parent_indexes = self.parent_indexes()
+            empty_tables = self.empty_partitions()
+
+            failures = []
+            for name, queryset, expected_index in self.get_queries(user):
+                plan = queryset.explain()
+                offenders = self.sequential_scans(plan, empty_tables)
+                used = {parent_indexes.get(index, index) for index in PLAN_INDEX.findall(plan)}
+                self.stdout.write(f'--- {name} (expects {expected_index})')
+                self.stdout.write(plan)
+                if offenders:
+                    failures.append(f"{name}: sequential scan on {', '.join(offenders)}")
+                elif expected_index not in used:
+                    failures.append(f"{name}: {expected_index} not used (plan uses {', '.join(sorted(used)) or 'no index'})")
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError('Query plan check failed:\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('All hot queries use their intended index'))
+
+    def seed(self, pet_count, readings_per_pet):
+        user = User.objects.create_user(username=f'query-plan-check-{timezone.now().timestamp()}')
+        pets = Pet.objects.bulk_create([
+            Pet(name=f'Pet {i}', species='Cat', owner=user, gender='Unknown')
+            for i in range(CHECKED_USER_PETS)
+        ])
+        other = User.objects.create_user(username=f'query-plan-check-other-{timezone.now().timestamp()}')
+        pets += Pet.objects.bulk_create([
+            Pet(name=f'Other pet {i}', species='Cat', owner=other, gender='Unknown')
+            for i in range(pet_count)
+        ])
+
+        attributes = [choice[0] for choice in HealthStatus.ATTRIBUTE_CHOICES]
+        now = timezone.now()
+        start = now - timedelta(days=readings_per_pet)
+        # Past vaccinations are done and only the next few are open, as in real data
+        schedule = [(now - timedelta(days=30 * (10 - i))).date() for i in range(12)]
+        for pet in pets:
+            insert_rows(HealthStatus, HEALTH_COLUMNS, [
+                (
+                    pet.id, attributes[i % len(attributes)], float(i),
+                    HealthStatus.DEFAULT_UNITS.get(attributes[i % len(attributes)]),
+                    start + timedelta(days=i), now, 1,
+                )
+                for i in range(readings_per_pet)
+            ])
+            insert_rows(Vaccination, VACCINATION_COLUMNS, [
+                (pet.id, f'Vaccine {i}', 'Completed' if schedule_at < now.date() else 'Pending', schedule_at, '{}')
+                for i, schedule_at in enumerate(schedule)
+            ])
+        return user
+
+    def get_queries(self, user):
+        """
+        (name, queryset, index) for a few typical requests: the querysets built
+        exactly the way the views do, and the index each one is meant to use.
+        """
+        pet = Pet.objects.filter(owner=user).first()
+        factory = APIRequestFactory()
+
+        def viewset_queryset(viewset_class, params):
+            request = Request(factory.get('/', params))
+            request.user = user
+            view = viewset_class(request=request, format_kwarg=None, action='list')
+            return view.get_queryset()
+
+        def filtered_queryset(viewset_class, params):
+            # As the list view filters and orders it with the viewset's filter backends
+            request = Request(factory.get('/', params))
+            request.user = user
+            view = viewset_class(request=request, format_kwarg=None, action='list')
+            return view.filter_queryset(view.get_queryset())
+
+        dashboard = DashboardOverviewView().get_queryset(user).order_by('measured_at')
+
+        queries = [
+            ('HealthStatusViewSet list', viewset_queryset(HealthStatusViewSet, {}), 'healthstatus_pet_measured_idx'),
+            ('VaccinationViewSet list', viewset_queryset(VaccinationViewSet, {}), 'vaccination_pet_schedule_idx'),
+            ('Dashboard overview (all)', dashboard, 'healthstatus_pet_measured_idx'),
+            ('Dashboard overview (last7)', dashboard.filter(measured_at__gte=timezone.now() - timedelta(days=7)), 'healthstatus_pet_measured_idx'),
+            ('VaccinationViewSet upcoming', reminders.upcoming(viewset_queryset(VaccinationViewSet, {}), 7), 'vaccination_pet_schedule_idx'),
+            ('Vaccination reminders: overdue', reminders.overdue(), 'vaccination_status_sched_idx'),
+            ('Vaccination reminders: due', reminders.due_reminders(), 'vaccination_status_sched_idx'),
+        ]
+        if pet is not None:
+            queries += [
+                ('HealthStatusViewSet list for pet', viewset_queryset(HealthStatusViewSet, {'pet': pet.id}).order_by('measured_at'), 'healthstatus_pet_measured_idx'),
+                ('HealthStatusViewSet attribute series for pet', viewset_queryset(HealthStatusViewSet, {'pet': pet.id}).filter(attribute_name='Weight').order_by('measured_at'), 'healthstatus_pet_attr_meas_idx'),
+                ('Pet stats (last30)', stats.series_queryset([pet.id], since=timezone.now() - timedelta(days=30)), 'healthstatus_pet_attr_meas_idx'),
+                ('Health data compaction chunk', retention.compaction_queryset(pet.id, timezone.now(), since=timezone.now() - timedelta(days=30))[:5000], 'healthstatus_pet_measured_idx'),
+                ('HealthStatusViewSet value range for pet', filtered_queryset(HealthStatusViewSet, {'pet': pet.id, 'attribute_name': 'Weight', 'value_min': 1, 'value_max': 10, 'ordering': '-value'}), 'healthstatus_pet_attr_val_idx'),
+                ('VaccinationViewSet list for pet', viewset_queryset(VaccinationViewSet, {'pet': pet.id}).order_by('schedule_at'), 'vaccination_pet_schedule_idx'),
+                ('HealthStatusViewSet cursor page for pet', viewset_queryset(HealthStatusViewSet, {'pet': pet.id}).filter(measured_at__gt=timezone.now() - timedelta(days=30)).order_by('measured_at', 'id')[:10], 'healthstatus_pet_measured_idx'),
+                ('VaccinationViewSet cursor page for pet', viewset_queryset(VaccinationViewSet, {'pet': pet.id}).filter(schedule_at__gt=timezone.now().date()).order_by('schedule_at', 'id')[:5], 'vaccination_pet_schedule_idx'),
+            ]
+        return queries
+
+    def parent_indexes(self):
+        """On PostgreSQL, map the index of each partition to the index of the partitioned table it belongs to."""
+        if connection.vendor != 'postgresql':
+            return {}
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT child.relname, parent.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "WHERE child.relkind = 'i'"
+            )
+            return dict(cursor.fetchall())
+
+    def empty_partitions(self):
+        """Partitions without rows (e.g. future months), whose sequential scans cost nothing."""
+        if connection.vendor != 'postgresql':
+            return set()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+                "WHERE child.relkind = 'r'"
+            )
+            partitions = [row[0] for row in cursor.fetchall()]
+            empty = set()
+            for partition in partitions:
+                cursor.execute(f'SELECT NOT EXISTS (SELECT 1 FROM {connection.ops.quote_name(partition)})')
+                if cursor.fetchone()[0]:
+                    empty.add(partition)
+        return empty
+
+    def sequential_scans(self, plan, empty_tables=()):
+        """Return the guarded tables that the plan reads with a full sequential scan."""
+        if connection.vendor == 'postgresql':
+            scanned = set(re.findall(r'Seq Scan on (\w+)', plan)) - set(empty_tables)
+            # Monthly partitions of a table count as the table
+            return [
+                table for table in GUARDED_TABLES
+                if any(name == table or PARTITION.match(name) and name.startswith(f'{table}_') for name in scanned)
+            ]
+        # SQLite reports "SCAN <table>" for full table scans and "SEARCH ... USING INDEX" otherwise
+        return [
+            table for table in GUARDED_TABLES
+            if re.search(rf'\bSCAN (TABLE )?{table}\b(?! USING (COVERING )?INDEX)', plan)
+        ]
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from pets import retention
+
+
+class Command(BaseCommand):
+    help = 'Replace health readings older than the retention period with daily aggregates (also scheduled nightly in celery beat)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            help='Compact readings older than this many months (default: HEALTH_RETENTION_MONTHS; 0 compacts nothing)'
+        )
+        parser.add_argument(
+            '--pet',
+            type=int,
+            action='append',
+            dest='pet_ids',
+            help='Only compact this pet ID (can be repeated)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Readings read and compacted per transaction (default: HEALTH_COMPACTION_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help="Read every pet's whole history again instead of only the days since its last compaction "
+                 '(picks up backfilled readings)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count what would be compacted, without changing anything'
+        )
+
+    def handle(self, *args, **options):
+        if options['months'] is not None and options['months'] < 0:
+            raise CommandError('--months must be 0 or more')
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        pets, readings, aggregates = retention.compact(
+            months=options['months'], pet_ids=options['pet_ids'],
+            batch_size=options['batch_size'], dry_run=options['dry_run'], full=options['full'],
+        )
+
+        verb = 'Would replace' if options['dry_run'] else 'Replaced'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {readings} readings of {pets} pets with {aggregates} daily aggregates'
+        ))
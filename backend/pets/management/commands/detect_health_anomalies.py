@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from pets import anomalies
+
+
+class Command(BaseCommand):
+    help = 'Flag outliers and level shifts in the pets\' numeric health readings (also scheduled hourly in celery beat)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pet',
+            type=int,
+            action='append',
+            dest='pet_ids',
+            help='Only scan this pet ID (can be repeated); leaves the incremental watermark alone'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Scan every pet instead of only those with readings added since the last scan'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Pets loaded and scanned per query (default: HEALTH_ALERT_PET_BATCH_SIZE)'
+        )
+
+    def handle(self, *args, **options):
+        run = anomalies.scan(pet_ids=options['pet_ids'], full=options['full'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Scanned {run.pets_scanned} pets and created {run.alerts_created} alerts (readings up to {run.last_reading_id})'
+        ))
@@ -1,210 +1,341 @@
-import random
-from datetime import datetime, timedelta
-from django.core.management.base import BaseCommand
+import multiprocessing
+from datetime import date, timedelta
+import numpy as np
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
 from django.utils import timezone
+from pets import caching, rollups
+from pets.bulk import delete_rows, insert_rows
 from pets.models import Pet, HealthStatus, Vaccination
 
+HEALTH_COLUMNS = ['pet_id', 'attribute_name', 'value', 'unit', 'mood', 'coat_condition', 'measured_at', 'created_at', 'sample_count']
+
+MOODS = ['Normal', 'Lethargic', 'Hyperactive', 'Aggressive', 'Clingy']
+MOOD_WEIGHTS = [0.75, 0.1, 0.08, 0.03, 0.04]  # Mostly normal
+COAT_CONDITIONS = ['Normal', 'Shedding', 'Hair Loss', 'Dry', 'Dull']
+COAT_WEIGHTS = [0.65, 0.25, 0.03, 0.04, 0.03]
+COLORS = ['Orange', 'Black', 'White', 'Gray', 'Tabby', 'Calico', 'White with Gray patches', 'Golden Tabby']
+
+# The first two pets of every user keep the original Milk and Butter profiles
+NAMED_PETS = [('Milk', 2.6, 'Female', 'White with Gray patches'), ('Butter', 3.8, 'Male', 'Golden Tabby')]
+
+# Common cat vaccinations: (code, name, priority)
+VACCINES = [
+    ('FVRCP', 'Feline Viral Rhinotracheitis, Calicivirus, Panleukopenia', 'Core'),
+    ('Rabies', 'Rabies Vaccine', 'Core'),
+    ('FeLV', 'Feline Leukemia Virus', 'Non-core'),
+    ('FIV', 'Feline Immunodeficiency Virus', 'Non-core'),
+]
+
+
+def pet_profile(seed, user_index, pet_index):
+    """Deterministic name/weight/gender/color for the n-th pet of the n-th user."""
+    if pet_index < len(NAMED_PETS):
+        return NAMED_PETS[pet_index]
+    rng = np.random.default_rng([seed, user_index, pet_index, 0])
+    return (
+        f'Mock pet {pet_index + 1}',
+        round(float(rng.uniform(2.5, 6.0)), 1),
+        str(rng.choice(['Male', 'Female'])),
+        str(rng.choice(COLORS)),
+    )
+
+
+def _timestamps(days, hours, minutes):
+    """Naive UTC 'YYYY-MM-DD HH:MM:SS' strings, the form bulk.insert_rows expects."""
+    moments = days.astype('datetime64[s]') + hours.astype('timedelta64[h]') + minutes.astype('timedelta64[m]')
+    return np.char.replace(np.datetime_as_string(moments, unit='s'), 'T', ' ').tolist()
+
+
+def _rows(pet_id, attribute, times, values=None, unit=None, moods=None, coat_conditions=None):
+    count = len(times)
+    values = values.tolist() if values is not None else [None] * count
+    moods = moods.tolist() if moods is not None else [None] * count
+    coat_conditions = coat_conditions.tolist() if coat_conditions is not None else [None] * count
+    # created_at mirrors measured_at, as on backfilled data, so the dashboard's measured_at windows see a realistic spread
+    return [
+        (pet_id, attribute, value, unit, mood, coat, moment, moment, 1)
+        for value, mood, coat, moment in zip(values, moods, coat_conditions, times)
+    ]
+
+
+def generate_readings(pet_id, base_weight, start_date, days, seed_key):
+    """
+    Build every health reading of one pet over `days` days, vectorized per
+    attribute. The same seed_key always yields the same rows.
+    """
+    rng = np.random.default_rng(seed_key)
+    offsets = np.arange(days)
+    dates = np.datetime64(start_date, 'D') + offsets
+
+    def minutes(count):
+        return rng.integers(0, 60, count)
+
+    rows = []
+
+    # Weight: daily random walk with a subtle yearly cycle, kept within ±10% of the base weight
+    steps = rng.uniform(-0.03, 0.03, days) + 0.002 * np.sin(offsets * 0.017)
+    weights = np.clip(base_weight + np.cumsum(steps), base_weight * 0.9, base_weight * 1.1).round(2)
+    hours = rng.choice([7, 8, 9, 10, 18, 19], days, p=[0.3, 0.4, 0.2, 0.05, 0.03, 0.02])
+    rows += _rows(pet_id, 'Weight', _timestamps(dates, hours, minutes(days)), weights, 'kg')
+
+    # Water intake: cats need ~50ml per kg body weight
+    base_water = int(base_weight * 50)
+    water = rng.integers(base_water - 30, base_water + 81, days)
+    rows += _rows(pet_id, 'Water Intake', _timestamps(dates, rng.integers(6, 23, days), minutes(days)), water, 'ml')
+
+    # Activity level: larger cats are more active, mostly at night
+    base_activity = int(120 + (base_weight - 2.5) * 10)
+    activity = rng.integers(base_activity - 40, base_activity + 61, days)
+    rows += _rows(pet_id, 'Activity Level', _timestamps(dates, rng.integers(18, 24, days), minutes(days)), activity, 'minutes')
+
+    bowel = rng.choice([1, 2, 3], days, p=[0.4, 0.5, 0.1])
+    rows += _rows(pet_id, 'Bowel Movements', _timestamps(dates, rng.integers(8, 21, days), minutes(days)), bowel, 'times')
+
+    urination = rng.choice([2, 3, 4, 5], days, p=[0.3, 0.4, 0.25, 0.05])
+    rows += _rows(pet_id, 'Urination Frequency', _timestamps(dates, rng.integers(7, 22, days), minutes(days)), urination, 'times')
+
+    moods = rng.choice(MOODS, days, p=MOOD_WEIGHTS)
+    rows += _rows(pet_id, 'Mood', _timestamps(dates, rng.integers(9, 22, days), minutes(days)), moods=moods)
+
+    # Coat condition every 3 days, during grooming/inspection time
+    coat_dates = dates[::3]
+    coat = rng.choice(COAT_CONDITIONS, len(coat_dates), p=COAT_WEIGHTS)
+    rows += _rows(pet_id, 'Coat Condition', _timestamps(coat_dates, rng.integers(10, 17, len(coat_dates)), minutes(len(coat_dates))), coat_conditions=coat)
+
+    # Length weekly, with very slow growth for adult cats
+    length_offsets = offsets[::7]
+    base_length = 48 + (base_weight - 2.5) * 3
+    lengths = base_length + length_offsets / 365.0 * 0.5 + rng.uniform(-1.0, 1.0, len(length_offsets))
+    lengths = np.clip(lengths, base_length - 3, base_length + 5).round(1)
+    hours = rng.choice([10, 11, 14, 15], len(length_offsets), p=[0.3, 0.3, 0.2, 0.2])
+    length_minutes = rng.choice([0, 15, 30, 45], len(length_offsets), p=[0.4, 0.2, 0.2, 0.2])
+    rows += _rows(pet_id, 'Length', _timestamps(dates[::7], hours, length_minutes), lengths, 'cm')
+
+    return rows
+
+
+def generate_vaccinations(pet_id, start_date, days, seed_key):
+    rng = np.random.default_rng(seed_key)
+    end_date = start_date + timedelta(days=days - 1)
+    vaccinations = []
+    for code, name, priority in VACCINES:
+        past_date = start_date + timedelta(days=int(rng.integers(30, 181)))
+        vaccinations.append(Vaccination(
+            pet_id=pet_id,
+            vaccination_name=name,
+            vaccinated_at=past_date,
+            schedule_at=past_date,
+            vaccination_status='Completed',
+            vaccination_notes=f'{priority} vaccination - {code} completed successfully. Next due in 12 months.',
+        ))
+        future_date = past_date + timedelta(days=365)
+        if future_date <= end_date:
+            vaccinations.append(Vaccination(
+                pet_id=pet_id,
+                vaccination_name=f'{name} (Annual Booster)',
+                schedule_at=future_date,
+                vaccination_status='Pending',
+                vaccination_notes=f'Annual booster for {code} - {priority} vaccination due for renewal.',
+            ))
+    for vaccination in vaccinations:
+        vaccination.apply_default_schedule()
+    return vaccinations
+
+
+def load_pet(task):
+    """Generate and load one pet's data. Runs in the worker processes."""
+    pet_id, base_weight, start_date, days, seed_key, batch_size = task
+    readings = generate_readings(pet_id, base_weight, start_date, days, seed_key + [1])
+    vaccinations = generate_vaccinations(pet_id, start_date, days, seed_key + [2])
+    with transaction.atomic():
+        for offset in range(0, len(readings), batch_size):
+            insert_rows(HealthStatus, HEALTH_COLUMNS, readings[offset:offset + batch_size])
+        Vaccination.objects.bulk_create(vaccinations)
+    return len(readings), len(vaccinations)
+
 
 class Command(BaseCommand):
-    help = 'Generate mock data for pets with health tracking from 01/06/2024 to 28/06/2025'
+    help = 'Generate deterministic mock pets, health readings and vaccinations for development and load testing'
 
     def add_arguments(self, parser):
         parser.add_argument(
             '--user-id',
             type=int,
             default=1,
-            help='User ID to assign pets to (default: 1)'
+            help='User ID to assign pets to when --users is not given (default: 1)'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            help="Create (or reuse) this many users named mockuser1..N instead of using --user-id"
+        )
+        parser.add_argument(
+            '--password',
+            default='mockpassword',
+            help="Password set on newly created mock users (default: 'mockpassword')"
+        )
+        parser.add_argument(
+            '--pets-per-user',
+            type=int,
+            default=2,
+            help='Number of pets per user (default: 2)'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=393,
+            help='Number of days of history per pet (default: 393)'
+        )
+        parser.add_argument(
+            '--start-date',
+            type=date.fromisoformat,
+            default=date(2024, 6, 1),
+            help='First day of generated history, YYYY-MM-DD (default: 2024-06-01)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed; the same seed always generates the same data (default: 0)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Worker processes generating and loading pets in parallel (default: 1, always 1 on SQLite)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50000,
+            help='Readings loaded per INSERT/COPY statement (default: 50000)'
+        )
+        parser.add_argument(
+            '--skip-rollups',
+            action='store_true',
+            help='Do not rebuild the health rollups afterwards'
         )
 
     def handle(self, *args, **options):
-        user_id = options['user_id']
-        
-        # Check if user exists
-        try:
-            user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
-            self.stdout.write(
-                self.style.ERROR(f'User with ID {user_id} does not exist. Please create a user first.')
-            )
-            return
-
-        # Date range
-        start_date = datetime(2024, 6, 1).date()
-        end_date = datetime(2025, 6, 28).date()
-        
-        self.stdout.write(f'Generating mock data from {start_date} to {end_date}')
-        
-        # Create or get pets
-        pet1 = self.create_or_get_pet(user, 3, "Milk", 2.6)
-        pet2 = self.create_or_get_pet(user, 2, "Butter", 3.8)
-        
-        # Generate health data for both pets
-        self.generate_health_data(pet1, start_date, end_date, base_weight=2.6)
-        self.generate_health_data(pet2, start_date, end_date, base_weight=3.8)
-        
-        # Generate vaccination data
-        self.generate_vaccination_data(pet1, start_date, end_date)
-        self.generate_vaccination_data(pet2, start_date, end_date)
-        
+        if options['days'] < 1 or options['pets_per_user'] < 1:
+            raise CommandError('--days and --pets-per-user must be at least 1.')
+        seed = options['seed']
+        start_date = options['start_date']
+        days = options['days']
+        workers = options['workers']
+        if workers > 1 and connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING('SQLite allows a single writer; using 1 worker'))
+            workers = 1
+
+        users = self.get_users(options)
+        pets = self.get_pets(users, options['pets_per_user'], seed)
+        pet_ids = [pet.id for _, _, pet, _ in pets]
+
         self.stdout.write(
-            self.style.SUCCESS(
-                f'Successfully generated mock data for pets {pet1.name} and {pet2.name}'
-            )
+            f'Generating {days} days of data from {start_date} for {len(pets)} pets of {len(users)} users '
+            f'with {workers} worker(s)'
         )
+        started = timezone.now()
 
-    def create_or_get_pet(self, user, pet_id, name, weight):
-        """Create or get a pet with the specified ID"""
-        pet, created = Pet.objects.get_or_create(
-            id=pet_id,
-            defaults={
-                'name': name,
-                'species': 'Cat',
-                'owner': user,
-                'date_of_birth': datetime(2021, 3, 15).date(),  # 3 years old
-                'gender': random.choice(['Male', 'Female']),
-                'color': random.choice(['Orange', 'Black', 'White', 'Gray', 'Tabby', 'Calico']),
-                'medical_conditions': 'None',
-                'microchip_number': f'CAT{pet_id:06d}'
-            }
-        )
-        
-        if created:
-            self.stdout.write(f'Created pet: {pet.name} (ID: {pet.id})')
+        # Re-running with the same options replaces the previous mock data instead of duplicating it
+        with transaction.atomic():
+            delete_rows(HealthStatus.objects.filter(pet_id__in=pet_ids))
+            delete_rows(Vaccination.objects.filter(pet_id__in=pet_ids))
+
+        tasks = [
+            (pet.id, base_weight, start_date, days, [seed, user_index, pet_index], options['batch_size'])
+            for user_index, pet_index, pet, base_weight in pets
+        ]
+        if workers > 1:
+            # Forked children must not share the parent's database connections
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(workers) as pool:
+                results = pool.map(load_pet, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
         else:
-            self.stdout.write(f'Using existing pet: {pet.name} (ID: {pet.id})')
-            
-        return pet
-
-    def generate_health_data(self, pet, start_date, end_date, base_weight):
-        """Generate realistic health data for a pet"""
-        current_date = start_date
-        
-        # Clear ALL existing health data for this pet (not just date range)
-        deleted_count = HealthStatus.objects.filter(pet=pet).delete()[0]
-        if deleted_count > 0:
-            self.stdout.write(f'Cleared {deleted_count} existing health records for {pet.name}')
-        
-        # Weight tracking (varies slightly around base weight)
-        weight_variance = base_weight * 0.1  # 10% variance
-        current_weight = base_weight
-        
-        while current_date <= end_date:
-            # Weight (daily, with gradual changes)
-            weight_change = random.uniform(-0.05, 0.05)  # Daily change
-            current_weight += weight_change
-            current_weight = max(base_weight - weight_variance, 
-                               min(base_weight + weight_variance, current_weight))
-            
-            self.create_health_record(pet, current_date, 'Weight', round(current_weight, 2), 'kg')
-            
-            # Water intake (daily)
-            base_water = 200 if base_weight > 3.0 else 150  # ml per day
-            water_intake = random.randint(base_water - 50, base_water + 100)
-            self.create_health_record(pet, current_date, 'Water Intake', water_intake, 'ml')
-            
-            # Activity level (daily)
-            # Cats are more active in evening/night
-            base_activity = 120 if base_weight > 3.0 else 90  # minutes per day
-            activity_level = random.randint(base_activity - 30, base_activity + 60)
-            self.create_health_record(pet, current_date, 'Activity Level', activity_level, 'minutes')
-            
-            # Bowel movements (daily)
-            bowel_movements = random.randint(1, 3)
-            self.create_health_record(pet, current_date, 'Bowel Movements', bowel_movements, 'times')
-            
-            # Urination frequency (daily)
-            urination = random.randint(2, 5)
-            self.create_health_record(pet, current_date, 'Urination Frequency', urination, 'times')
-            
-            # Mood (daily)
-            mood_choices = ['Normal', 'Lethargic', 'Hyperactive', 'Aggressive', 'Clingy']
-            mood_weights = [0.7, 0.1, 0.1, 0.05, 0.05]  # Normal is most common
-            mood = random.choices(mood_choices, weights=mood_weights)[0]
-            
-            HealthStatus.objects.create(
-                pet=pet,
-                attribute_name='Mood',
-                measured_at=timezone.make_aware(
-                    datetime.combine(current_date, datetime.min.time())
-                ),
-                mood=mood
+            results = [load_pet(task) for task in tasks]
+
+        readings = sum(result[0] for result in results)
+        vaccinations = sum(result[1] for result in results)
+        elapsed = (timezone.now() - started).total_seconds()
+        self.stdout.write(
+            f'Loaded {readings} health records and {vaccinations} vaccinations in {elapsed:.1f}s '
+            f'({readings / elapsed if elapsed else readings:.0f} rows/s)'
+        )
+
+        if not options['skip_rollups']:
+            # Bulk loads bypass the signals that maintain rollups incrementally
+            self.stdout.write('Rebuilding health rollups')
+            rollups.rebuild(pet_ids=pet_ids)
+        caching.invalidate_overview(*[user.id for _, user in users])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully generated mock data for {len(pets)} pets of {len(users)} users'
+        ))
+
+    def get_users(self, options):
+        """Return (user_index, user) pairs, creating the mock users that don't exist yet."""
+        if options['users'] is None:
+            try:
+                return [(0, User.objects.get(id=options['user_id']))]
+            except User.DoesNotExist:
+                raise CommandError(f"User with ID {options['user_id']} does not exist. Please create a user first.")
+
+        usernames = [f'mockuser{i}' for i in range(1, options['users'] + 1)]
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        # Hashing once keeps creating thousands of users fast; they all share the password anyway
+        password = make_password(options['password'])
+        User.objects.bulk_create([
+            User(username=username, email=f'{username}@example.com', password=password)
+            for username in usernames if username not in existing
+        ])
+        users = User.objects.in_bulk(usernames, field_name='username')
+        return [(i, users[username]) for i, username in enumerate(usernames, start=1)]
+
+    def get_pets(self, users, pets_per_user, seed):
+        """
+        Return (user_index, pet_index, pet, base_weight) tuples. Mock pets are
+        identified by their owner and MOCK microchip number, so re-runs reuse them.
+        """
+        wanted = {}
+        for user_index, user in users:
+            for pet_index in range(pets_per_user):
+                wanted[(user.id, f'MOCK{user_index:07d}{pet_index:04d}')] = (user_index, pet_index, user)
+
+        existing = {
+            (pet.owner_id, pet.microchip_number): pet
+            for pet in Pet.objects.filter(
+                owner_id__in=[user.id for _, user in users],
+                microchip_number__startswith='MOCK',
             )
-            
-            # Coat condition (every 3 days)
-            if (current_date - start_date).days % 3 == 0:
-                coat_choices = ['Normal', 'Shedding', 'Hair Loss', 'Dry', 'Dull']
-                coat_weights = [0.6, 0.25, 0.05, 0.05, 0.05]
-                coat = random.choices(coat_choices, weights=coat_weights)[0]
-                
-                HealthStatus.objects.create(
-                    pet=pet,
-                    attribute_name='Coat Condition',
-                    measured_at=timezone.make_aware(
-                        datetime.combine(current_date, datetime.min.time())
-                    ),
-                    coat_condition=coat
-                )
-            
-            # Length measurement (once a week)
-            if (current_date - start_date).days % 7 == 0:
-                base_length = 50 if base_weight > 3.0 else 45  # cm
-                length_variance = random.uniform(-2, 2)
-                length = round(base_length + length_variance, 1)
-                self.create_health_record(pet, current_date, 'Length', length, 'cm')
-            
-            current_date += timedelta(days=1)
-        
-        self.stdout.write(f'Generated health data for {pet.name}')
-
-    def create_health_record(self, pet, date, attribute, value, unit):
-        """Helper method to create a health record"""
-        HealthStatus.objects.create(
-            pet=pet,
-            attribute_name=attribute,
-            value=value,
-            unit=unit,
-            measured_at=timezone.make_aware(
-                datetime.combine(date, datetime.min.time())
+        }
+        missing = []
+        for key, (user_index, pet_index, user) in wanted.items():
+            if key not in existing:
+                name, _, gender, color = pet_profile(seed, user_index, pet_index)
+                missing.append(Pet(
+                    name=name,
+                    species='Cat',
+                    owner=user,
+                    date_of_birth=date(2021, 3, 15),
+                    gender=gender,
+                    color=color,
+                    medical_conditions='None',
+                    microchip_number=key[1],
+                ))
+        # Re-read rather than trusting bulk_create to return primary keys on every backend
+        Pet.objects.bulk_create(missing)
+        existing = {
+            (pet.owner_id, pet.microchip_number): pet
+            for pet in Pet.objects.filter(
+                owner_id__in=[user.id for _, user in users],
+                microchip_number__startswith='MOCK',
             )
-        )
+        }
 
-    def generate_vaccination_data(self, pet, start_date, end_date):
-        """Generate vaccination records for a pet"""
-        # Clear ALL existing vaccination data for this pet
-        deleted_count = Vaccination.objects.filter(pet=pet).delete()[0]
-        if deleted_count > 0:
-            self.stdout.write(f'Cleared {deleted_count} existing vaccination records for {pet.name}')
-        
-        # Common cat vaccinations
-        vaccinations = [
-            ('FVRCP', 'Feline Viral Rhinotracheitis, Calicivirus, Panleukopenia'),
-            ('Rabies', 'Rabies vaccine'),
-            ('FeLV', 'Feline Leukemia'),
-            ('FIV', 'Feline Immunodeficiency Virus'),
+        return [
+            (user_index, pet_index, existing[key], pet_profile(seed, user_index, pet_index)[1])
+            for key, (user_index, pet_index, _) in wanted.items()
         ]
-        
-        for vaccine_code, vaccine_name in vaccinations:
-            # Past vaccination (completed)
-            past_date = start_date + timedelta(days=random.randint(30, 180))
-            Vaccination.objects.create(
-                pet=pet,
-                vaccination_name=vaccine_name,
-                vaccinated_at=past_date,
-                schedule_at=past_date,
-                vaccination_status='Completed',
-                vaccination_notes=f'Annual {vaccine_code} vaccination completed successfully'
-            )
-            
-            # Future vaccination (pending) - annual booster
-            future_date = past_date + timedelta(days=365)
-            if future_date <= end_date:
-                Vaccination.objects.create(
-                    pet=pet,
-                    vaccination_name=f'{vaccine_name} (Booster)',
-                    schedule_at=future_date,
-                    vaccination_status='Pending',
-                    vaccination_notes=f'Annual booster for {vaccine_code} due'
-                )
-        
-        self.stdout.write(f'Generated vaccination data for {pet.name}') 
\ No newline at end of file
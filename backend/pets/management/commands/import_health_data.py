@@ -0,0 +1,290 @@
+import csv
+import json
+import sys
+from datetime import datetime, time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from pets import caching, rollups
+from pets.bulk import insert_rows
+from pets.models import Pet, HealthStatus, Vaccination
+
+HEALTH_COLUMNS = [
+    'pet_id', 'attribute_name', 'value', 'unit', 'mood', 'coat_condition', 'measured_at', 'created_at',
+    'sample_count', 'min_value', 'max_value',
+]
+VACCINATION_COLUMNS = ['pet_id', 'vaccination_name', 'vaccination_status', 'vaccinated_at', 'schedule_at', 'vaccination_notes', 'tag_proof', 'tag_proof_variants']
+
+ATTRIBUTES = {choice[0] for choice in HealthStatus.ATTRIBUTE_CHOICES}
+MOODS = {choice[0] for choice in HealthStatus.MOOD_CHOICES}
+COAT_CONDITIONS = {choice[0] for choice in HealthStatus.COAT_CONDITION_CHOICES}
+VACCINATION_STATUSES = {choice[0] for choice in Vaccination._meta.get_field('vaccination_status').choices}
+
+
+class RowError(ValueError):
+    pass
+
+
+def _blank(value):
+    return value is None or value == ''
+
+
+def _text(row, name, max_length=None, required=False):
+    value = row.get(name)
+    if _blank(value):
+        if required:
+            raise RowError(f'{name} is required')
+        return None
+    value = str(value)
+    if max_length is not None and len(value) > max_length:
+        raise RowError(f'{name} is longer than {max_length} characters')
+    return value
+
+
+def _choice(row, name, choices, default=None, required=False):
+    value = row.get(name)
+    if _blank(value):
+        if required:
+            raise RowError(f'{name} is required')
+        return default
+    if value not in choices:
+        raise RowError(f'{name} must be one of: {", ".join(sorted(choices))}')
+    return value
+
+
+def _float(row, name):
+    value = row.get(name)
+    if _blank(value):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise RowError(f'{name} must be a number')
+
+
+def _count(row, name, default=1):
+    value = row.get(name)
+    if _blank(value):
+        return default
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        count = 0
+    if count < 1:
+        raise RowError(f'{name} must be a positive integer')
+    return count
+
+
+def _datetime(row, name, default=None):
+    value = row.get(name)
+    if _blank(value):
+        return default
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise RowError(f'{name} must be an ISO 8601 datetime')
+        moment = datetime.combine(day, time.min)
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+def _date(row, name):
+    value = row.get(name)
+    if _blank(value):
+        return None
+    day = parse_date(value[:10])
+    if day is None:
+        raise RowError(f'{name} must be an ISO 8601 date')
+    return day
+
+
+def build_health_status(row, pet_id, now):
+    reading = HealthStatus(
+        pet_id=pet_id,
+        attribute_name=_choice(row, 'attribute_name', ATTRIBUTES, required=True),
+        value=_float(row, 'value'),
+        unit=_text(row, 'unit', 20),
+        mood=_choice(row, 'mood', MOODS),
+        coat_condition=_choice(row, 'coat_condition', COAT_CONDITIONS),
+        measured_at=_datetime(row, 'measured_at', default=now),
+        created_at=_datetime(row, 'created_at', default=now),
+        # Set on the daily aggregates of compacted history, as exported
+        sample_count=_count(row, 'sample_count'),
+        min_value=_float(row, 'min_value'),
+        max_value=_float(row, 'max_value'),
+    )
+    # Same unit defaulting as HealthStatus.save
+    reading.apply_default_unit()
+    return reading
+
+
+def build_vaccination(row, pet_id, now):
+    vaccination = Vaccination(
+        pet_id=pet_id,
+        vaccination_name=_text(row, 'vaccination_name', 100, required=True),
+        vaccination_status=_choice(row, 'vaccination_status', VACCINATION_STATUSES, default='Unknown'),
+        vaccinated_at=_date(row, 'vaccinated_at'),
+        schedule_at=_date(row, 'schedule_at'),
+        vaccination_notes=_text(row, 'vaccination_notes'),
+        tag_proof='',
+    )
+    # Same schedule_at defaulting as Vaccination.save
+    vaccination.apply_default_schedule()
+    return vaccination
+
+
+RECORD_TYPES = {
+    'health': (HealthStatus, HEALTH_COLUMNS, build_health_status),
+    'vaccination': (Vaccination, VACCINATION_COLUMNS, build_vaccination),
+}
+
+
+class Command(BaseCommand):
+    help = 'Bulk import HealthStatus/Vaccination records from CSV or NDJSON (e.g. the output of /api/pets/{id}/export/)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help="File to import, or '-' to read from stdin"
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'ndjson'],
+            help='Input format (default: guessed from the file extension, csv otherwise)'
+        )
+        parser.add_argument(
+            '--record-type',
+            choices=list(RECORD_TYPES),
+            help="Record type of rows without a 'record_type' column (default: health)"
+        )
+        parser.add_argument(
+            '--pet-id',
+            type=int,
+            help='Load every row into this pet, ignoring the pet_id column'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Rows validated and loaded per transaction (default: 10000)'
+        )
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='Abort on the first invalid row instead of skipping it'
+        )
+
+    def handle(self, *args, **options):
+        self.strict = options['strict']
+        self.default_record_type = options['record_type'] or 'health'
+        self.forced_pet_id = options['pet_id']
+        self.known_pet_ids = set()
+
+        if self.forced_pet_id is not None:
+            if not Pet.objects.filter(pk=self.forced_pet_id).exists():
+                raise CommandError(f'Pet with ID {self.forced_pet_id} does not exist.')
+            self.known_pet_ids.add(self.forced_pet_id)
+
+        path = options['path']
+        input_format = options['format'] or ('ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv')
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+
+        self.loaded = {record_type: 0 for record_type in RECORD_TYPES}
+        self.skipped = 0
+        self.affected_pet_ids = set()
+        started = timezone.now()
+        try:
+            rows = self.read_csv(stream) if input_format == 'csv' else self.read_ndjson(stream)
+            chunk = []
+            for line_number, row in rows:
+                chunk.append((line_number, row))
+                if len(chunk) >= options['chunk_size']:
+                    self.load_chunk(chunk)
+                    chunk = []
+            if chunk:
+                self.load_chunk(chunk)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        if self.loaded['health']:
+            # Bulk loads bypass the signals that maintain rollups incrementally
+            self.stdout.write('Rebuilding health rollups for imported pets')
+            rollups.rebuild(pet_ids=self.affected_pet_ids)
+        owner_ids = Pet.objects.filter(pk__in=self.affected_pet_ids).values_list('owner_id', flat=True).distinct()
+        caching.invalidate_overview(*owner_ids)
+
+        elapsed = (timezone.now() - started).total_seconds()
+        total = sum(self.loaded.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {self.loaded['health']} health records and {self.loaded['vaccination']} vaccinations "
+            f"({self.skipped} skipped) in {elapsed:.1f}s ({total / elapsed if elapsed else total:.0f} rows/s)"
+        ))
+
+    def read_csv(self, stream):
+        for index, row in enumerate(csv.DictReader(stream), start=2):  # Line 1 is the header
+            yield index, row
+
+    def read_ndjson(self, stream):
+        for index, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                self.reject(index, f'invalid JSON: {e}')
+                continue
+            # Normalise to the string form CSV rows arrive in
+            yield index, {key: value if value is None or isinstance(value, str) else str(value) for key, value in row.items()}
+
+    def reject(self, line_number, message):
+        if self.strict:
+            raise CommandError(f'Line {line_number}: {message}')
+        self.skipped += 1
+        if self.skipped <= 20:
+            self.stderr.write(f'Skipping line {line_number}: {message}')
+
+    def load_chunk(self, chunk):
+        # Check every pet referenced by the chunk with a single query
+        if self.forced_pet_id is None:
+            pet_ids = set()
+            for _, row in chunk:
+                try:
+                    pet_ids.add(int(row.get('pet_id') or row.get('pet')))
+                except (TypeError, ValueError):
+                    pass
+            missing = pet_ids - self.known_pet_ids
+            if missing:
+                self.known_pet_ids.update(Pet.objects.filter(pk__in=missing).values_list('pk', flat=True))
+
+        now = timezone.now()
+        records = {record_type: [] for record_type in RECORD_TYPES}
+        for line_number, row in chunk:
+            record_type = row.get('record_type') or self.default_record_type
+            if record_type not in RECORD_TYPES:
+                self.reject(line_number, f'unknown record_type {record_type!r}')
+                continue
+            try:
+                pet_id = self.forced_pet_id if self.forced_pet_id is not None else int(row.get('pet_id') or row.get('pet'))
+            except (TypeError, ValueError):
+                self.reject(line_number, 'pet_id must be an integer')
+                continue
+            if pet_id not in self.known_pet_ids:
+                self.reject(line_number, f'pet {pet_id} does not exist')
+                continue
+            try:
+                records[record_type].append(RECORD_TYPES[record_type][2](row, pet_id, now))
+            except RowError as e:
+                self.reject(line_number, str(e))
+
+        with transaction.atomic():
+            for record_type, objects in records.items():
+                if not objects:
+                    continue
+                model, columns, _ = RECORD_TYPES[record_type]
+                fields = [model._meta.get_field(column) for column in columns]
+                # COPY on PostgreSQL; either way created_at keeps the file's value instead of auto_now_add's
+                insert_rows(model, columns, ([field.get_prep_value(getattr(obj, field.attname)) for field in fields] for obj in objects))
+                self.loaded[record_type] += len(objects)
+                self.affected_pet_ids.update(obj.pet_id for obj in objects)
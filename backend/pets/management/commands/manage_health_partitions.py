@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from pets import partitions
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming monthly HealthStatus partitions and drop expired ones on PostgreSQL (also scheduled daily in celery beat)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            help='Months after the current one to create partitions for (default: HEALTH_PARTITION_MONTHS_AHEAD)'
+        )
+        parser.add_argument(
+            '--retention-months',
+            type=int,
+            help='Drop the partitions that ended more than this many months ago, readings, alerts and rollups '
+                 '(default: HEALTH_PARTITION_RETENTION_MONTHS; 0 keeps them all)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only list the partitions that would be created and dropped'
+        )
+
+    def handle(self, *args, **options):
+        if not partitions.is_partitioned():
+            self.stdout.write('The health readings table is not partitioned (PostgreSQL only); nothing to do')
+            return
+
+        months_ahead = options['months_ahead']
+        if months_ahead is None:
+            months_ahead = settings.HEALTH_PARTITION_MONTHS_AHEAD
+        retention_months = options['retention_months']
+        if retention_months is None:
+            retention_months = settings.HEALTH_PARTITION_RETENTION_MONTHS
+        if months_ahead < 0 or retention_months < 0:
+            raise CommandError('--months-ahead and --retention-months must be 0 or more')
+
+        created, dropped = partitions.maintain(months_ahead, retention_months, dry_run=options['dry_run'])
+
+        create, drop = ('Would create', 'drop') if options['dry_run'] else ('Created', 'dropped')
+        self.stdout.write(self.style.SUCCESS(
+            f"{create} {len(created)} partitions ({', '.join(created) or 'none'}) "
+            f"and {drop} {len(dropped)} ({', '.join(dropped) or 'none'})"
+        ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from pets import caching, rollups
+from pets.models import Pet
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the hourly/daily/weekly HealthStatus rollups from the raw readings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pet',
+            type=int,
+            action='append',
+            dest='pet_ids',
+            help='Only rebuild rollups for this pet ID (can be repeated)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows fetched and inserted per batch (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        pet_ids = options['pet_ids']
+        scope = f"pets {', '.join(map(str, pet_ids))}" if pet_ids else 'all pets'
+        self.stdout.write(f'Rebuilding health rollups for {scope}')
+
+        written = rollups.rebuild(pet_ids=pet_ids, batch_size=options['batch_size'])
+
+        pets = Pet.objects.filter(pk__in=pet_ids) if pet_ids else Pet.objects.all()
+        caching.invalidate_overview(*pets.values_list('owner_id', flat=True).distinct())
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully wrote {written} rollup rows'))
@@ -0,0 +1,40 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from pets import reminders
+
+
+class Command(BaseCommand):
+    help = 'Mark overdue vaccinations and email owners about the vaccinations due soon (also scheduled daily in celery beat)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Run as if today were this date (YYYY-MM-DD, default: today)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Emails sent per batch over one SMTP connection (default: VACCINATION_REMINDER_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count what would be marked and sent, without changing or sending anything'
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']} (expected YYYY-MM-DD)")
+
+        overdue, emails, vaccinations = reminders.send_reminders(
+            today=today, batch_size=options['batch_size'], dry_run=options['dry_run'],
+        )
+
+        verb = 'Would send' if options['dry_run'] else 'Sent'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {emails} reminder emails covering {vaccinations} vaccinations; {overdue} marked overdue'
+        ))
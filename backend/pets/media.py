@@ -0,0 +1,46 @@
+import mimetypes
+import os
+from urllib.parse import quote
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def media_etag(stat):
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+
+
+def serve_media(request, name, storage=default_storage):
+    """
+    Serve an uploaded file once the caller has checked access to it.
+
+    Answers conditional requests with 304, and with MEDIA_ACCEL_REDIRECT on
+    hands the transfer to nginx through X-Accel-Redirect instead of streaming
+    the bytes through a Django worker. Returns None if the file is missing.
+    """
+    try:
+        stat = os.stat(storage.path(name))
+    except (FileNotFoundError, NotImplementedError):
+        return None
+
+    etag = media_etag(stat)
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        content_type, encoding = mimetypes.guess_type(name)
+        content_type = content_type or 'application/octet-stream'
+        if getattr(settings, 'MEDIA_ACCEL_REDIRECT', False):
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + quote(name)
+        else:
+            response = FileResponse(storage.open(name, 'rb'), content_type=content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, max_age=getattr(settings, 'MEDIA_CACHE_MAX_AGE', 0))
+    return response
@@ -0,0 +1,82 @@
+import os
+import resource
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+
+# With PROMETHEUS_MULTIPROC_DIR set (see gunicorn.conf.py) every worker process
+# writes its samples to files in that directory and /metrics adds them up.
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Request latency by DRF view/action',
+    ['view', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter(
+    'http_requests_total',
+    'Requests by DRF view/action and response status',
+    ['view', 'method', 'status'],
+)
+DB_QUERIES = Counter(
+    'db_queries_total',
+    'SQL statements executed while handling requests',
+    ['view'],
+)
+DB_QUERY_SECONDS = Counter(
+    'db_query_duration_seconds_total',
+    'Time spent in SQL statements while handling requests',
+    ['view'],
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Cache lookups by result; hit ratio = hit / (hit + miss)',
+    ['cache', 'result'],
+)
+IN_FLIGHT = Gauge(
+    'http_requests_in_flight',
+    'Requests currently being handled',
+    multiprocess_mode='livesum',
+)
+RESIDENT_MEMORY = Gauge(
+    'worker_resident_memory_bytes',
+    'Resident set size of each worker process',
+    multiprocess_mode='liveall',
+)
+
+
+def view_label(request):
+    """'ViewSet.action' for DRF viewsets, the view's name otherwise."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    func = match.func
+    view_class = getattr(func, 'cls', None) or getattr(func, 'view_class', None)
+    if view_class is None:
+        return getattr(func, '__name__', 'unknown')
+    actions = getattr(func, 'actions', None)
+    if actions:
+        action = actions.get(request.method.lower())
+        if action:
+            return f'{view_class.__name__}.{action}'
+    return view_class.__name__
+
+
+def resident_memory_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # Peak rather than current RSS, but the best available without /proc
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def record_cache_lookup(cache_name, hit):
+    CACHE_REQUESTS.labels(cache=cache_name, result='hit' if hit else 'miss').inc()
+
+
+def render():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
@@ -0,0 +1,163 @@
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRecorder:
+    """connection.execute_wrapper that counts and times every statement."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            # Parameters are left out on purpose: the same SQL with different
+            # parameters over and over is what an N+1 looks like
+            self.statements[sql] += 1
+
+    def repeated(self, threshold):
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+class RecordingMiddleware:
+    """
+    Base for middleware that records the SQL of each request. Works under
+    WSGI and ASGI: in async mode the ORM runs on the request's sync thread
+    (database connections are per thread), so the wrappers are installed
+    and removed there.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        self.started(request)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                self.install(stack, recorder)
+                response = self.get_response(request)
+        finally:
+            self.finished(request)
+        return self.process(request, response, recorder, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        self.started(request)
+        start = time.perf_counter()
+        stack = ExitStack()
+        try:
+            await sync_to_async(self.install)(stack, recorder)
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            self.finished(request)
+        return self.process(request, response, recorder, time.perf_counter() - start)
+
+    def install(self, stack, recorder):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+
+    def started(self, request):
+        pass
+
+    def finished(self, request):
+        pass
+
+    def process(self, request, response, recorder, duration):
+        return response
+
+
+class QueryInstrumentationMiddleware(RecordingMiddleware):
+    """
+    Count the SQL queries and DB time of every request, flag statements that
+    repeat often enough to be an N+1, and report it all in a Server-Timing
+    header and one structured log line. Enabled by SQL_INSTRUMENTATION_ENABLED.
+
+    Queries run while a streaming response is being consumed happen after the
+    middleware has returned, so they are not counted.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SQL_INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.repeat_threshold = settings.SQL_INSTRUMENTATION_REPEAT_THRESHOLD
+
+    def process(self, request, response, recorder, duration):
+        db_ms = recorder.duration * 1000
+        total_ms = duration * 1000
+        repeated = recorder.repeated(self.repeat_threshold)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={db_ms:.1f};desc="{recorder.count} queries"',
+            f'app;dur={total_ms - db_ms:.1f}',
+            f'total;dur={total_ms:.1f}',
+        ])
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_ms': round(db_ms, 2),
+            'total_ms': round(total_ms, 2),
+            'repeated_queries': [{'sql': sql[:500], 'count': count} for sql, count in repeated],
+        }
+        if repeated:
+            logger.warning('Possible N+1 queries: %s', json.dumps(record))
+        else:
+            logger.info('SQL queries: %s', json.dumps(record))
+        return response
+
+
+class MetricsMiddleware(RecordingMiddleware):
+    """
+    Feed the Prometheus metrics served at /metrics: latency, status counts and
+    DB usage per DRF view/action, in-flight requests and worker RSS.
+    Enabled by METRICS_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def started(self, request):
+        metrics.IN_FLIGHT.inc()
+
+    def finished(self, request):
+        metrics.IN_FLIGHT.dec()
+
+    def process(self, request, response, recorder, duration):
+        view = metrics.view_label(request)
+        metrics.REQUEST_LATENCY.labels(view=view, method=request.method).observe(duration)
+        metrics.REQUESTS.labels(view=view, method=request.method, status=response.status_code).inc()
+        if recorder.count:
+            metrics.DB_QUERIES.labels(view=view).inc(recorder.count)
+            metrics.DB_QUERY_SECONDS.labels(view=view).inc(recorder.duration)
+        metrics.RESIDENT_MEMORY.set(metrics.resident_memory_bytes())
+        return response
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.4 on 2026-10-18 15:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0009_vaccination_schedule_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HealthStatusRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attribute_name', models.CharField(choices=[('Weight', 'Weight (kg)'), ('Length', 'Length (cm)'), ('Water Intake', 'Water Intake (ml)'), ('Activity Level', 'Activity Level (minutes)'), ('Mood', 'Mood'), ('Bowel Movements', 'Bowel Movements (times)'), ('Urination Frequency', 'Urination Frequency (times)'), ('Coat Condition', 'Coat Condition')], max_length=50)),
+                ('resolution', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily'), ('week', 'Weekly')], max_length=10)),
+                ('bucket_start', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('min_value', models.FloatField(blank=True, null=True)),
+                ('max_value', models.FloatField(blank=True, null=True)),
+                ('mean_value', models.FloatField(blank=True, null=True)),
+                ('last_value', models.FloatField(blank=True, null=True)),
+                ('last_measured_at', models.DateTimeField(blank=True, null=True)),
+                ('pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='health_rollups', to='pets.pet')),
+            ],
+            options={
+                'unique_together': {('pet', 'attribute_name', 'resolution', 'bucket_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.4 on 2026-10-18 15:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0010_healthstatusrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='healthstatus',
+            index=models.Index(fields=['pet', 'measured_at'], name='healthstatus_pet_measured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='healthstatus',
+            index=models.Index(fields=['pet', 'attribute_name', 'measured_at'], name='healthstatus_pet_attr_meas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='healthstatus',
+            index=models.Index(fields=['pet', 'created_at'], name='healthstatus_pet_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vaccination',
+            index=models.Index(fields=['pet', 'schedule_at'], name='vaccination_pet_schedule_idx'),
+        ),
+    ]
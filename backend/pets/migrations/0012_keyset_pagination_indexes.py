@@ -0,0 +1,29 @@
+# Generated by Django 4.2.4 on 2026-10-18 15:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0011_healthstatus_vaccination_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='healthstatus',
+            name='healthstatus_pet_measured_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='vaccination',
+            name='vaccination_pet_schedule_idx',
+        ),
+        migrations.AddIndex(
+            model_name='healthstatus',
+            index=models.Index(fields=['pet', 'measured_at', 'id'], name='healthstatus_pet_measured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vaccination',
+            index=models.Index(fields=['pet', 'schedule_at', 'id'], name='vaccination_pet_schedule_idx'),
+        ),
+    ]
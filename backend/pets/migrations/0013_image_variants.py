@@ -0,0 +1,23 @@
+# Generated by Django 4.2.4 on 2026-10-18 15:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0012_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pet',
+            name='avatar_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='vaccination',
+            name='tag_proof_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.4 on 2026-10-18 16:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0013_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vaccination',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='vaccination',
+            name='vaccination_status',
+            field=models.CharField(choices=[('Completed', 'Completed'), ('Pending', 'Pending'), ('Overdue', 'Overdue'), ('Unknown', 'Unknown')], max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='vaccination',
+            index=models.Index(fields=['vaccination_status', 'schedule_at'], name='vaccination_status_sched_idx'),
+        ),
+    ]
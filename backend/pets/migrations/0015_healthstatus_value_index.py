@@ -0,0 +1,17 @@
+# Generated by Django 4.2.4 on 2026-10-18 16:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0014_vaccination_reminders'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='healthstatus',
+            index=models.Index(fields=['pet', 'attribute_name', 'value'], name='healthstatus_pet_attr_val_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.4 on 2026-10-18 16:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0015_healthstatus_value_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HealthAlertScan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('last_reading_id', models.BigIntegerField(default=0)),
+                ('pets_scanned', models.PositiveIntegerField(default=0)),
+                ('alerts_created', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HealthAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attribute_name', models.CharField(choices=[('Weight', 'Weight (kg)'), ('Length', 'Length (cm)'), ('Water Intake', 'Water Intake (ml)'), ('Activity Level', 'Activity Level (minutes)'), ('Mood', 'Mood'), ('Bowel Movements', 'Bowel Movements (times)'), ('Urination Frequency', 'Urination Frequency (times)'), ('Coat Condition', 'Coat Condition')], max_length=50)),
+                ('kind', models.CharField(choices=[('zscore', 'Outlier against the recent readings'), ('change_point', 'Sustained shift in level')], max_length=20)),
+                ('reading_id', models.BigIntegerField()),
+                ('value', models.FloatField()),
+                ('measured_at', models.DateTimeField()),
+                ('baseline', models.FloatField()),
+                ('score', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='health_alerts', to='pets.pet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['pet', 'measured_at'], name='healthalert_pet_measured_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='healthalert',
+            constraint=models.UniqueConstraint(fields=('reading_id', 'kind'), name='healthalert_reading_kind_uniq'),
+        ),
+    ]
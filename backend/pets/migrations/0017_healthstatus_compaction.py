@@ -0,0 +1,28 @@
+# Generated by Django 4.2.4 on 2026-10-18 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0016_health_alerts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='healthstatus',
+            name='max_value',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='healthstatus',
+            name='min_value',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='healthstatus',
+            name='sample_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 4.2.4 on 2026-10-18 16:23
+
+from datetime import datetime, timezone
+from django.db import migrations
+
+TABLE = 'pets_healthstatus'
+SWAP_TABLE = 'pets_healthstatus_swap'
+MONTHS_AHEAD = 3  # Later months are created by manage_health_partitions
+
+
+def month(index):
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def month_index(moment):
+    return moment.year * 12 + moment.month - 1
+
+
+def swap_in(cursor):
+    """
+    Copy every reading into SWAP_TABLE, drop the old table and give the new
+    one its name, along with the old table's secondary indexes, foreign keys
+    and id sequence position.
+
+    An identity id brings its own sequence to SWAP_TABLE (LIKE ... INCLUDING
+    IDENTITY), which is renamed after the old one. A serial id (tables
+    created before Django 4.1) keeps the old table's sequence: SWAP_TABLE's
+    copied default already uses it, so it is handed over to SWAP_TABLE
+    before the old table, which owns it, is dropped.
+    """
+    cursor.execute("SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s AND indexname <> %s", [TABLE, f'{TABLE}_pkey'])
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'", [TABLE])
+    foreign_keys = cursor.fetchall()
+    cursor.execute(
+        "SELECT pg_get_serial_sequence(%s, 'id'), attidentity <> '' FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'id'",
+        [TABLE, TABLE],
+    )
+    sequence, identity = cursor.fetchone()
+
+    cursor.execute(f'INSERT INTO {SWAP_TABLE} SELECT * FROM {TABLE}')
+    if not identity:
+        cursor.execute(f'ALTER SEQUENCE {sequence} OWNED BY {SWAP_TABLE}.id')
+    cursor.execute(f'DROP TABLE {TABLE}')
+    cursor.execute(f'ALTER TABLE {SWAP_TABLE} RENAME TO {TABLE}')
+    cursor.execute(f'ALTER TABLE {TABLE} RENAME CONSTRAINT {SWAP_TABLE}_pkey TO {TABLE}_pkey')
+    if identity:
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [TABLE])
+        cursor.execute(f'ALTER SEQUENCE {cursor.fetchone()[0]} RENAME TO {TABLE}_id_seq')
+    else:
+        cursor.execute(f'ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)', [sequence])
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}')
+    for definition in indexes:
+        cursor.execute(definition)
+    cursor.execute(f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {TABLE}")
+
+
+def partition(apps, schema_editor):
+    """
+    Rebuild pets_healthstatus as a table range partitioned by month on
+    measured_at: one partition per month from the oldest reading to
+    MONTHS_AHEAD months from now, plus a default partition. PostgreSQL
+    needs the partition key in the primary key, so it becomes (id,
+    measured_at). Rewrites the whole table while holding it locked.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE {SWAP_TABLE} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING IDENTITY) '
+            'PARTITION BY RANGE (measured_at)'
+        )
+        cursor.execute(f'ALTER TABLE {SWAP_TABLE} ADD PRIMARY KEY (id, measured_at)')
+
+        now = datetime.now(timezone.utc)
+        cursor.execute(f'SELECT MIN(measured_at), MAX(measured_at) FROM {TABLE}')
+        oldest, newest = cursor.fetchone()
+        last = max(month_index(newest or now), month_index(now)) + MONTHS_AHEAD
+        for index in range(month_index(oldest or now), last + 1):
+            cursor.execute(
+                f'CREATE TABLE {TABLE}_p{month(index):%Y%m} PARTITION OF {SWAP_TABLE} FOR VALUES FROM (%s) TO (%s)',
+                [month(index), month(index + 1)],
+            )
+        cursor.execute(f'CREATE TABLE {TABLE}_default PARTITION OF {SWAP_TABLE} DEFAULT')
+
+        swap_in(cursor)
+
+
+def unpartition(apps, schema_editor):
+    """Turn the partitioned table back into a single table with an id primary key."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {SWAP_TABLE} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING IDENTITY)')
+        cursor.execute(f'ALTER TABLE {SWAP_TABLE} ADD PRIMARY KEY (id)')
+        swap_in(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0017_healthstatus_compaction'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='healthstatus',
+            name='healthstatus_pet_created_idx',
+        ),
+        # PostgreSQL only; other databases keep a single table
+        migrations.RunPython(partition, unpartition),
+    ]
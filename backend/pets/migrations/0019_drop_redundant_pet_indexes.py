@@ -0,0 +1,24 @@
+# Generated by Django 4.2.4 on 2026-10-18 16:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0018_healthstatus_partitioning'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='healthstatus',
+            name='pet',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='health_attributes', to='pets.pet'),
+        ),
+        migrations.AlterField(
+            model_name='vaccination',
+            name='pet',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='pets.pet'),
+        ),
+    ]
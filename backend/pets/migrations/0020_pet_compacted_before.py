@@ -0,0 +1,18 @@
+# Generated by Django 4.2.4 on 2026-10-18 16:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0019_drop_redundant_pet_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pet',
+            name='compacted_before',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
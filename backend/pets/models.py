@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
 from django.contrib.auth.models import User
 from django.utils import timezone
 
@@ -13,31 +15,50 @@ class Pet(models.Model):
     name = models.CharField(max_length=255)
     species = models.CharField(max_length=100)  # Allow flexible species names
     avatar = models.ImageField(upload_to='pet_avatars/', null=True, blank=True)
+    avatar_variants = models.JSONField(default=dict, blank=True)  # Thumbnail size -> storage name, filled in the background
     owner = models.ForeignKey(User, related_name='pets', on_delete=models.CASCADE)
     date_of_birth = models.DateField(null=True, blank=True)
     gender = models.CharField(max_length=10, choices=[('Male', 'Male'), ('Female', 'Female'), ('Unknown', 'Unknown')])
     color = models.CharField(max_length=100, null=True, blank=True)
     medical_conditions = models.TextField(null=True, blank=True)
     microchip_number = models.CharField(max_length=20, null=True, blank=True)
+    compacted_before = models.DateTimeField(null=True, blank=True)  # Health readings before this have been compacted into daily aggregates
 
     def __str__(self):
         return f"{self.name} ({self.species})"
 
 class Vaccination(models.Model):
-    pet = models.ForeignKey(Pet, on_delete=models.CASCADE)
+    # Indexed through vaccination_pet_schedule_idx, which leads with pet
+    pet = models.ForeignKey(Pet, on_delete=models.CASCADE, db_index=False)
     vaccinated_at = models.DateField(null=True, blank=True)  # This will be None for upcoming vaccinations
     schedule_at = models.DateField(null=True, blank=True)  # Scheduled date for vaccination
     vaccination_name = models.CharField(max_length=100)
-    vaccination_status = models.CharField(max_length=10, choices=[('Completed', 'Completed'), ('Pending', 'Pending'), ('Unknown', 'Unknown')])
+    vaccination_status = models.CharField(max_length=10, choices=[('Completed', 'Completed'), ('Pending', 'Pending'), ('Overdue', 'Overdue'), ('Unknown', 'Unknown')])
     vaccination_notes = models.TextField(null=True, blank=True)
     tag_proof = models.ImageField(upload_to='tag_proof/', null=True, blank=True)
+    tag_proof_variants = models.JSONField(default=dict, blank=True)  # Thumbnail size -> storage name, filled in the background
+    reminder_sent_at = models.DateTimeField(null=True, blank=True)  # When the owner was reminded of the current schedule_at
+
+    # Statuses of vaccinations that still have to happen
+    OPEN_STATUSES = ('Pending', 'Overdue')
+
+    class Meta:
+        indexes = [
+            # Per-pet vaccination lists ordered by schedule (and keyset pages over it)
+            models.Index(fields=['pet', 'schedule_at', 'id'], name='vaccination_pet_schedule_idx'),
+            # Due/overdue scans across all users by the reminder job and /upcoming/
+            models.Index(fields=['vaccination_status', 'schedule_at'], name='vaccination_status_sched_idx'),
+        ]
 
     def save(self, *args, **kwargs):
+        self.apply_default_schedule()
+        super().save(*args, **kwargs)
+
+    def apply_default_schedule(self):
         # If schedule_at is not provided, set it to vaccinated_at for old vaccinations
+        # (also called directly by bulk inserts, which bypass save())
         if self.schedule_at is None and self.vaccinated_at is not None:
             self.schedule_at = self.vaccinated_at
-        
-        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.vaccination_name} for {self.pet.name} on {self.schedule_at}"
@@ -70,7 +91,15 @@ class HealthStatus(models.Model):
         ('Dull', 'Dull')
     ]
 
-    pet = models.ForeignKey(Pet, related_name='health_attributes', on_delete=models.CASCADE)
+    # Units assigned automatically to numeric attributes
+    DEFAULT_UNITS = {
+        'Weight': 'kg',
+        'Water Intake': 'ml',
+        'Activity Level': 'minutes'
+    }
+
+    # Indexed through healthstatus_pet_measured_idx, which leads with pet
+    pet = models.ForeignKey(Pet, related_name='health_attributes', on_delete=models.CASCADE, db_index=False)
     attribute_name = models.CharField(max_length=50, choices=ATTRIBUTE_CHOICES)
     value = models.FloatField(null=True, blank=True)  # For attributes with numeric values
     unit = models.CharField(max_length=20, blank=True, null=True)  # Unit of measurement
@@ -81,15 +110,107 @@ class HealthStatus(models.Model):
     mood = models.CharField(max_length=20, choices=MOOD_CHOICES, blank=True, null=True)
     coat_condition = models.CharField(max_length=20, choices=COAT_CONDITION_CHOICES, blank=True, null=True)
 
+    # Raw readings count once; a daily aggregate left by compact_health_data stands for
+    # sample_count readings, with value their mean and min_value/max_value their range
+    sample_count = models.PositiveIntegerField(default=1)
+    min_value = models.FloatField(null=True, blank=True)
+    max_value = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Per-pet readings ordered by time (health status lists and their keyset pages, dashboard)
+            models.Index(fields=['pet', 'measured_at', 'id'], name='healthstatus_pet_measured_idx'),
+            # Per-pet series of a single attribute ordered by time (charts, rollups)
+            models.Index(fields=['pet', 'attribute_name', 'measured_at'], name='healthstatus_pet_attr_meas_idx'),
+            # Value range filters and ordering within a pet's attribute series
+            models.Index(fields=['pet', 'attribute_name', 'value'], name='healthstatus_pet_attr_val_idx'),
+        ]
+
     def __str__(self):
         return f"{self.attribute_name} for {self.pet.name} on {self.measured_at.date()}"
 
+    @classmethod
+    def latest_per_attribute(cls, limit=1):
+        """Readings restricted to the `limit` most recent ones per pet and attribute."""
+        return cls.objects.annotate(
+            recency=Window(
+                RowNumber(),
+                partition_by=[F('pet_id'), F('attribute_name')],
+                order_by=[F('measured_at').desc(), F('id').desc()],
+            )
+        ).filter(recency__lte=limit).order_by('attribute_name', '-measured_at', '-id')
+
     def save(self, *args, **kwargs):
         # Dynamically set the unit based on the attribute_name for numeric values
-        if self.attribute_name == 'Weight':
-            self.unit = 'kg'
-        elif self.attribute_name == 'Water Intake':
-            self.unit = 'ml'
-        elif self.attribute_name == 'Activity Level':
-            self.unit = 'minutes'
-        super().save(*args, **kwargs)
\ No newline at end of file
+        self.apply_default_unit()
+        super().save(*args, **kwargs)
+
+    def apply_default_unit(self):
+        # Also called directly by bulk inserts, which bypass save()
+        if self.attribute_name in self.DEFAULT_UNITS:
+            self.unit = self.DEFAULT_UNITS[self.attribute_name]
+
+class HealthStatusRollup(models.Model):
+    RESOLUTION_CHOICES = [
+        ('hour', 'Hourly'),
+        ('day', 'Daily'),
+        ('week', 'Weekly')
+    ]
+
+    pet = models.ForeignKey(Pet, related_name='health_rollups', on_delete=models.CASCADE)
+    attribute_name = models.CharField(max_length=50, choices=HealthStatus.ATTRIBUTE_CHOICES)
+    resolution = models.CharField(max_length=10, choices=RESOLUTION_CHOICES)
+    bucket_start = models.DateTimeField()  # Start of the hour/day/week (UTC) the readings fall into
+
+    count = models.PositiveIntegerField(default=0)
+    min_value = models.FloatField(null=True, blank=True)
+    max_value = models.FloatField(null=True, blank=True)
+    mean_value = models.FloatField(null=True, blank=True)
+    last_value = models.FloatField(null=True, blank=True)
+    last_measured_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('pet', 'attribute_name', 'resolution', 'bucket_start')
+
+    def __str__(self):
+        return f"{self.attribute_name} for {self.pet_id} ({self.resolution} from {self.bucket_start})"
+
+class HealthAlert(models.Model):
+    KIND_CHOICES = [
+        ('zscore', 'Outlier against the recent readings'),
+        ('change_point', 'Sustained shift in level')
+    ]
+
+    pet = models.ForeignKey(Pet, related_name='health_alerts', on_delete=models.CASCADE)
+    attribute_name = models.CharField(max_length=50, choices=HealthStatus.ATTRIBUTE_CHOICES)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # The flagged reading, copied rather than referenced so alerts outlive compacted or deleted readings
+    reading_id = models.BigIntegerField()
+    value = models.FloatField()
+    measured_at = models.DateTimeField()
+    baseline = models.FloatField()  # Mean of the readings the flagged one was compared against
+    score = models.FloatField()  # Signed z-score or level shift in standard deviations
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Rescanning a series never flags the same reading twice
+            models.UniqueConstraint(fields=['reading_id', 'kind'], name='healthalert_reading_kind_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['pet', 'measured_at'], name='healthalert_pet_measured_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} in {self.attribute_name} for {self.pet_id} on {self.measured_at.date()}"
+
+class HealthAlertScan(models.Model):
+    """One run of the anomaly detection job; the latest finished one is the incremental watermark."""
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_reading_id = models.BigIntegerField(default=0)  # Readings up to this id have been scanned
+    pets_scanned = models.PositiveIntegerField(default=0)
+    alerts_created = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Health alert scan up to reading {self.last_reading_id} ({self.started_at})"
@@ -1,5 +1,5 @@
 # pagination.py
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 class VaccinationPagination(PageNumberPagination):
     page_size = 5  # Set the default page size
@@ -10,3 +10,39 @@ class HealthStatusPagination(PageNumberPagination):
     page_size = 10  # Set the default page size
     page_size_query_param = 'page_size'  # Allow the client to control the page size
     max_page_size = 50  # Set the maximum limit for page size
+
+class VaccinationCursorPagination(CursorPagination):
+    # Keyset pagination: no COUNT(*) and no OFFSET, so deep pages cost the same as the first one
+    ordering = ('schedule_at', 'id')
+    page_size = 5
+    page_size_query_param = 'page_size'
+    max_page_size = 20
+
+class HealthStatusCursorPagination(CursorPagination):
+    ordering = ('measured_at', 'id')
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+
+class CursorPaginationMixin:
+    """
+    Paginate with `cursor_pagination_class` when the client asks for it
+    (?pagination=cursor, or by following a ?cursor= link) and with the
+    regular page-number `pagination_class` otherwise, for older clients.
+    """
+    cursor_pagination_class = None
+
+    def use_cursor_pagination(self):
+        params = self.request.query_params
+        return self.cursor_pagination_class is not None and (
+            params.get('pagination') == 'cursor' or 'cursor' in params
+        )
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.use_cursor_pagination():
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = self.pagination_class() if self.pagination_class is not None else None
+        return self._paginator
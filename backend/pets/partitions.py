@@ -0,0 +1,172 @@
+import logging
+import re
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+from django.db import connection, transaction
+from django.utils import timezone
+from . import caching, rollups
+from .models import HealthAlert, HealthStatus, HealthStatusRollup, Pet
+
+logger = logging.getLogger(__name__)
+
+# On PostgreSQL the readings table can be range partitioned by month on measured_at
+# (migration 0018): one pets_healthstatus_pYYYYMM table per month, plus a default
+# partition catching readings of months nobody created a partition for yet.
+TABLE = HealthStatus._meta.db_table
+DEFAULT_PARTITION = f'{TABLE}_default'
+PARTITION_NAME = re.compile(rf'^{TABLE}_p(\d{{4}})(\d{{2}})$')
+
+
+def month_start(moment):
+    """The first instant (UTC) of the month `moment` falls into."""
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, dt_timezone.utc)
+    moment = moment.astimezone(dt_timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month, count):
+    month_index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month:%Y%m}'
+
+
+def is_partitioned():
+    """Whether the readings table is partitioned; always False off PostgreSQL."""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))', [TABLE])
+        return cursor.fetchone()[0]
+
+
+def partitions():
+    """Start of the month of every monthly partition, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+            'WHERE pg_inherits.inhparent = to_regclass(%s)',
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months.append(datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc))
+    return sorted(months)
+
+
+def default_months():
+    """Months that have readings waiting in the default partition."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', measured_at AT TIME ZONE 'UTC') "
+            f'FROM {connection.ops.quote_name(DEFAULT_PARTITION)}'
+        )
+        return sorted(month_start(row[0]) for row in cursor.fetchall())
+
+
+def create_partition(month):
+    """
+    Create the partition of `month` and move its readings out of the
+    default partition, in one transaction. The partition is built as a
+    standalone table and attached afterwards, which only briefly locks the
+    default partition rather than the whole table.
+    """
+    quote = connection.ops.quote_name
+    name, table, default = quote(partition_name(month)), quote(TABLE), quote(DEFAULT_PARTITION)
+    bounds = [month, add_months(month, 1)]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {default} WHERE measured_at >= %s AND measured_at < %s RETURNING *) '
+            f'INSERT INTO {name} SELECT * FROM moved',
+            bounds,
+        )
+        cursor.execute(f'ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)', bounds)
+
+
+def has_default_partition():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT partdefid <> 0 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)', [TABLE])
+        return cursor.fetchone()[0]
+
+
+def detach_partition(month):
+    """
+    Detach the partition of `month` from the readings table, CONCURRENTLY
+    when PostgreSQL allows it: outside a transaction block (autocommit) and
+    without a default partition. Otherwise, and that includes the usual
+    setup with pets_healthstatus_default, a plain DETACH: it scans nothing
+    and holds its ACCESS EXCLUSIVE lock on the table only for the catalog
+    change.
+    """
+    quote = connection.ops.quote_name
+    name, table = quote(partition_name(month)), quote(TABLE)
+    concurrently = not connection.in_atomic_block and not has_default_partition()
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}{' CONCURRENTLY' if concurrently else ''}")
+
+
+def drop_partition(month):
+    """
+    Drop a month of readings at once: detach its partition first, so the
+    DROP doesn't lock the readings table, then drop it. The alerts on those
+    readings and the hourly and daily rollups of the month go with them;
+    weekly rollups straddling the month's edges are recomputed from the
+    readings that are left.
+    """
+    detach_partition(month)
+    end = add_months(month, 1)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE {connection.ops.quote_name(partition_name(month))}')
+        HealthAlert.objects.filter(measured_at__gte=month, measured_at__lt=end).delete()
+        HealthStatusRollup.objects.filter(
+            resolution__in=['hour', 'day'], bucket_start__gte=month, bucket_start__lt=end,
+        ).delete()
+        weeks = defaultdict(set)
+        overlapping = HealthStatusRollup.objects.filter(
+            resolution='week', bucket_start__gt=month - rollups.BUCKET_SPANS['week'], bucket_start__lt=end,
+        )
+        for pet_id, attribute_name, start in overlapping.values_list('pet_id', 'attribute_name', 'bucket_start'):
+            weeks[pet_id, attribute_name].add(start)
+        if weeks:
+            rollups.refresh_buckets('week', weeks)
+
+
+def maintain(months_ahead, retention_months=0, dry_run=False, now=None):
+    """
+    Create the partitions of the current month and the `months_ahead` after
+    it, and of any month found in the default partition, then drop the
+    partitions that ended more than `retention_months` months ago (0 keeps
+    them all). Returns (created, dropped) lists of partition names.
+    """
+    current = month_start(now or timezone.now())
+    existing = set(partitions())
+
+    wanted = {add_months(current, offset) for offset in range(months_ahead + 1)}
+    wanted.update(default_months())
+    created = sorted(wanted - existing)
+
+    dropped = []
+    if retention_months:
+        oldest_kept = add_months(current, -retention_months)
+        dropped = [month for month in sorted(existing | set(created)) if add_months(month, 1) <= oldest_kept]
+
+    if not dry_run:
+        for month in created:
+            create_partition(month)
+        for month in dropped:
+            drop_partition(month)
+        if dropped:
+            caching.invalidate_overview(*Pet.objects.values_list('owner_id', flat=True).distinct())
+
+    created, dropped = [partition_name(month) for month in created], [partition_name(month) for month in dropped]
+    if not dry_run:
+        logger.info('Health partitions: created %s, dropped %s', ', '.join(created) or 'none', ', '.join(dropped) or 'none')
+    return created, dropped
@@ -0,0 +1,177 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Checks that must pass for /api/health/ and /api/ready/ respectively
+HEALTH_CHECKS = ('database', 'cache', 'media_storage')
+READY_CHECKS = ('database', 'migrations')
+
+# Set once the migration plan came back empty: loading the migration graph is
+# expensive, and migrations only change with a deploy, which restarts the process.
+# A failed database check clears it, as the database may have been swapped or restored.
+_migrations_applied = threading.Event()
+
+
+def check_database():
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    except Exception:
+        _migrations_applied.clear()
+        raise
+    finally:
+        # Reconnect every round so a restarted database is noticed
+        connection.close()
+
+
+def check_cache():
+    cache.set('health_check', 'ok', 30)
+    if cache.get('health_check') != 'ok':
+        raise RuntimeError('cache did not return the value just written')
+
+
+def check_media_storage():
+    # Listing the root is the cheapest round trip that works for any storage backend
+    try:
+        default_storage.listdir('')
+    except FileNotFoundError:
+        # FileSystemStorage creates its root on the first upload
+        pass
+
+
+def check_migrations():
+    if _migrations_applied.is_set():
+        return
+    try:
+        executor = MigrationExecutor(connection)
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    finally:
+        connection.close()
+    if plan:
+        raise RuntimeError(f'{len(plan)} unapplied migration(s)')
+    _migrations_applied.set()
+
+
+CHECKS = {
+    'database': check_database,
+    'cache': check_cache,
+    'media_storage': check_media_storage,
+    'migrations': check_migrations,
+}
+
+
+def _timed(check):
+    started = time.perf_counter()
+    try:
+        check()
+    except Exception as e:
+        return {'status': 'unhealthy', 'latency_ms': round((time.perf_counter() - started) * 1000, 2), 'error': str(e)}
+    return {'status': 'healthy', 'latency_ms': round((time.perf_counter() - started) * 1000, 2)}
+
+
+class ProbeRunner:
+    """
+    Run every check on a background thread every `interval` seconds and keep
+    the results of the latest round, so probes never touch a dependency
+    themselves. A check that takes longer than `timeout` is reported as
+    unhealthy and is not started again until the stuck call returns.
+    """
+
+    def __init__(self, checks, interval, timeout):
+        self.checks = checks
+        self.interval = interval
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=len(checks), thread_name_prefix='probe')
+        self.running = {}
+        self.snapshot = None
+        self.first_round = threading.Event()
+
+    def run_once(self):
+        futures = {}
+        for name, check in self.checks.items():
+            future = self.running.get(name)
+            if future is None or future.done():
+                future = self.running[name] = self.executor.submit(_timed, check)
+            futures[name] = future
+
+        deadline = time.monotonic() + self.timeout
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except TimeoutError:
+                results[name] = {'status': 'unhealthy', 'latency_ms': None, 'error': f'timed out after {self.timeout}s'}
+
+        self.snapshot = {'checked_at': timezone.now(), 'checks': results}
+        self.first_round.set()
+
+    def run_forever(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception('Dependency probe round failed')
+            time.sleep(self.interval)
+
+
+_runner = None
+_runner_pid = None
+_runner_lock = threading.Lock()
+
+
+def get_runner():
+    """Start the probe thread on first use, once per process (workers are forked)."""
+    global _runner, _runner_pid
+    if _runner is None or _runner_pid != os.getpid():
+        with _runner_lock:
+            if _runner is None or _runner_pid != os.getpid():
+                runner = ProbeRunner(CHECKS, settings.PROBE_INTERVAL, settings.PROBE_TIMEOUT)
+                threading.Thread(target=runner.run_forever, name='dependency-probes', daemon=True).start()
+                _runner, _runner_pid = runner, os.getpid()
+    return _runner
+
+
+def latest_snapshot():
+    """
+    The latest probe results, or None while the first round is still running.
+    Only the very first call in a process waits, and at most PROBE_TIMEOUT.
+    """
+    runner = get_runner()
+    runner.first_round.wait(timeout=settings.PROBE_TIMEOUT)
+    return _with_age(runner.snapshot)
+
+
+async def alatest_snapshot():
+    """latest_snapshot() for async views; the first wait happens off the event loop."""
+    runner = get_runner()
+    if not runner.first_round.is_set():
+        await sync_to_async(runner.first_round.wait, thread_sensitive=False)(timeout=settings.PROBE_TIMEOUT)
+    return _with_age(runner.snapshot)
+
+
+def _with_age(snapshot):
+    if snapshot is None:
+        return None
+    age = (timezone.now() - snapshot['checked_at']).total_seconds()
+    return {
+        **snapshot,
+        'age_seconds': round(age, 1),
+        # The probe thread has stopped refreshing, so the results can't be trusted
+        'stale': age > settings.PROBE_INTERVAL * 3 + settings.PROBE_TIMEOUT,
+    }
+
+
+def passing(snapshot, names):
+    return not snapshot['stale'] and all(snapshot['checks'][name]['status'] == 'healthy' for name in names)
@@ -0,0 +1,136 @@
+import logging
+import smtplib
+from datetime import timedelta
+from itertools import groupby
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+from .models import Vaccination
+
+logger = logging.getLogger(__name__)
+
+
+def overdue(today=None):
+    """Pending vaccinations whose date has passed."""
+    today = today or timezone.localdate()
+    return Vaccination.objects.filter(vaccination_status='Pending', schedule_at__lt=today)
+
+
+def mark_overdue(today=None):
+    """Flip overdue() vaccinations to Overdue; returns how many changed."""
+    return overdue(today).update(vaccination_status='Overdue')
+
+
+def upcoming(queryset, days, today=None):
+    """
+    Open vaccinations of `queryset` due within `days`, overdue ones first.
+    Answered from the (vaccination_status, schedule_at) index.
+    """
+    today = today or timezone.localdate()
+    return queryset.filter(
+        vaccination_status__in=Vaccination.OPEN_STATUSES,
+        schedule_at__lte=today + timedelta(days=days),
+    ).order_by('schedule_at', 'id')
+
+
+def due_reminders(today=None):
+    """
+    Open vaccinations nobody has been reminded of yet, from up to
+    VACCINATION_REMINDER_OVERDUE_DAYS ago to VACCINATION_REMINDER_DAYS ahead,
+    grouped by owner. Long-forgotten vaccinations are left alone rather than
+    mailed all at once.
+    """
+    today = today or timezone.localdate()
+    return (
+        Vaccination.objects.filter(
+            vaccination_status__in=Vaccination.OPEN_STATUSES,
+            schedule_at__gte=today - timedelta(days=settings.VACCINATION_REMINDER_OVERDUE_DAYS),
+            schedule_at__lte=today + timedelta(days=settings.VACCINATION_REMINDER_DAYS),
+            reminder_sent_at__isnull=True,
+        )
+        .exclude(pet__owner__email='')
+        .select_related('pet__owner')
+        .order_by('pet__owner_id', 'schedule_at', 'id')
+    )
+
+
+def build_message(user, vaccinations, today):
+    lines = []
+    for vaccination in vaccinations:
+        when = 'overdue since' if vaccination.schedule_at < today else 'due on'
+        lines.append(f'- {vaccination.vaccination_name} for {vaccination.pet.name}, {when} {vaccination.schedule_at:%Y-%m-%d}')
+    count = len(vaccinations)
+    return EmailMessage(
+        subject=f"{count} vaccination{'s' if count != 1 else ''} coming up for your pets",
+        body=f'Hi {user.get_username()},\n\nThe following vaccinations need your attention:\n\n' + '\n'.join(lines) + '\n',
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+    )
+
+
+def message_batches(vaccinations, batch_size, today):
+    """Yield [(message, [vaccination id, ...]), ...] with one message per owner, batch_size messages at a time."""
+    batch = []
+    for _, group in groupby(vaccinations, key=lambda vaccination: vaccination.pet.owner_id):
+        group = list(group)
+        batch.append((build_message(group[0].pet.owner, group, today), [vaccination.pk for vaccination in group]))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def send_batch(connection, batch):
+    """
+    Send a batch message by message and stamp the vaccinations of the ones
+    delivered with a single update. A message the server refuses (a bad
+    address, a dropped connection) is logged and left unstamped for the next
+    run, and doesn't hold up the other owners. Returns the vaccination ids
+    of every message delivered.
+    """
+    sent = []
+    try:
+        for message, ids in batch:
+            try:
+                connection.send_messages([message])
+            except (smtplib.SMTPException, OSError):
+                logger.warning('Vaccination reminder to %s failed', ', '.join(message.to), exc_info=True)
+                continue
+            sent.append(ids)
+    finally:
+        if sent:
+            Vaccination.objects.filter(pk__in=[pk for ids in sent for pk in ids]).update(reminder_sent_at=timezone.now())
+    return sent
+
+
+def send_reminders(today=None, batch_size=None, dry_run=False):
+    """
+    Mark overdue vaccinations, then send every owner with due vaccinations one
+    email listing them. Messages go out in batches of `batch_size` over a
+    single SMTP connection, and the vaccinations of every delivered message
+    are stamped with reminder_sent_at before the batch ends, so a failure
+    halfway through never reminds anyone twice. Owners whose message failed
+    are tried again on the next run.
+
+    Returns (overdue, emails, vaccinations) counts.
+    """
+    today = today or timezone.localdate()
+    batch_size = batch_size or settings.VACCINATION_REMINDER_BATCH_SIZE
+
+    marked = overdue(today).count() if dry_run else mark_overdue(today)
+    emails = reminded = 0
+    connection = get_connection()
+    try:
+        if not dry_run:
+            connection.open()
+        vaccinations = due_reminders(today).iterator(chunk_size=batch_size)
+        for batch in message_batches(vaccinations, batch_size, today):
+            sent = [ids for _, ids in batch] if dry_run else send_batch(connection, batch)
+            emails += len(sent)
+            reminded += sum(len(ids) for ids in sent)
+    finally:
+        connection.close()
+
+    logger.info('Vaccination reminders: %s marked overdue, %s emails for %s vaccinations', marked, emails, reminded)
+    return marked, emails, reminded
@@ -0,0 +1,178 @@
+import calendar
+import logging
+from collections import Counter, defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from . import caching, rollups
+from .bulk import delete_rows
+from .models import HealthStatus, Pet
+
+logger = logging.getLogger(__name__)
+
+COMPACTION_FIELDS = ['value', 'min_value', 'max_value', 'sample_count', 'unit', 'mood', 'coat_condition', 'measured_at']
+READING_FIELDS = ('id', 'attribute_name', 'measured_at', 'value', 'min_value', 'max_value', 'sample_count', 'unit', 'mood', 'coat_condition')
+
+
+def cutoff(months, now=None):
+    """Start of the UTC day `months` calendar months before now; readings before it get compacted."""
+    day = rollups.bucket_start('day', now or timezone.now())
+    month_index = day.year * 12 + day.month - 1 - months
+    year, month = divmod(month_index, 12)
+    month += 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def compaction_queryset(pet_id, before, since=None):
+    """A pet's readings measured in [since, before), in time order through the (pet, measured_at, id) index."""
+    queryset = HealthStatus.objects.filter(pet_id=pet_id, measured_at__lt=before)
+    if since is not None:
+        queryset = queryset.filter(measured_at__gte=since)
+    return queryset.order_by('measured_at', 'id')
+
+
+def _mode(rows, field):
+    """Most common value of `field` weighted by sample_count; ties go to the one seen last."""
+    weights, last_seen = Counter(), {}
+    for index, row in enumerate(rows):
+        if row[field] is not None:
+            weights[row[field]] += row['sample_count']
+            last_seen[row[field]] = index
+    if not weights:
+        return None
+    return max(weights, key=lambda choice: (weights[choice], last_seen[choice]))
+
+
+def aggregate(rows, day):
+    """
+    The fields of the daily aggregate standing for `rows` (one attribute of
+    one pet on one day, in time order): the weighted mean, overall range and
+    total sample count of the numeric values, and the weighted modes of the
+    categorical fields.
+    """
+    numeric = [row for row in rows if row['value'] is not None]
+    count = sum(row['sample_count'] for row in numeric)
+    return {
+        'value': sum(row['value'] * row['sample_count'] for row in numeric) / count if count else None,
+        'min_value': min(row['value'] if row['min_value'] is None else row['min_value'] for row in numeric) if numeric else None,
+        'max_value': max(row['value'] if row['max_value'] is None else row['max_value'] for row in numeric) if numeric else None,
+        'sample_count': sum(row['sample_count'] for row in rows),
+        'unit': next((row['unit'] for row in reversed(rows) if row['unit']), None),
+        'mood': _mode(rows, 'mood'),
+        'coat_condition': _mode(rows, 'coat_condition'),
+        'measured_at': day,
+    }
+
+
+def compact_rows(pet_id, rows, dry_run=False):
+    """
+    Replace every (attribute, day) group of more than one of the pet's
+    readings among `rows` by a single aggregate: the group's earliest
+    reading is rewritten in place and the others deleted. The rollups of
+    the buckets they lived in are refreshed in the same transaction, which
+    moves each compacted day into the hour it starts with.
+    Returns (readings, aggregates).
+    """
+    groups = defaultdict(list)
+    for row in rows:
+        groups[row['attribute_name'], rollups.bucket_start('day', row['measured_at'])].append(row)
+
+    kept, removed, touched = [], [], []
+    for (attribute_name, day), group in groups.items():
+        if len(group) < 2:
+            continue
+        kept.append(HealthStatus(id=group[0]['id'], **aggregate(group, day)))
+        removed.extend(row['id'] for row in group[1:])
+        # The buckets the readings left, and the one of the day's start the aggregate moves to
+        touched.extend((pet_id, attribute_name, row['measured_at']) for row in group)
+        touched.append((pet_id, attribute_name, day))
+
+    if kept and not dry_run:
+        with transaction.atomic():
+            HealthStatus.objects.bulk_update(kept, COMPACTION_FIELDS, batch_size=500)
+            # Nothing references readings
+            delete_rows(HealthStatus.objects.filter(pk__in=removed))
+            rollups.refresh_readings(touched)
+    return len(kept) + len(removed), len(kept)
+
+
+def compact_pet(pet_id, before, batch_size, dry_run=False, since=None):
+    """
+    Compact a pet's readings measured in [since, before), walking them in
+    time order about batch_size readings at a time, each chunk of whole days
+    in its own short transaction. Returns (readings, aggregates).
+    """
+    readings = aggregates = 0
+    while True:
+        rows = list(compaction_queryset(pet_id, before, since).values(*READING_FIELDS)[:batch_size])
+        if not rows:
+            break
+
+        end = before
+        if len(rows) == batch_size:
+            # Leave the last, possibly partial, day for the next chunk, unless it is the only one
+            end = rollups.bucket_start('day', rows[-1]['measured_at'])
+            rows = [row for row in rows if row['measured_at'] < end]
+            if not rows:
+                end = min(end + timedelta(days=1), before)
+                rows = list(compaction_queryset(pet_id, end, since).values(*READING_FIELDS))
+
+        chunk_readings, chunk_aggregates = compact_rows(pet_id, rows, dry_run)
+        readings += chunk_readings
+        aggregates += chunk_aggregates
+        since = end
+        if end >= before:
+            break
+    return readings, aggregates
+
+
+def compact(months=None, pet_ids=None, batch_size=None, dry_run=False, now=None, full=False):
+    """
+    Replace the readings older than `months` (HEALTH_RETENTION_MONTHS by
+    default; 0 keeps everything) with one aggregate per pet, attribute and
+    UTC day, pet by pet.
+
+    Each pet remembers the cutoff it was last compacted up to
+    (Pet.compacted_before), and later runs only read the days after it.
+    Readings backfilled before that point stay raw until a run with
+    full=True, which reads every pet's whole history again.
+
+    Lists, the dashboard and the rollups read aggregates like any reading;
+    rollups weigh them by sample_count, so daily and weekly rollups keep
+    their values, while hourly ones find each whole day in its first hour.
+    Returns (pets, readings, aggregates): the pets with anything compacted,
+    the readings replaced and the aggregates they were replaced by.
+    """
+    months = settings.HEALTH_RETENTION_MONTHS if months is None else months
+    if not months:
+        return 0, 0, 0  # Raw readings are kept forever
+    batch_size = batch_size or settings.HEALTH_COMPACTION_BATCH_SIZE
+    before = cutoff(months, now)
+
+    pets = Pet.objects.order_by('id')
+    if pet_ids is not None:
+        pets = pets.filter(pk__in=pet_ids)
+
+    compacted = {}
+    readings = aggregates = 0
+    for pet_id, owner_id, compacted_before in pets.values_list('id', 'owner_id', 'compacted_before'):
+        since = None if full else compacted_before
+        if since is not None and since >= before:
+            continue
+        pet_readings, pet_aggregates = compact_pet(pet_id, before, batch_size, dry_run, since)
+        if not dry_run:
+            # update() rather than save(): the watermark changes nothing the dashboard shows
+            Pet.objects.filter(pk=pet_id).update(compacted_before=before)
+        if pet_aggregates:
+            compacted[pet_id] = owner_id
+            readings += pet_readings
+            aggregates += pet_aggregates
+
+    if compacted and not dry_run:
+        caching.invalidate_overview(*set(compacted.values()))
+    logger.info(
+        'Health data compaction before %s: %s readings of %s pets into %s daily aggregates',
+        before.date(), readings, len(compacted), aggregates,
+    )
+    return len(compacted), readings, aggregates
@@ -0,0 +1,233 @@
+from collections import defaultdict
+from datetime import timedelta, timezone as dt_timezone
+from django.db import transaction
+from django.db.models import F, Max, Min, Q, Sum
+from django.db.models.functions import Coalesce, TruncDay, TruncHour, TruncWeek
+from django.utils import timezone
+from .bulk import insert_rows
+from .models import HealthStatus, HealthStatusRollup
+
+RESOLUTIONS = [choice[0] for choice in HealthStatusRollup.RESOLUTION_CHOICES]
+
+ROLLUP_COLUMNS = [
+    'pet_id', 'attribute_name', 'resolution', 'bucket_start',
+    'count', 'min_value', 'max_value', 'mean_value', 'last_value', 'last_measured_at',
+]
+
+BUCKET_SPANS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+}
+
+# Database functions computing bucket_start() of a reading, weeks starting on Monday
+TRUNCATE = {
+    'hour': TruncHour,
+    'day': TruncDay,
+    'week': TruncWeek,
+}
+
+
+def bucket_start(resolution, moment):
+    """Return the UTC start of the hour/day/week bucket that `moment` falls into."""
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, dt_timezone.utc)
+    moment = moment.astimezone(dt_timezone.utc)
+    if resolution == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if resolution == 'day':
+        return day
+    return day - timedelta(days=day.weekday())  # Weeks start on Monday
+
+
+def _last_values(stats):
+    """
+    Value of the latest reading of every grouped bucket in `stats`, keyed by
+    (pet_id, attribute_name, measured_at), fetched with a single query; of
+    readings measured at the same instant the one with the highest id wins.
+    """
+    latest = defaultdict(set)
+    for row in stats:
+        latest[row['pet_id'], row['attribute_name']].add(row['last_measured_at'])
+    wanted = Q()
+    for (pet_id, attribute_name), moments in latest.items():
+        wanted |= Q(pet_id=pet_id, attribute_name=attribute_name, measured_at__in=moments)
+    if not wanted:
+        return {}
+    readings = HealthStatus.objects.filter(wanted).order_by('id').values_list('pet_id', 'attribute_name', 'measured_at', 'value')
+    return {(pet_id, attribute_name, measured_at): value for pet_id, attribute_name, measured_at, value in readings}
+
+
+def refresh_buckets(resolution, series):
+    """
+    Recompute the rollups of one resolution with a single grouped aggregate
+    (plus one lookup of the latest readings), counting a compacted daily
+    aggregate as the sample_count readings it stands for, then upsert them
+    in bulk and delete the ones left without readings. `series` maps
+    (pet_id, attribute_name) to the set of bucket starts to recompute.
+    """
+    span = BUCKET_SPANS[resolution]
+    wanted = Q()
+    for (pet_id, attribute_name), starts in series.items():
+        # The time range keeps each series on the (pet, attribute, measured_at) index
+        wanted |= Q(
+            pet_id=pet_id,
+            attribute_name=attribute_name,
+            measured_at__gte=min(starts),
+            measured_at__lt=max(starts) + span,
+            bucket__in=starts,
+        )
+
+    stats = (
+        HealthStatus.objects.annotate(bucket=TRUNCATE[resolution]('measured_at', tzinfo=dt_timezone.utc))
+        .filter(wanted)
+        .values('pet_id', 'attribute_name', 'bucket')
+        .annotate(
+            count=Sum('sample_count'),
+            numeric_count=Sum('sample_count', filter=Q(value__isnull=False)),
+            total=Sum(F('value') * F('sample_count')),
+            min_value=Min(Coalesce('min_value', 'value')),
+            max_value=Max(Coalesce('max_value', 'value')),
+            last_measured_at=Max('measured_at'),
+        )
+        .order_by()
+    )
+    last_values = _last_values(stats)
+
+    rollups = []
+    for row in stats:
+        rollups.append(HealthStatusRollup(
+            pet_id=row['pet_id'],
+            attribute_name=row['attribute_name'],
+            resolution=resolution,
+            bucket_start=row['bucket'],
+            count=row['count'],
+            min_value=row['min_value'],
+            max_value=row['max_value'],
+            mean_value=row['total'] / row['numeric_count'] if row['numeric_count'] else None,
+            last_value=last_values[row['pet_id'], row['attribute_name'], row['last_measured_at']],
+            last_measured_at=row['last_measured_at'],
+        ))
+    HealthStatusRollup.objects.bulk_create(
+        rollups,
+        update_conflicts=True,
+        unique_fields=['pet', 'attribute_name', 'resolution', 'bucket_start'],
+        update_fields=ROLLUP_COLUMNS[4:],
+    )
+
+    # Buckets whose last reading went away
+    found = {(rollup.pet_id, rollup.attribute_name, rollup.bucket_start) for rollup in rollups}
+    empty = Q()
+    for (pet_id, attribute_name), starts in series.items():
+        starts = [start for start in starts if (pet_id, attribute_name, start) not in found]
+        if starts:
+            empty |= Q(pet_id=pet_id, attribute_name=attribute_name, bucket_start__in=starts)
+    if empty:
+        HealthStatusRollup.objects.filter(empty, resolution=resolution).delete()
+
+
+def refresh_readings(readings):
+    """
+    Bring the rollups up to date after raw readings were written or deleted.
+    `readings` is an iterable of (pet_id, attribute_name, measured_at) tuples;
+    every bucket they touch is recomputed once, at every resolution, with a
+    fixed number of queries however many readings there are.
+    """
+    buckets = {resolution: defaultdict(set) for resolution in RESOLUTIONS}
+    for pet_id, attribute_name, measured_at in readings:
+        for resolution in RESOLUTIONS:
+            buckets[resolution][pet_id, attribute_name].add(bucket_start(resolution, measured_at))
+
+    with transaction.atomic():
+        for resolution, series in buckets.items():
+            if series:
+                refresh_buckets(resolution, series)
+    return sum(len(starts) for series in buckets.values() for starts in series.values())
+
+
+class _BucketAccumulator:
+    def __init__(self, pet_id, attribute_name, resolution, start):
+        self.key = (pet_id, attribute_name, resolution, start)
+        self.count = 0
+        self.numeric_count = 0
+        self.total = 0.0
+        self.min_value = None
+        self.max_value = None
+        self.last_value = None
+        self.last_measured_at = None
+
+    def add(self, value, measured_at, sample_count=1, min_value=None, max_value=None):
+        self.count += sample_count
+        self.last_value = value
+        self.last_measured_at = measured_at
+        if value is None:
+            return
+        self.numeric_count += sample_count
+        self.total += value * sample_count
+        min_value = value if min_value is None else min_value
+        max_value = value if max_value is None else max_value
+        self.min_value = min_value if self.min_value is None else min(self.min_value, min_value)
+        self.max_value = max_value if self.max_value is None else max(self.max_value, max_value)
+
+    def to_row(self):
+        """The rollup as a tuple of values in ROLLUP_COLUMNS order."""
+        return self.key + (
+            self.count,
+            self.min_value,
+            self.max_value,
+            self.total / self.numeric_count if self.numeric_count else None,
+            self.last_value,
+            self.last_measured_at,
+        )
+
+
+def rebuild(pet_ids=None, batch_size=1000):
+    """
+    Rebuild the rollups from scratch in a single ordered pass over the raw
+    readings, so memory use does not depend on the size of the history.
+    Returns the number of rollup rows written.
+    """
+    readings = HealthStatus.objects.all()
+    rollups = HealthStatusRollup.objects.all()
+    if pet_ids is not None:
+        readings = readings.filter(pet_id__in=pet_ids)
+        rollups = rollups.filter(pet_id__in=pet_ids)
+
+    rows = (
+        readings.order_by('pet_id', 'attribute_name', 'measured_at', 'id')
+        .values_list('pet_id', 'attribute_name', 'measured_at', 'value', 'sample_count', 'min_value', 'max_value')
+        .iterator(chunk_size=batch_size)
+    )
+
+    written = 0
+    pending = []
+    current = {}
+
+    def flush(accumulator):
+        nonlocal written
+        pending.append(accumulator.to_row())
+        if len(pending) >= batch_size:
+            insert_rows(HealthStatusRollup, ROLLUP_COLUMNS, pending)
+            written += len(pending)
+            pending.clear()
+
+    with transaction.atomic():
+        rollups.delete()
+        for pet_id, attribute_name, measured_at, value, sample_count, min_value, max_value in rows:
+            for resolution in RESOLUTIONS:
+                start = bucket_start(resolution, measured_at)
+                key = (pet_id, attribute_name, resolution, start)
+                accumulator = current.get(resolution)
+                if accumulator is None or accumulator.key != key:
+                    if accumulator is not None:
+                        flush(accumulator)
+                    accumulator = current[resolution] = _BucketAccumulator(*key)
+                accumulator.add(value, measured_at, sample_count, min_value, max_value)
+
+        for accumulator in current.values():
+            flush(accumulator)
+        insert_rows(HealthStatusRollup, ROLLUP_COLUMNS, pending)
+        written += len(pending)
+
+    return written
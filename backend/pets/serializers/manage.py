@@ -7,7 +7,8 @@ from django.contrib.auth.models import User
 
 from rest_framework import serializers
 from django.utils import timezone
-from ..models import Owner, Pet, HealthStatus
+from drf_spectacular.utils import extend_schema_field
+from ..models import Owner, Pet, HealthStatus, HealthAlert
 
 class HealthStatusSerializer(serializers.ModelSerializer):
     pet = serializers.PrimaryKeyRelatedField(queryset=Pet.objects.all())
@@ -15,7 +16,9 @@ class HealthStatusSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = HealthStatus
-        fields = ['id', 'attribute_name', 'value', 'created_at', 'pet', 'measured_at', 'coat_condition', 'mood', 'unit']
+        fields = ['id', 'attribute_name', 'value', 'created_at', 'pet', 'measured_at', 'coat_condition', 'mood', 'unit',
+                  'sample_count', 'min_value', 'max_value']
+        read_only_fields = ['sample_count', 'min_value', 'max_value']
 
     def validate_measured_at(self, value):
         # If measured_at is not provided, default it to the current time
@@ -27,12 +30,26 @@ class HealthStatusSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(f"Attribute name must be one of: {', '.join(valid_choices)}")
         return value
 
+class HealthStatusBatchItemSerializer(HealthStatusSerializer):
+    # Ownership of every referenced pet is checked in one query by the batch action
+    pet = serializers.IntegerField()
+
 class PetSerializer(serializers.ModelSerializer):
-    health_attributes = HealthStatusSerializer(many=True, read_only=True)
+    # Only the latest reading(s) per attribute, not the whole history
+    health_attributes = serializers.SerializerMethodField()
 
     class Meta:
         model = Pet
         fields = ['id', 'name', 'species', 'avatar', 'health_attributes', 'microchip_number', 'medical_conditions', 'color', 'gender', 'date_of_birth']
+
+    @extend_schema_field(HealthStatusSerializer(many=True))
+    def get_health_attributes(self, pet):
+        # Normally filled by a single Prefetch in PetViewSet.get_queryset
+        readings = getattr(pet, 'recent_health_attributes', None)
+        if readings is None:
+            limit = self.context.get('health_limit', 1)
+            readings = HealthStatus.latest_per_attribute(limit).filter(pet=pet)
+        return HealthStatusSerializer(readings, many=True, context=self.context).data
     
     def validate_name(self, value):
         if not value or not value.strip():
@@ -75,4 +92,10 @@ class RegisterSerializer(serializers.ModelSerializer):
 class VaccinationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Vaccination
-        fields = ['id', 'pet', 'vaccinated_at', 'schedule_at', 'vaccination_name', 'vaccination_status', 'vaccination_notes', 'tag_proof']
\ No newline at end of file
+        fields = ['id', 'pet', 'vaccinated_at', 'schedule_at', 'vaccination_name', 'vaccination_status', 'vaccination_notes', 'tag_proof', 'reminder_sent_at']
+        read_only_fields = ['reminder_sent_at']
+
+class HealthAlertSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = HealthAlert
+        fields = ['id', 'pet', 'attribute_name', 'kind', 'reading_id', 'value', 'measured_at', 'baseline', 'score', 'created_at']
@@ -0,0 +1,75 @@
+import threading
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from .models import HealthStatus, Pet
+from . import authentication, caching, rollups
+
+# Pets currently being deleted; their readings cascade away with them, so
+# there is no point recomputing rollups for each reading on the way out.
+_deleting = threading.local()
+
+
+def _pets_being_deleted():
+    if not hasattr(_deleting, 'pet_ids'):
+        _deleting.pet_ids = set()
+    return _deleting.pet_ids
+
+
+@receiver(pre_delete, sender=Pet)
+def mark_pet_deleting(sender, instance, **kwargs):
+    _pets_being_deleted().add(instance.pk)
+
+
+@receiver(post_delete, sender=Pet)
+def unmark_pet_deleting(sender, instance, **kwargs):
+    _pets_being_deleted().discard(instance.pk)
+    caching.invalidate_overview(instance.owner_id)
+
+
+@receiver(post_save, sender=Pet)
+def invalidate_overview_on_pet_save(sender, instance, raw=False, **kwargs):
+    caching.invalidate_overview(instance.owner_id)
+
+
+@receiver(pre_save, sender=HealthStatus)
+def remember_previous_reading(sender, instance, raw=False, **kwargs):
+    # Keep the bucket the reading used to live in so it can be refreshed too
+    instance._previous_reading = None
+    if instance.pk and not raw:
+        instance._previous_reading = (
+            HealthStatus.objects.filter(pk=instance.pk)
+            .values_list('pet_id', 'attribute_name', 'measured_at')
+            .first()
+        )
+
+
+@receiver(post_save, sender=HealthStatus)
+def update_rollups_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    readings = [(instance.pet_id, instance.attribute_name, instance.measured_at)]
+    previous = getattr(instance, '_previous_reading', None)
+    if previous is not None:
+        readings.append(previous)
+    rollups.refresh_readings(readings)
+
+    owner_ids = {instance.pet.owner_id}
+    if previous is not None and previous[0] != instance.pet_id:
+        owner_ids.update(Pet.objects.filter(pk=previous[0]).values_list('owner_id', flat=True))
+    caching.invalidate_overview(*owner_ids)
+
+
+@receiver(post_delete, sender=HealthStatus)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    if instance.pet_id in _pets_being_deleted():
+        return
+    rollups.refresh_readings([(instance.pet_id, instance.attribute_name, instance.measured_at)])
+    caching.invalidate_overview(instance.pet.owner_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Covers deactivation, password changes and deletion alike
+    authentication.invalidate_user(instance.pk)
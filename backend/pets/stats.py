@@ -0,0 +1,139 @@
+from datetime import date, timedelta
+import numpy as np
+from django.utils import timezone
+from .models import HealthStatus
+
+# Trailing windows the statistics are computed over; None means the whole history
+STATS_WINDOWS = {'last7': 7, 'last30': 30, 'last90': 90, 'all': None}
+DEFAULT_WINDOWS = ('last7', 'last30', 'all')
+DEFAULT_ROLLING_DAYS = 7
+
+SECONDS_PER_DAY = 86400
+EPOCH = date(1970, 1, 1)
+
+
+def series_queryset(pet_ids, attribute_names=None, since=None):
+    """
+    (pet_id, attribute_name, measured_at, value, sample_count, min_value,
+    max_value) of the numeric readings, in (pet, attribute, time) index order.
+    """
+    queryset = HealthStatus.objects.filter(pet_id__in=pet_ids, value__isnull=False)
+    if attribute_names:
+        queryset = queryset.filter(attribute_name__in=attribute_names)
+    if since is not None:
+        queryset = queryset.filter(measured_at__gte=since)
+    return queryset.order_by('pet_id', 'attribute_name', 'measured_at').values_list(
+        'pet_id', 'attribute_name', 'measured_at', 'value', 'sample_count', 'min_value', 'max_value'
+    )
+
+
+def fetch_series(pet_ids, attribute_names=None, since=None):
+    """
+    One columnar fetch of series_queryset(). Returns (keys, starts, seconds,
+    values, weights, lows, highs): the (pet_id, attribute_name) of each
+    series, the offset where each one starts, and NumPy arrays of the
+    readings. A compacted daily aggregate weighs its sample_count and brings
+    its own range; a raw reading weighs 1 and is its own range.
+    """
+    rows = list(series_queryset(pet_ids, attribute_names, since))
+    if not rows:
+        empty = np.zeros(0)
+        return [], np.zeros(0, dtype=np.intp), empty, empty, empty, empty, empty
+
+    pet_ids, attributes, measured_at, values, weights, lows, highs = zip(*rows)
+    seconds = np.fromiter((moment.timestamp() for moment in measured_at), dtype=np.float64, count=len(rows))
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    lows = np.fromiter((value if low is None else low for value, low in zip(values, lows)), dtype=np.float64, count=len(rows))
+    highs = np.fromiter((value if high is None else high for value, high in zip(values, highs)), dtype=np.float64, count=len(rows))
+
+    keys, starts = [], []
+    previous = None
+    for index, key in enumerate(zip(pet_ids, attributes)):
+        if key != previous:
+            keys.append(key)
+            starts.append(index)
+            previous = key
+    return keys, np.asarray(starts, dtype=np.intp), seconds, values, weights, lows, highs
+
+
+def describe(seconds, values, rolling_days, utc_offset, weights=None, lows=None, highs=None):
+    """
+    count, mean, min/max, (population) standard deviation, least-squares
+    trend in units per day, and the trailing `rolling_days` mean at each
+    calendar day with readings, for one time-sorted series. Every figure is
+    weighted by `weights` (the readings each row stands for; 1 by default)
+    and min/max come from `lows`/`highs` when given. The spread inside a
+    compacted day is not known, so the deviation only sees its mean.
+    """
+    if len(values) == 0:
+        return {'count': 0, 'mean': None, 'min': None, 'max': None, 'std': None, 'trend_per_day': None, 'rolling_mean': []}
+    weights = np.ones(len(values)) if weights is None else weights
+    lows = values if lows is None else lows
+    highs = values if highs is None else highs
+
+    count = weights.sum()
+    days = seconds / SECONDS_PER_DAY
+    mean = np.dot(weights, values) / count
+    centered_days = days - np.dot(weights, days) / count
+    spread = np.dot(weights * centered_days, centered_days)
+    slope = np.dot(weights * centered_days, values - mean) / spread if spread > 0 else None
+
+    # Readings per local calendar day, then a trailing sum over `rolling_days` days via cumulative sums
+    day_numbers = np.floor((seconds + utc_offset) / SECONDS_PER_DAY).astype(np.int64)
+    unique_days, first = np.unique(day_numbers, return_index=True)
+    day_sums = np.add.reduceat(weights * values, first)
+    day_counts = np.add.reduceat(weights, first)
+    cumulative_sums = np.concatenate(([0.0], np.cumsum(day_sums)))
+    cumulative_counts = np.concatenate(([0.0], np.cumsum(day_counts)))
+    window_starts = np.searchsorted(unique_days, unique_days - rolling_days + 1)
+    window_ends = np.arange(1, len(unique_days) + 1)
+    rolling = (cumulative_sums[window_ends] - cumulative_sums[window_starts]) / (
+        cumulative_counts[window_ends] - cumulative_counts[window_starts]
+    )
+
+    return {
+        'count': int(count),
+        'mean': float(mean),
+        'min': float(lows.min()),
+        'max': float(highs.max()),
+        'std': float(np.sqrt(np.dot(weights, (values - mean) ** 2) / count)),
+        'trend_per_day': float(slope) if slope is not None else None,
+        'rolling_mean': [
+            [(EPOCH + timedelta(days=int(day))).isoformat(), float(value)]
+            for day, value in zip(unique_days, rolling)
+        ],
+    }
+
+
+def compute(pet_ids, attribute_names=None, windows=DEFAULT_WINDOWS, rolling_days=DEFAULT_ROLLING_DAYS, now=None):
+    """
+    Statistics of every numeric attribute of the pets, per window:
+    {pet_id: {attribute_name: {window: {...}}}}. All the readings come
+    from one query over the widest window and are sliced per series and
+    window with NumPy.
+    """
+    now = now or timezone.now()
+    utc_offset = timezone.localtime(now).utcoffset().total_seconds()
+    window_starts = {
+        window: (now - timedelta(days=STATS_WINDOWS[window])).timestamp() if STATS_WINDOWS[window] else None
+        for window in windows
+    }
+    since = None
+    if all(start is not None for start in window_starts.values()):
+        since = now - timedelta(days=max(STATS_WINDOWS[window] for window in windows))
+
+    keys, starts, seconds, *columns = fetch_series(pet_ids, attribute_names, since)
+    ends = np.append(starts[1:], len(seconds))
+
+    results = {pet_id: {} for pet_id in pet_ids}
+    for (pet_id, attribute_name), start, end in zip(keys, starts, ends):
+        series_seconds = seconds[start:end]
+        series_columns = [column[start:end] for column in columns]
+        attribute_stats = results[pet_id][attribute_name] = {}
+        for window, window_start in window_starts.items():
+            # The series is sorted by time, so each window is a suffix of it
+            offset = 0 if window_start is None else np.searchsorted(series_seconds, window_start)
+            values, weights, lows, highs = (column[offset:] for column in series_columns)
+            attribute_stats[window] = describe(series_seconds[offset:], values, rolling_days, utc_offset, weights, lows, highs)
+    return results
@@ -0,0 +1,26 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+
+async def aiterate(iterable):
+    """
+    Walk a sync iterator from the event loop, each step on the request's sync
+    thread, so database cursors it holds stay on the thread that opened them.
+    """
+    iterator = iter(iterable)
+    fetch_next = sync_to_async(lambda: next(iterator, None))
+    while (chunk := await fetch_next()) is not None:
+        yield chunk
+
+
+def streaming_response(request, content, **kwargs):
+    """
+    StreamingHttpResponse of the sync iterator `content` that streams under
+    both servers: Django 4.2 reads a sync iterator into memory before sending
+    any of it under ASGI (and an async one under WSGI), so ASGI gets it
+    wrapped in aiterate().
+    """
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        content = aiterate(content)
+    return StreamingHttpResponse(content, **kwargs)
@@ -0,0 +1,71 @@
+import logging
+from celery import shared_task
+from django.conf import settings
+from PIL import Image
+from . import anomalies, partitions, reminders, retention
+from .images import delete_files, process_upload
+from .models import Pet, Vaccination
+
+logger = logging.getLogger(__name__)
+
+
+def _process_image_field(model, pk, field_name, variants_field_name):
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return
+
+    original_name = field_file.name
+    old_variants = getattr(instance, variants_field_name) or {}
+    try:
+        name, variants = process_upload(field_file)
+    except (OSError, Image.DecompressionBombError):
+        # Keep serving the upload as-is rather than failing on an unreadable image
+        logger.exception("Could not process %s of %s %s", field_name, model.__name__, pk)
+        return
+
+    # Only record the result if nobody uploaded a new file in the meantime
+    updated = model.objects.filter(pk=pk, **{field_name: original_name}).update(
+        **{field_name: name, variants_field_name: variants}
+    )
+    if not updated:
+        delete_files(field_file.storage, [name, *variants.values()])
+        return
+
+    stale = set(old_variants.values()) - set(variants.values())
+    if original_name != name:
+        stale.add(original_name)
+    delete_files(field_file.storage, stale)
+
+
+@shared_task
+def process_pet_avatar(pet_id):
+    _process_image_field(Pet, pet_id, 'avatar', 'avatar_variants')
+
+
+@shared_task
+def process_tag_proof(vaccination_id):
+    _process_image_field(Vaccination, vaccination_id, 'tag_proof', 'tag_proof_variants')
+
+
+@shared_task
+def send_vaccination_reminders():
+    reminders.send_reminders()
+
+
+@shared_task
+def detect_health_anomalies():
+    anomalies.scan()
+
+
+@shared_task
+def compact_health_data():
+    retention.compact()
+
+
+@shared_task
+def manage_health_partitions():
+    if partitions.is_partitioned():
+        partitions.maintain(settings.HEALTH_PARTITION_MONTHS_AHEAD, settings.HEALTH_PARTITION_RETENTION_MONTHS)
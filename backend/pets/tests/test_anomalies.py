@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase
+from .. import anomalies
+from ..models import HealthAlert, HealthStatus, Pet
+from .base import PetsAPITestCase
+
+START = datetime(2026, 1, 1, 8, tzinfo=dt_timezone.utc)
+
+
+def steady(day, level=5.0):
+    """A weight wobbling a little around `level`."""
+    return level + (day * 7 % 5 - 2) / 100
+
+
+class AnomalyScanTests(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user(username='owner')
+        self.pet = Pet.objects.create(name='Milk', species='Cat', owner=owner, gender='Female')
+        self.other_pet = Pet.objects.create(name='Butter', species='Cat', owner=owner, gender='Male')
+        self.days = 0
+
+    def add(self, *values, pet=None):
+        readings = []
+        for value in values:
+            readings.append(HealthStatus(
+                pet=pet or self.pet, attribute_name='Weight', unit='kg', value=value, measured_at=START + timedelta(days=self.days)
+            ))
+            self.days += 1
+        return HealthStatus.objects.bulk_create(readings)
+
+    def add_steady(self, count, level=5.0, pet=None):
+        return self.add(*(steady(self.days + day, level) for day in range(count)), pet=pet)
+
+    def scan(self, **kwargs):
+        with self.assertLogs('pets.anomalies', 'INFO'):
+            return anomalies.scan(**kwargs)
+
+    def alerts(self):
+        return set(HealthAlert.objects.values_list('reading_id', 'kind'))
+
+    def test_spike_creates_one_alert(self):
+        self.add_steady(40)
+        self.assertEqual(self.scan().alerts_created, 0)
+        [spike] = self.add(7.5)
+        self.add_steady(3)
+        run = self.scan()
+        self.assertEqual(run.alerts_created, 1)
+        alert = HealthAlert.objects.get()
+        self.assertEqual((alert.reading_id, alert.kind, alert.pet_id), (spike.id, 'zscore', self.pet.id))
+        self.assertAlmostEqual(alert.baseline, 5.0, places=1)
+
+    def test_rerun_without_new_readings(self):
+        self.add_steady(40)
+        self.add(7.5)
+        self.assertEqual(self.scan().alerts_created, 1)
+        run = self.scan()
+        self.assertEqual((run.pets_scanned, run.alerts_created), (0, 0))
+        self.assertEqual(self.scan(full=True).alerts_created, 0)
+        self.assertEqual(HealthAlert.objects.count(), 1)
+
+    def test_watermark_advances(self):
+        self.add_steady(20)
+        first = self.scan()
+        self.assertEqual(first.last_reading_id, HealthStatus.objects.latest('id').id)
+        [*_, last] = self.add_steady(5, pet=self.other_pet)
+        second = self.scan()
+        self.assertEqual((second.last_reading_id, second.pets_scanned), (last.id, 1))
+        # Scanning chosen pets leaves the watermark alone
+        self.add_steady(5)
+        self.assertEqual(self.scan(pet_ids=[self.pet.id]).last_reading_id, last.id)
+        self.assertEqual(self.scan().pets_scanned, 1)
+
+    def test_loads_only_the_recent_history(self):
+        self.add_steady(100)
+        self.scan()
+        since = HealthStatus.objects.latest('id').id
+        self.add_steady(5)
+        series = anomalies.load_series([self.pet.id, self.other_pet.id], since_reading_id=since)
+        self.assertEqual(len(series['values']), anomalies.history_size() + 5)
+        self.assertEqual(series['history'].sum(), settings.HEALTH_ALERT_WINDOW + 1)
+        self.assertIsNone(anomalies.load_series([self.other_pet.id], since_reading_id=since))
+        # A series shorter than the history is loaded whole and scanned as such
+        self.add_steady(10, pet=self.other_pet)
+        series = anomalies.load_series([self.other_pet.id], since_reading_id=since)
+        self.assertEqual((len(series['values']), series['history'].sum()), (10, 0))
+
+    def test_incremental_scans_match_a_full_scan(self):
+        self.add_steady(60)
+        self.scan()
+        # A level shift and a spike arriving a few readings at a time
+        for _ in range(5):
+            self.add_steady(4, level=6.0)
+            self.scan()
+        self.add(9.0)
+        self.add_steady(20, level=6.0)
+        self.scan()
+        incremental = self.alerts()
+        self.assertEqual({kind for _, kind in incremental}, {'zscore', 'change_point'})
+        HealthAlert.objects.all().delete()
+        self.scan(full=True)
+        self.assertEqual(self.alerts(), incremental)
+
+
+class HealthAlertAPITests(PetsAPITestCase):
+    def test_owner_sees_own_alerts(self):
+        reading = HealthStatus.objects.create(pet=self.pet, attribute_name='Weight', value=7.5, measured_at=START)
+        HealthAlert.objects.create(
+            pet=self.pet, attribute_name='Weight', kind='zscore', reading_id=reading.id, value=7.5, measured_at=START, baseline=5.0, score=4.2,
+        )
+        response = self.client.get('/api/health-alerts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([alert['reading_id'] for alert in response.data['results']], [reading.id])
+        self.authenticate(User.objects.create_user(username='other'))
+        self.assertEqual(self.client.get('/api/health-alerts/').data['results'], [])
@@ -0,0 +1,114 @@
+import importlib
+import json
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from asgiref.sync import async_to_sync
+from django.test import override_settings
+from django.urls import clear_url_caches, resolve
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models import HealthStatus, Vaccination
+from ..views.asynchronous import AsyncDashboardOverviewView, AsyncHealthStatusViewSet, AsyncPetViewSet, AsyncVaccinationViewSet
+from .base import PetsAPITestCase
+
+START = datetime(2026, 3, 1, tzinfo=dt_timezone.utc)
+
+
+def wait(awaitable):
+    # AsyncClient methods return awaitables without being coroutine functions themselves
+    async def run():
+        return await awaitable
+    return async_to_sync(run)()
+
+
+def reload_urlconf():
+    import backend.urls
+    import pets.urls
+    importlib.reload(pets.urls)
+    importlib.reload(backend.urls)
+    clear_url_caches()
+
+
+class AsyncViewParityTests(PetsAPITestCase):
+    """With ASYNC_VIEWS the async views take over the same URLs and answer exactly like the sync ones."""
+
+    def setUp(self):
+        super().setUp()
+        for day in range(12):
+            HealthStatus.objects.create(pet=self.pet, attribute_name='Weight', value=4 + day / 10, measured_at=START + timedelta(days=day))
+            HealthStatus.objects.create(pet=self.other_pet, attribute_name='Mood', mood='Clingy', measured_at=START + timedelta(days=day, hours=1))
+        for day in range(7):
+            Vaccination.objects.create(pet=self.pet, vaccination_name=f'Shot {day}', vaccination_status='Pending', schedule_at=date(2026, 3, 1) + timedelta(days=day))
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    def enable_async_views(self):
+        settings_override = override_settings(ASYNC_VIEWS=True)
+        settings_override.enable()
+        self.addCleanup(reload_urlconf)
+        self.addCleanup(settings_override.disable)
+        reload_urlconf()
+
+    def async_get(self, url, params=None):
+        return wait(self.async_client.get(url, params or {}, headers={'Authorization': f'Bearer {self.token}'}))
+
+    def content(self, response):
+        if response.streaming:
+            async def consume():
+                return b''.join([chunk async for chunk in response.streaming_content])
+            return json.loads(async_to_sync(consume)())
+        return response.json()
+
+    def compare(self, requests):
+        sync_responses = [self.client.get(url, params) for url, params in requests]
+        self.enable_async_views()
+        for (url, params), expected in zip(requests, sync_responses):
+            with self.subTest(url=url, params=params):
+                response = self.async_get(url, params)
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(self.content(response), json.loads(b''.join(expected) if expected.streaming else expected.content))
+
+    def test_async_views_are_routed(self):
+        self.enable_async_views()
+        for url, view in [
+            ('/api/pets/', AsyncPetViewSet), ('/api/health-status/', AsyncHealthStatusViewSet),
+            ('/api/vaccination/', AsyncVaccinationViewSet), ('/api/dashboard/overview/', AsyncDashboardOverviewView),
+        ]:
+            with self.subTest(url=url):
+                self.assertIs(resolve(url).func.cls, view)
+        # Detail routes stay on the sync viewsets
+        self.assertNotIsInstance(resolve(f'/api/pets/{self.pet.id}/').func.cls, AsyncPetViewSet)
+
+    def test_lists(self):
+        self.compare([
+            ('/api/pets/', {}),
+            ('/api/pets/', {'health_limit': 3}),
+            ('/api/health-status/', {'ordering': '-measured_at'}),
+            ('/api/health-status/', {'ordering': '-measured_at', 'page': 2, 'pet': self.pet.id}),
+            ('/api/health-status/', {'pagination': 'cursor', 'attribute_name': 'Weight'}),
+            ('/api/health-status/', {'page': 9}),
+            ('/api/vaccination/', {'page_size': 3}),
+            ('/api/vaccination/', {'pagination': 'cursor', 'pet': self.pet.id}),
+        ])
+
+    def test_overview(self):
+        self.compare([
+            ('/api/dashboard/overview/', {}),
+            ('/api/dashboard/overview/', {'filter': 'last30'}),
+            ('/api/dashboard/overview/', {'stream': 1}),
+            ('/api/dashboard/overview/', {'resolution': 'day'}),
+            ('/api/dashboard/overview/', {'filter': 'yesterday'}),
+        ])
+
+    def test_unauthenticated(self):
+        self.client.credentials()
+        expected = self.client.get('/api/pets/')
+        self.enable_async_views()
+        response = wait(self.async_client.get('/api/pets/'))
+        self.assertEqual((response.status_code, response.json()), (expected.status_code, expected.json()))
+
+    def test_writes_go_to_the_sync_view(self):
+        self.enable_async_views()
+        response = wait(self.async_client.post(
+            '/api/health-status/', {'pet': self.pet.id, 'attribute_name': 'Weight', 'value': 5}, content_type='application/json',
+            headers={'Authorization': f'Bearer {self.token}'},
+        ))
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertTrue(HealthStatus.objects.filter(pk=response.json()['id'], value=5).exists())
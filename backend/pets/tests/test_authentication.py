@@ -0,0 +1,62 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..authentication import CachedJWTAuthentication, build_user
+from .base import PetsAPITestCase
+
+
+class CachedJWTAuthenticationTests(PetsAPITestCase):
+    """request.user comes from the cache, and User writes drop the cached entry."""
+
+    def authenticate_request(self, user):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        return CachedJWTAuthentication().authenticate(request)[0]
+
+    def test_build_user_keeps_each_field_in_place(self):
+        user = build_user(self.user.id, is_active=False, is_staff=True)
+        self.assertEqual((user.pk, user.is_active, user.is_staff), (self.user.id, False, True))
+        user = build_user(self.user.id, is_staff=False, is_active=True)
+        self.assertEqual((user.pk, user.is_active, user.is_staff), (self.user.id, True, False))
+
+    def test_flags_come_from_the_user(self):
+        admin = User.objects.create_user(username='admin', is_staff=True)
+        for user in (self.user, admin):
+            with self.subTest(user=user.username):
+                for _ in range(2):  # Loaded, then cached
+                    cached = self.authenticate_request(user)
+                    self.assertEqual((cached.pk, cached.is_active, cached.is_staff), (user.pk, True, user.is_staff))
+
+    def test_cached_user_needs_no_query(self):
+        self.authenticate_request(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            user = self.authenticate_request(self.user)
+        self.assertEqual(len(queries), 0)
+        # Everything else is deferred and loaded on access
+        self.assertEqual(user.username, 'owner')
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.client.get('/api/health-status/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/health-status/').status_code, 401)
+
+    def test_deleted_user_is_rejected(self):
+        self.assertEqual(self.client.get('/api/health-status/').status_code, 200)
+        self.user.delete()
+        self.assertEqual(self.client.get('/api/health-status/').status_code, 401)
+
+    def test_promotion_is_seen(self):
+        self.assertEqual(self.client.get('/api/dashboard/overview/cache-stats/').status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get('/api/dashboard/overview/cache-stats/').status_code, 200)
+
+    @override_settings(JWT_USER_FROM_CLAIMS=True)
+    def test_user_from_claims(self):
+        with CaptureQueriesContext(connection) as queries:
+            user = self.authenticate_request(self.user)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual((user.pk, user.is_active, user.is_staff), (self.user.pk, True, False))
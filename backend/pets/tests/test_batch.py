@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from ..models import HealthStatus, Pet
+from .base import PetsAPITestCase
+
+START = datetime(2026, 3, 1, tzinfo=dt_timezone.utc)
+URL = '/api/health-status/batch/'
+
+
+class HealthStatusBatchTests(PetsAPITestCase):
+    def readings(self, count, pet=None, attribute_name='Weight'):
+        return [
+            {'pet': (pet or self.pet).id, 'attribute_name': attribute_name, 'value': 4 + i / 100, 'measured_at': (START + timedelta(hours=i)).isoformat()}
+            for i in range(count)
+        ]
+
+    def post(self, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(URL, data, format='json')
+        self.queries = len(queries)
+        return response
+
+    def test_all_valid(self):
+        response = self.post(self.readings(3) + [{'pet': self.other_pet.id, 'attribute_name': 'Mood', 'mood': 'Clingy'}])
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['errors'], [])
+        self.assertEqual(len(response.data['created']), 4)
+        self.assertTrue(all(reading['id'] for reading in response.data['created']))
+        self.assertEqual(HealthStatus.objects.filter(pet=self.pet, unit='kg').count(), 3)
+        # Without measured_at a reading is taken as measured now
+        self.assertIsNotNone(HealthStatus.objects.get(attribute_name='Mood').measured_at)
+
+    def test_wrapped_list(self):
+        response = self.post({'readings': self.readings(2)})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(HealthStatus.objects.count(), 2)
+
+    def test_mixed_items(self):
+        stranger = User.objects.create_user(username='stranger')
+        strangers_pet = Pet.objects.create(name='Stray', species='Dog', owner=stranger, gender='Male')
+        items = self.readings(2)
+        items.insert(1, {'pet': self.pet.id, 'attribute_name': 'Height', 'value': 1})
+        items.append(self.readings(1, pet=strangers_pet)[0])
+        items.append({'attribute_name': 'Weight', 'value': 5})
+        response = self.post(items)
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([reading['value'] for reading in response.data['created']], [4.0, 4.01])
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 3, 4])
+        errors = {error['index']: error['errors'] for error in response.data['errors']}
+        self.assertIn('attribute_name', errors[1])
+        self.assertEqual(errors[3], {'pet': ['You do not have permission to add health data for this pet.']})
+        self.assertIn('pet', errors[4])
+        self.assertFalse(HealthStatus.objects.filter(pet=strangers_pet).exists())
+        self.assertEqual(HealthStatus.objects.count(), 2)
+
+    def test_nothing_valid(self):
+        response = self.post([{'pet': self.pet.id, 'attribute_name': 'Height'}, {'pet': 'milk'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((response.data['created'], len(response.data['errors'])), ([], 2))
+        self.assertFalse(HealthStatus.objects.exists())
+
+    def test_rejected_batches(self):
+        for data in ([], {}, {'readings': 'Weight'}, self.readings(1001)):
+            with self.subTest(items=len(data)):
+                response = self.post(data)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
+        self.assertIn('at most 1000', response.data['error'])
+        self.assertFalse(HealthStatus.objects.exists())
+        self.assertEqual(self.post(self.readings(1000)).status_code, 201)
+
+    def test_no_query_per_reading(self):
+        self.post(self.readings(500) + self.readings(500, pet=self.other_pet))
+        self.assertEqual(HealthStatus.objects.count(), 1000)
+        # Inserts and rollup updates go in chunks, not a statement per reading
+        self.assertLess(self.queries, 50)
@@ -0,0 +1,80 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from .. import caching
+from ..models import HealthStatus
+from .base import PetsAPITestCase
+
+
+class OverviewCacheTests(PetsAPITestCase):
+    """Writes drop the cached dashboard overview of the owner."""
+
+    def setUp(self):
+        super().setUp()
+        self.reading = HealthStatus.objects.create(pet=self.pet, attribute_name='Weight', value=4.2)
+
+    def overview(self, **params):
+        response = self.client.get('/api/dashboard/overview/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def assertInvalidated(self, write, **params):
+        self.overview(**params)
+        key = caching.overview_key(self.user.id, params.get('filter', 'all'), params.get('resolution'))
+        self.assertIsNotNone(cache.get(key))
+        write()
+        self.assertIsNone(cache.get(key))
+
+    def weights(self, data):
+        return sorted(reading['value'] for reading in data.get(self.pet.id, {}).get('Weight', []))
+
+    def test_cached_until_written(self):
+        self.overview()
+        hits = caching.overview_stats()['hits']
+        self.overview()
+        self.assertEqual(caching.overview_stats()['hits'], hits + 1)
+
+    def test_unknown_filter_shares_the_all_entry(self):
+        self.overview(filter='bogus')
+        self.assertIsNotNone(cache.get(caching.overview_key(self.user.id, 'all')))
+
+    def test_create(self):
+        for params in ({}, {'filter': 'last7'}, {'resolution': 'day'}):
+            with self.subTest(**params):
+                self.assertInvalidated(
+                    lambda: self.client.post('/api/health-status/', {'pet': self.pet.id, 'attribute_name': 'Weight', 'value': 4.4}, format='json'),
+                    **params,
+                )
+        self.assertEqual(self.weights(self.overview()), [4.2, 4.4, 4.4, 4.4])
+
+    def test_update(self):
+        self.assertInvalidated(lambda: self.client.patch(f'/api/health-status/{self.reading.id}/', {'value': 5.0}, format='json'))
+        self.assertEqual(self.weights(self.overview()), [5.0])
+
+    def test_delete(self):
+        self.assertInvalidated(lambda: self.client.delete(f'/api/health-status/{self.reading.id}/'))
+        self.assertEqual(self.weights(self.overview()), [])
+
+    def test_batch(self):
+        items = [{'pet': self.pet.id, 'attribute_name': 'Weight', 'value': 4.4}]
+        self.assertInvalidated(lambda: self.client.post('/api/health-status/batch/', items, format='json'), resolution='week')
+        self.assertEqual(self.weights(self.overview()), [4.2, 4.4])
+
+    def test_pet_delete(self):
+        self.assertInvalidated(lambda: self.client.delete(f'/api/pets/{self.pet.id}/'))
+        self.assertNotIn(self.pet.id, self.overview())
+
+    def test_other_owners_keep_their_entry(self):
+        other = User.objects.create_user(username='other')
+        self.authenticate(other)
+        self.overview()
+        self.authenticate(self.user)
+        self.client.patch(f'/api/health-status/{self.reading.id}/', {'value': 5.0}, format='json')
+        self.assertIsNotNone(cache.get(caching.overview_key(other.id, 'all')))
+
+    def test_cache_stats_need_admin(self):
+        self.assertEqual(self.client.get('/api/dashboard/overview/cache-stats/').status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get('/api/dashboard/overview/cache-stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {'hits', 'misses', 'hit_ratio'})
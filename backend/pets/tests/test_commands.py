@@ -0,0 +1,107 @@
+import json
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import F
+from django.test import LiveServerTestCase, TestCase
+from .. import rollups
+from ..management.commands import check_query_plans
+from ..management.commands.benchmark_api import ENDPOINTS
+from ..models import HealthStatus, HealthStatusRollup, Pet, Vaccination
+from .base import rollup_snapshot
+
+# Readings per pet over MOCK_DAYS days: six daily series, coat condition every 3 days and length weekly
+MOCK_DAYS = 30
+MOCK_READINGS_PER_PET = 6 * MOCK_DAYS + 10 + 5
+
+
+class GenerateMockDataTests(TestCase):
+    def generate(self, *args):
+        out = StringIO()
+        call_command('generate_mock_data', '--users', '2', '--pets-per-user', '3', '--days', str(MOCK_DAYS), *args, stdout=out)
+        return out.getvalue()
+
+    def test_row_counts(self):
+        output = self.generate()
+        self.assertIn('Successfully generated mock data for 6 pets of 2 users', output)
+        self.assertEqual(Pet.objects.count(), 6)
+        self.assertEqual(HealthStatus.objects.count(), 6 * MOCK_READINGS_PER_PET)
+        for pet in Pet.objects.all():
+            self.assertEqual(pet.health_attributes.filter(attribute_name='Weight').count(), MOCK_DAYS)
+            self.assertEqual(pet.health_attributes.filter(attribute_name='Mood', mood__isnull=False).count(), MOCK_DAYS)
+            self.assertEqual(pet.health_attributes.filter(attribute_name='Coat Condition', coat_condition__isnull=False).count(), 10)
+        # One completed vaccination per vaccine; no annual booster falls within 30 days
+        self.assertEqual(Vaccination.objects.count(), 6 * 4)
+        self.assertFalse(HealthStatus.objects.exclude(created_at=F('measured_at')).exists())
+
+    def test_reruns_replace_the_same_data(self):
+        self.generate()
+        first = sorted(HealthStatus.objects.values_list('pet_id', 'attribute_name', 'value', 'mood', 'coat_condition', 'measured_at'))
+        self.generate()
+        self.assertEqual(Pet.objects.count(), 6)
+        self.assertEqual(sorted(HealthStatus.objects.values_list('pet_id', 'attribute_name', 'value', 'mood', 'coat_condition', 'measured_at')), first)
+
+    def test_rollups_are_rebuilt(self):
+        self.generate()
+        generated = rollup_snapshot()
+        self.assertTrue(generated)
+        rollups.rebuild()
+        self.assertEqual(generated, rollup_snapshot())
+
+    def test_skip_rollups(self):
+        self.generate('--skip-rollups')
+        self.assertFalse(HealthStatusRollup.objects.exists())
+
+
+class CheckQueryPlansTests(TestCase):
+    def check(self, *args):
+        out = StringIO()
+        call_command('check_query_plans', *args, stdout=out)
+        return out.getvalue()
+
+    def test_hot_queries_use_their_indexes(self):
+        # PostgreSQL rightly prefers sequential scans on small tables, so it gets the full-size seed
+        output = self.check(*([] if connection.vendor == 'postgresql' else ['--pets', '40', '--readings-per-pet', '200']))
+        self.assertIn('All hot queries use their intended index', output)
+        self.assertIn('--- HealthStatusViewSet value range for pet (expects healthstatus_pet_attr_val_idx)', output)
+        # The seeded data is rolled back
+        self.assertFalse(Pet.objects.exists())
+        self.assertFalse(HealthStatus.objects.exists())
+
+    def test_unindexed_query_fails(self):
+        def get_queries(command, user):
+            return [('Readings by unit', HealthStatus.objects.filter(unit='kg'), 'healthstatus_pet_measured_idx')]
+
+        with mock.patch.object(check_query_plans.Command, 'get_queries', get_queries):
+            with self.assertRaisesMessage(CommandError, 'Readings by unit: sequential scan on pets_healthstatus'):
+                self.check('--pets', '40', '--readings-per-pet', '200')
+
+    def test_unknown_user(self):
+        with self.assertRaisesMessage(CommandError, 'User with ID 999 does not exist.'):
+            call_command('check_query_plans', '--user-id', '999', stdout=StringIO())
+
+
+class BenchmarkAPITests(LiveServerTestCase):
+    """A very short run against the test server, seeded by the command itself."""
+
+    def test_smoke(self):
+        out = StringIO()
+        call_command(
+            'benchmark_api', '--base-url', self.live_server_url, '--users', '2', '--days', '3',
+            '--requests', '4', '--warmup', '1', '--concurrency', '1', stdout=out, stderr=StringIO(),
+        )
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['users'], 2)
+        self.assertIsNone(report['server'])
+        self.assertEqual(set(report['endpoints']), set(ENDPOINTS))
+        for path, result in report['endpoints'].items():
+            with self.subTest(path=path):
+                self.assertEqual((result['requests'], result['errors']), (4, 0))
+                self.assertIsNotNone(result['latency_ms']['p99'])
+                self.assertGreater(result['sql_queries'], 0)
+
+    def test_compare_needs_local_servers(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_api', '--compare', '--base-url', self.live_server_url, '--skip-seed', stdout=StringIO())
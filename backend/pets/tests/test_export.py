@@ -0,0 +1,92 @@
+import csv
+import json
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import User
+from ..export import EXPORT_COLUMNS
+from ..models import HealthStatus, Pet, Vaccination
+from .base import PetsAPITestCase
+
+START = datetime(2026, 3, 1, 12, tzinfo=dt_timezone.utc)
+
+
+class ExportTests(PetsAPITestCase):
+    def setUp(self):
+        super().setUp()
+        for day in range(6):
+            HealthStatus.objects.create(pet=self.pet, attribute_name='Weight', value=4 + day / 10, measured_at=START + timedelta(days=day))
+            HealthStatus.objects.create(pet=self.pet, attribute_name='Length', value=40 + day, measured_at=START + timedelta(days=day, hours=1))
+        HealthStatus.objects.create(pet=self.other_pet, attribute_name='Weight', value=6, measured_at=START)
+        for day, name in ((0, 'Rabies'), (3, 'FVRCP'), (9, 'FeLV')):
+            Vaccination.objects.create(pet=self.pet, vaccination_name=name, vaccination_status='Pending', schedule_at=date(2026, 3, 1) + timedelta(days=day))
+
+    def export(self, **params):
+        response = self.client.get(f'/api/pets/{self.pet.id}/export/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        if params.get('output') == 'ndjson':
+            self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+            return [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="pet-{self.pet.id}-history.csv"')
+        reader = csv.DictReader(StringIO(content))
+        self.assertEqual(reader.fieldnames, EXPORT_COLUMNS)
+        return list(reader)
+
+    def summary(self, rows):
+        return [
+            # NDJSON rows only have the fields of their record type, CSV rows leave the others empty
+            (row['record_type'], row.get('attribute_name') or row['vaccination_name'], (row.get('measured_at') or row['schedule_at'])[:10])
+            for row in rows
+        ]
+
+    def test_everything(self):
+        for output in ('csv', 'ndjson'):
+            with self.subTest(output=output):
+                rows = self.export(output=output)
+                self.assertEqual(len(rows), 15)
+                self.assertEqual({row['record_type'] for row in rows[:12]}, {'health'})
+                self.assertEqual([row['vaccination_name'] for row in rows[12:]], ['Rabies', 'FVRCP', 'FeLV'])
+                self.assertEqual({str(row['pet_id']) for row in rows}, {str(self.pet.id)})
+
+    def test_filters(self):
+        for output in ('csv', 'ndjson'):
+            with self.subTest(output=output):
+                rows = self.export(output=output, start='2026-03-02', end='2026-03-04', attribute='Weight')
+                self.assertEqual(self.summary(rows), [
+                    ('health', 'Weight', '2026-03-02'), ('health', 'Weight', '2026-03-03'), ('health', 'Weight', '2026-03-04'),
+                    ('vaccination', 'FVRCP', '2026-03-04'),
+                ])
+        rows = self.export(output='ndjson', start='2026-03-04T12:30:00Z', include='health')
+        self.assertEqual(self.summary(rows), [
+            ('health', 'Length', '2026-03-04'), ('health', 'Weight', '2026-03-05'), ('health', 'Length', '2026-03-05'),
+            ('health', 'Weight', '2026-03-06'), ('health', 'Length', '2026-03-06'),
+        ])
+        self.assertEqual(self.summary(self.export(output='ndjson', include='vaccination', end='2026-03-03')), [('vaccination', 'Rabies', '2026-03-01')])
+
+    def test_many_rows(self):
+        with mock.patch('pets.export.ROWS_PER_WRITE', 4), mock.patch('pets.export.CHUNK_SIZE', 5):
+            response = self.client.get(f'/api/pets/{self.pet.id}/export/', {'output': 'ndjson'})
+            chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(len(b''.join(chunks).splitlines()), 15)
+
+    def test_invalid_parameters(self):
+        for params, name in [
+            ({'output': 'xml'}, 'output'),
+            ({'include': 'health,photos'}, 'include'),
+            ({'include': ','}, 'include'),
+            ({'start': 'last week'}, 'start'),
+            ({'attribute': 'Height'}, 'attribute'),
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get(f'/api/pets/{self.pet.id}/export/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(name, response.data)
+
+    def test_other_owners_pet(self):
+        stranger = User.objects.create_user(username='stranger')
+        pet = Pet.objects.create(name='Stray', species='Dog', owner=stranger, gender='Male')
+        self.assertIn(self.client.get(f'/api/pets/{pet.id}/export/').status_code, (403, 404))
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from ..models import HealthStatus
+from .base import PetsAPITestCase
+
+START = datetime(2026, 3, 1, tzinfo=dt_timezone.utc)
+
+
+class HealthStatusFilterTests(PetsAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.readings = {}
+        for day in range(5):
+            for attribute_name, value in (('Weight', 4 + day / 10), ('Length', 30 + day)):
+                self.readings[attribute_name, day] = HealthStatus.objects.create(
+                    pet=self.pet, attribute_name=attribute_name, value=value, measured_at=START + timedelta(days=day, hours=12),
+                )
+        HealthStatus.objects.create(pet=self.pet, attribute_name='Mood', mood='Happy', measured_at=START)
+        HealthStatus.objects.create(pet=self.other_pet, attribute_name='Weight', value=6, measured_at=START)
+
+    def ids(self, params, status=200):
+        response = self.client.get('/api/health-status/', {'pet': self.pet.id, 'page_size': 100, **params})
+        self.assertEqual(response.status_code, status, response.content)
+        return sorted(item['id'] for item in response.data['results']) if status == 200 else response.data
+
+    def expected(self, attribute_names=('Weight', 'Length'), days=range(5)):
+        return sorted(self.readings[attribute_name, day].id for attribute_name in attribute_names for day in days)
+
+    def test_attribute_name(self):
+        self.assertEqual(self.ids({'attribute_name': 'Weight'}), self.expected(['Weight']))
+        self.assertEqual(self.ids({'attribute_name': 'Weight, Length'}), self.expected())
+        self.assertEqual(self.ids({'attribute': ['Weight', 'Length']}), self.expected())
+        self.assertIn('attribute_name', self.ids({'attribute_name': 'Height'}, status=400))
+        self.assertIn('attribute', self.ids({'attribute': 'Weight,Height'}, status=400))
+
+    def test_measured_at_bounds(self):
+        self.assertEqual(self.ids({'attribute_name': 'Weight', 'measured_after': '2026-03-02', 'measured_before': '2026-03-04'}), self.expected(['Weight'], [1, 2, 3]))
+        # A datetime end is exclusive
+        self.assertEqual(self.ids({'attribute_name': 'Weight', 'measured_before': '2026-03-02T12:00:00Z'}), self.expected(['Weight'], [0]))
+        self.assertEqual(self.ids({'attribute_name': 'Weight', 'measured_after': '2026-03-02T12:00:00Z'}), self.expected(['Weight'], [1, 2, 3, 4]))
+        self.assertEqual(self.ids({'attribute': 'Weight', 'start': '2026-03-02', 'end': '2026-03-04'}), self.expected(['Weight'], [1, 2, 3]))
+        self.assertIn('measured_after', self.ids({'measured_after': 'yesterday'}, status=400))
+        self.assertIn('end', self.ids({'end': '2026-02-30'}, status=400))
+
+    def test_value_bounds(self):
+        self.assertEqual(self.ids({'value_min': '4.1', 'value_max': '4.3'}), self.expected(['Weight'], [1, 2, 3]))
+        self.assertEqual(self.ids({'value_min': 'heavy'}, status=400), {'value_min': 'Must be a number.'})
+        self.assertIn('value_max', self.ids({'value_max': '4,2'}, status=400))
+
+    def test_ordering(self):
+        for ordering, order_by in [
+            ('value', ('value', 'id')),
+            ('-value', ('-value', '-id')),
+            ('attribute_name,-measured_at', ('attribute_name', '-measured_at', 'id')),
+            ('-measured_at,id', ('-measured_at', 'id')),
+        ]:
+            with self.subTest(ordering=ordering):
+                response = self.client.get('/api/health-status/', {'pet': self.pet.id, 'page_size': 100, 'ordering': ordering})
+                self.assertEqual(
+                    [item['id'] for item in response.data['results']],
+                    list(HealthStatus.objects.filter(pet=self.pet).order_by(*order_by).values_list('id', flat=True)),
+                )
+
+    def test_invalid_ordering(self):
+        for ordering in ('weight', 'value,mood', 'pet__owner'):
+            with self.subTest(ordering=ordering):
+                self.assertIn('ordering', self.ids({'ordering': ordering}, status=400))
+
+    def test_cursor_ordering(self):
+        ids = self.walk('/api/health-status/', {'pet': self.pet.id, 'pagination': 'cursor', 'page_size': 3, 'ordering': '-created_at'})
+        self.assertEqual(ids, list(HealthStatus.objects.filter(pet=self.pet).order_by('-created_at', '-id').values_list('id', flat=True)))
+        for ordering in ('value', 'attribute_name', 'measured_at,value', 'measured_at,-id'):
+            with self.subTest(ordering=ordering):
+                self.assertIn('ordering', self.ids({'pagination': 'cursor', 'ordering': ordering}, status=400))
+
+    def test_export_accepts_the_list_parameters(self):
+        response = self.client.get(
+            f'/api/pets/{self.pet.id}/export/',
+            {'output': 'ndjson', 'include': 'health', 'attribute_name': 'Weight', 'measured_after': '2026-03-02', 'measured_before': '2026-03-03'},
+        )
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
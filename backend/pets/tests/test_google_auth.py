@@ -0,0 +1,161 @@
+import json
+import time
+from unittest import mock
+import requests
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from google.auth import crypt, jwt
+from rest_framework.test import APITestCase
+from .. import google_auth
+from ..google_auth import CertificatesUnavailable, GoogleIDTokenVerifier, HTTPCertificateSource, StaticCertificateSource
+
+AUDIENCE = 'test-client.apps.googleusercontent.com'
+
+
+def generate_key():
+    """(private key PEM, public key PEM) of a fresh RSA key standing in for one of Google's."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    public_pem = key.public_key().public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    return private_pem, public_pem.decode()
+
+
+class SignedTokenMixin:
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.private_pem, public_pem = generate_key()
+        cls.certificates = {'key-1': public_pem}
+
+    def sign(self, key_id='key-1', **claims):
+        now = int(time.time())
+        payload = {
+            'iss': 'https://accounts.google.com', 'aud': AUDIENCE, 'sub': '1234567890',
+            'email': 'owner@example.com', 'iat': now, 'exp': now + 3600, **claims,
+        }
+        return jwt.encode(crypt.RSASigner.from_string(self.private_pem, key_id=key_id), payload).decode()
+
+
+class GoogleIDTokenVerifierTests(SignedTokenMixin, SimpleTestCase):
+    def setUp(self):
+        self.verifier = GoogleIDTokenVerifier(AUDIENCE, StaticCertificateSource(self.certificates))
+
+    def test_valid_token(self):
+        idinfo = self.verifier.verify(self.sign())
+        self.assertEqual((idinfo['email'], idinfo['aud']), ('owner@example.com', AUDIENCE))
+
+    def test_rejected_tokens(self):
+        now = int(time.time())
+        for name, token in [
+            ('wrong audience', self.sign(aud='someone-else.apps.googleusercontent.com')),
+            ('expired', self.sign(iat=now - 7200, exp=now - 3600)),
+            ('unknown key id', self.sign(key_id='key-2')),
+            ('wrong issuer', self.sign(iss='https://evil.example.com')),
+            ('tampered', self.sign()[:-4] + 'AAAA'),
+            ('empty', ''),
+        ]:
+            with self.subTest(name):
+                with self.assertRaises(ValueError):
+                    self.verifier.verify(token)
+
+    def test_signed_by_another_key(self):
+        _, other_public_pem = generate_key()
+        verifier = GoogleIDTokenVerifier(AUDIENCE, StaticCertificateSource({'key-1': other_public_pem}))
+        with self.assertRaises(ValueError):
+            verifier.verify(self.sign())
+
+
+class FakeSession:
+    """Serves a fixed certificates response and counts the requests."""
+
+    def __init__(self, certificates, cache_control='public, max-age=100'):
+        self.certificates = certificates
+        self.cache_control = cache_control
+        self.fail = False
+        self.requests = 0
+
+    def get(self, url, timeout):
+        self.requests += 1
+        if self.fail:
+            raise requests.ConnectionError('Google is unreachable')
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(self.certificates).encode()
+        response.headers['Cache-Control'] = self.cache_control
+        return response
+
+
+class HTTPCertificateSourceTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = 1000.0
+        patcher = mock.patch('pets.google_auth.time.monotonic', side_effect=lambda: self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.session = FakeSession({'key-1': 'PEM 1'})
+        self.source = HTTPCertificateSource(session=self.session)
+
+    def test_kept_for_max_age(self):
+        self.assertEqual(self.source.get_certificates(), {'key-1': 'PEM 1'})
+        self.session.certificates = {'key-2': 'PEM 2'}
+        self.clock += 99
+        self.assertEqual(self.source.get_certificates(), {'key-1': 'PEM 1'})
+        self.assertEqual(self.session.requests, 1)
+        self.clock += 2
+        self.assertEqual(self.source.get_certificates(), {'key-2': 'PEM 2'})
+        self.assertEqual(self.session.requests, 2)
+
+    def test_default_max_age(self):
+        self.session.cache_control = 'no-transform'
+        self.source.get_certificates()
+        self.clock += google_auth.DEFAULT_MAX_AGE - 1
+        self.source.get_certificates()
+        self.assertEqual(self.session.requests, 1)
+
+    def test_failed_refresh_keeps_the_cached_certificates(self):
+        self.source.get_certificates()
+        self.session.fail = True
+        self.clock += 101
+        with self.assertLogs('pets.google_auth', 'WARNING'):
+            self.assertEqual(self.source.get_certificates(), {'key-1': 'PEM 1'})
+        # Retried only after RETRY_AFTER
+        self.source.get_certificates()
+        self.assertEqual(self.session.requests, 2)
+        self.session.fail = False
+        self.clock += google_auth.RETRY_AFTER
+        self.source.get_certificates()
+        self.assertEqual(self.session.requests, 3)
+
+    def test_unavailable_without_cached_certificates(self):
+        self.session.fail = True
+        with self.assertRaises(CertificatesUnavailable):
+            self.source.get_certificates()
+
+
+class GoogleLoginTests(SignedTokenMixin, APITestCase):
+    def setUp(self):
+        verifier = GoogleIDTokenVerifier(AUDIENCE, StaticCertificateSource(self.certificates))
+        patcher = mock.patch.object(google_auth, '_verifier', verifier)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_login_creates_the_user(self):
+        response = self.client.post('/api/auth/google/', {'token': self.sign()}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['email'], 'owner@example.com')
+        self.assertTrue(User.objects.filter(username='owner@example.com').exists())
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(self.client.get('/api/dashboard/overview/').status_code, 200)
+
+    def test_invalid_token(self):
+        response = self.client.post('/api/auth/google/', {'token': self.sign(aud='someone-else')}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(User.objects.exists())
+
+    def test_certificates_unavailable(self):
+        source = HTTPCertificateSource(session=FakeSession({}))
+        source.session.fail = True
+        with mock.patch.object(google_auth, '_verifier', GoogleIDTokenVerifier(AUDIENCE, source)):
+            response = self.client.post('/api/auth/google/', {'token': self.sign()}, format='json')
+        self.assertEqual(response.status_code, 503)
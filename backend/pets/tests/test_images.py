@@ -0,0 +1,110 @@
+import io
+import shutil
+import tempfile
+from datetime import date
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+from ..images import pick_variant
+from ..models import Pet, Vaccination
+from ..tasks import process_pet_avatar
+from .base import PetsAPITestCase
+
+
+def image_file(name, size, mode='RGB', image_format='JPEG', orientation=None):
+    image = Image.new(mode, size, (200, 80, 40, 128) if mode == 'RGBA' else (200, 80, 40))
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+        exif[0x010F] = 'Test camera'
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **({'exif': exif} if orientation else {}))
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{image_format.lower()}')
+
+
+@override_settings(IMAGE_THUMBNAIL_SIZES=[64, 256], IMAGE_MAX_DIMENSION=1024, MEDIA_ACCEL_REDIRECT=True)
+class ImagePipelineTests(PetsAPITestCase):
+    """Uploads are re-encoded and thumbnailed by the Celery tasks, run eagerly without a broker."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def upload_avatar(self, upload):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/pets/{self.pet.id}/', {'avatar': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200, response.content)
+        return Pet.objects.get(pk=self.pet.pk)
+
+    def open_image(self, name):
+        with default_storage.open(name, 'rb') as f:
+            image = Image.open(f)
+            image.load()
+        return image
+
+    def test_avatar_is_reencoded_with_thumbnails(self):
+        pet = self.upload_avatar(image_file('milk.jpg', (3000, 1500), orientation=6))
+        # Written next to the upload, which is then removed
+        self.assertRegex(pet.avatar.name, r'^pet_avatars/milk_\w+\.jpg$')
+        self.assertFalse(default_storage.exists('pet_avatars/milk.jpg'))
+        image = self.open_image(pet.avatar.name)
+        # Rotated as the EXIF orientation said, scaled down and stripped of EXIF
+        self.assertEqual((image.format, image.size), ('JPEG', (512, 1024)))
+        self.assertEqual(dict(image.getexif()), {})
+        self.assertEqual(set(pet.avatar_variants), {'64', '256'})
+        self.assertEqual([max(self.open_image(pet.avatar_variants[size]).size) for size in ('64', '256')], [64, 256])
+
+    def test_png_becomes_jpeg(self):
+        pet = self.upload_avatar(image_file('butter.png', (300, 200), mode='RGBA', image_format='PNG'))
+        self.assertEqual(pet.avatar.name, 'pet_avatars/butter.jpg')
+        self.assertFalse(default_storage.exists('pet_avatars/butter.png'))
+        image = self.open_image(pet.avatar.name)
+        self.assertEqual((image.mode, image.size), ('RGB', (300, 200)))
+
+    def test_replacing_the_avatar_removes_the_old_thumbnails(self):
+        first = self.upload_avatar(image_file('first.png', (300, 300), image_format='PNG'))
+        second = self.upload_avatar(image_file('second.png', (300, 300), image_format='PNG'))
+        self.assertEqual(second.avatar.name, 'pet_avatars/second.jpg')
+        self.assertEqual(set(second.avatar_variants), {'64', '256'})
+        for name in first.avatar_variants.values():
+            self.assertFalse(default_storage.exists(name), name)
+
+    def test_size_picks_a_thumbnail(self):
+        pet = self.upload_avatar(image_file('milk.jpg', (800, 800)))
+        for size, name in [(None, pet.avatar.name), ('50', pet.avatar_variants['64']), ('100', pet.avatar_variants['256']), ('600', pet.avatar.name)]:
+            with self.subTest(size=size):
+                response = self.client.get(f'/api/pets/{self.pet.id}/avatar/', {'size': size} if size else {})
+                self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{name}')
+        self.assertEqual(self.client.get(f'/api/pets/{self.pet.id}/avatar/', {'size': 'large'}).status_code, 400)
+
+    def test_tag_proof(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/vaccination/', {
+                'pet': self.pet.id, 'vaccination_name': 'Rabies', 'vaccination_status': 'Completed',
+                'vaccinated_at': date(2026, 3, 1).isoformat(), 'tag_proof': image_file('tag.png', (2000, 500), image_format='PNG'),
+            }, format='multipart')
+        self.assertEqual(response.status_code, 201, response.content)
+        vaccination = Vaccination.objects.get()
+        self.assertEqual(vaccination.tag_proof.name, 'tag_proof/tag.jpg')
+        self.assertEqual(self.open_image(vaccination.tag_proof.name).size, (1024, 256))
+        self.assertEqual(set(vaccination.tag_proof_variants), {'64', '256'})
+
+    def test_unreadable_file_is_kept(self):
+        name = default_storage.save('pet_avatars/broken.jpg', ContentFile(b'not an image'))
+        Pet.objects.filter(pk=self.pet.pk).update(avatar=name)
+        with self.assertLogs('pets.tasks', 'ERROR'):
+            process_pet_avatar.delay(self.pet.pk)
+        pet = Pet.objects.get(pk=self.pet.pk)
+        self.assertEqual((pet.avatar.name, pet.avatar_variants), (name, {}))
+        self.assertTrue(default_storage.exists(name))
+
+    def test_pick_variant(self):
+        variants = {'64': 'a_64.jpg', '512': 'a_512.jpg', '256': 'a_256.jpg'}
+        self.assertEqual([pick_variant('a.jpg', variants, size) for size in (1, 64, 65, 300, 513)], ['a_64.jpg', 'a_64.jpg', 'a_256.jpg', 'a_512.jpg', 'a.jpg'])
+        self.assertEqual(pick_variant('a.jpg', {}, 10), 'a.jpg')
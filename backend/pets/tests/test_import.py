@@ -0,0 +1,117 @@
+import os
+import tempfile
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from .. import rollups
+from ..models import HealthStatus, HealthStatusRollup, Vaccination
+from .base import PetsAPITestCase, rollup_snapshot
+
+HEALTH_VALUES = ('attribute_name', 'value', 'unit', 'mood', 'coat_condition', 'measured_at', 'created_at', 'sample_count', 'min_value', 'max_value')
+VACCINATION_VALUES = ('vaccination_name', 'vaccination_status', 'vaccinated_at', 'schedule_at', 'vaccination_notes')
+
+
+class ImportHealthDataTests(PetsAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        HealthStatus.objects.bulk_create([
+            HealthStatus(pet=self.pet, attribute_name='Weight', value=4.25, unit='kg', measured_at=datetime(2025, 1, 2, 8, 30, 15, 123456, tzinfo=dt_timezone.utc)),
+            HealthStatus(pet=self.pet, attribute_name='Mood', mood='Clingy', measured_at=datetime(2025, 1, 2, 9, tzinfo=dt_timezone.utc)),
+            # A compacted daily aggregate
+            HealthStatus(pet=self.pet, attribute_name='Water Intake', value=150.5, unit='ml', sample_count=4, min_value=120, max_value=190,
+                         measured_at=datetime(2024, 12, 1, tzinfo=dt_timezone.utc)),
+        ])
+        HealthStatus.objects.update(created_at=datetime(2025, 1, 3, 12, tzinfo=dt_timezone.utc))
+        Vaccination.objects.create(pet=self.pet, vaccination_name='Rabies', vaccination_status='Completed', vaccinated_at=date(2024, 6, 1),
+                                   vaccination_notes='Left leg, "no reaction"\nNext due in 12 months')
+        Vaccination.objects.create(pet=self.pet, vaccination_name='FeLV', vaccination_status='Pending', schedule_at=date(2025, 6, 1))
+        rollups.rebuild()
+
+    def history(self):
+        return (
+            sorted(HealthStatus.objects.filter(pet=self.pet).values_list(*HEALTH_VALUES)),
+            sorted(Vaccination.objects.filter(pet=self.pet).values_list(*VACCINATION_VALUES)),
+        )
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        return path
+
+    def import_file(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_health_data', path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def export(self, output):
+        response = self.client.get(f'/api/pets/{self.pet.id}/export/', {'output': output})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def assertRoundTrips(self, output):
+        before, rollups_before = self.history(), rollup_snapshot()
+        path = self.write(f'history.{output}', self.export(output))
+        HealthStatus.objects.all().delete()
+        Vaccination.objects.all().delete()
+        self.assertFalse(HealthStatusRollup.objects.exists())
+
+        out, err = self.import_file(path)
+        self.assertIn('Imported 3 health records and 2 vaccinations (0 skipped)', out)
+        self.assertEqual(err, '')
+        self.assertEqual(self.history(), before)
+        self.assertEqual(rollup_snapshot(), rollups_before)
+
+    def test_csv_round_trip(self):
+        self.assertRoundTrips('csv')
+
+    def test_ndjson_round_trip(self):
+        self.assertRoundTrips('ndjson')
+
+    def test_into_another_pet(self):
+        path = self.write('history.csv', self.export('csv'))
+        self.import_file(path, '--pet-id', str(self.other_pet.id), '--record-type', 'vaccination')
+        self.assertEqual(HealthStatus.objects.filter(pet=self.other_pet).count(), 3)
+        self.assertEqual(HealthStatus.objects.filter(pet=self.other_pet).values_list('created_at', flat=True).distinct().get(),
+                         datetime(2025, 1, 3, 12, tzinfo=dt_timezone.utc))
+        self.assertTrue(HealthStatusRollup.objects.filter(pet=self.other_pet).exists())
+
+    def test_invalid_rows_are_skipped(self):
+        path = self.write('readings.csv', '\n'.join([
+            'pet_id,attribute_name,value,measured_at',
+            f'{self.other_pet.id},Weight,3.5,2025-02-01T10:00:00Z',
+            f'{self.other_pet.id},Height,3.5,2025-02-01T10:00:00Z',
+            f'{self.other_pet.id},Weight,heavy,2025-02-01T10:00:00Z',
+            f'{self.other_pet.id},Weight,3.6,yesterday',
+            '999999,Weight,3.5,2025-02-01T10:00:00Z',
+            'cat,Weight,3.5,2025-02-01T10:00:00Z',
+            f'{self.other_pet.id},Weight,3.7,2025-02-02',
+        ]) + '\n')
+        out, err = self.import_file(path)
+        self.assertIn('Imported 2 health records and 0 vaccinations (5 skipped)', out)
+        for message in [
+            'Skipping line 3: attribute_name must be one of',
+            'Skipping line 4: value must be a number',
+            'Skipping line 5: measured_at must be an ISO 8601 datetime',
+            'Skipping line 6: pet 999999 does not exist',
+            'Skipping line 7: pet_id must be an integer',
+        ]:
+            self.assertIn(message, err)
+        self.assertEqual(sorted(HealthStatus.objects.filter(pet=self.other_pet).values_list('value', 'unit')), [(3.5, 'kg'), (3.7, 'kg')])
+
+    def test_strict_aborts_on_the_first_invalid_row(self):
+        path = self.write('readings.ndjson', '\n'.join([
+            f'{{"pet_id": {self.other_pet.id}, "attribute_name": "Weight", "value": 3.5}}',
+            '{"pet_id": 999999, "attribute_name": "Weight", "value": 3.5}',
+        ]) + '\n')
+        with self.assertRaisesMessage(CommandError, 'Line 2: pet 999999 does not exist'):
+            self.import_file(path, '--strict')
+        self.assertFalse(HealthStatus.objects.filter(pet=self.other_pet).exists())
+
+    def test_unknown_forced_pet(self):
+        path = self.write('readings.csv', 'attribute_name,value\nWeight,3.5\n')
+        with self.assertRaisesMessage(CommandError, 'Pet with ID 999999 does not exist.'):
+            self.import_file(path, '--pet-id', '999999')
@@ -0,0 +1,69 @@
+import shutil
+import tempfile
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from ..models import Pet, Vaccination
+from .base import PetsAPITestCase
+
+AVATAR = b'\x89PNG\r\n\x1a\n' + b'\0' * 64
+
+
+class MediaServingTests(PetsAPITestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, MEDIA_CACHE_MAX_AGE=300)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.name = default_storage.save('pet_avatars/milk cat.png', ContentFile(AVATAR))
+        Pet.objects.filter(pk=self.pet.pk).update(avatar=self.name)
+        self.url = f'/api/pets/{self.pet.id}/avatar/'
+
+    @override_settings(MEDIA_ACCEL_REDIRECT=False)
+    def test_streamed_without_nginx(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), AVATAR)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertNotIn('X-Accel-Redirect', response)
+        self.assertIn('max-age=300', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+
+    @override_settings(MEDIA_ACCEL_REDIRECT=True)
+    def test_handed_to_nginx(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/pet_avatars/milk%20cat.png')
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response.content, b'')
+
+    def test_not_modified(self):
+        for accel in (False, True):
+            with self.subTest(accel=accel), override_settings(MEDIA_ACCEL_REDIRECT=accel):
+                etag = self.client.get(self.url)['ETag']
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+                self.assertNotIn('X-Accel-Redirect', response)
+                self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_missing_file(self):
+        default_storage.delete(self.name)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.client.get(f'/api/pets/{self.other_pet.id}/avatar/').status_code, 404)
+
+    def test_other_owner(self):
+        self.authenticate(User.objects.create_user(username='stranger'))
+        self.assertIn(self.client.get(self.url).status_code, (403, 404))
+
+    @override_settings(MEDIA_ACCEL_REDIRECT=True)
+    def test_tag_proof(self):
+        name = default_storage.save('tag_proof/rabies.jpg', ContentFile(b'\xff\xd8\xff'))
+        vaccination = Vaccination.objects.create(pet=self.pet, vaccination_name='Rabies', vaccination_status='Completed', tag_proof=name)
+        response = self.client.get(f'/api/vaccination/{vaccination.id}/tag-proof/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/tag_proof/rabies.jpg')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
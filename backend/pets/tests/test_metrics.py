@@ -0,0 +1,53 @@
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import override_settings
+from prometheus_client import REGISTRY
+from ..middleware import MetricsMiddleware
+from ..models import HealthStatus
+from .base import PetsAPITestCase
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(PetsAPITestCase):
+    def test_requests_are_counted_per_view(self):
+        labels = {'view': 'PetViewSet.list', 'method': 'GET'}
+        requests = sample('http_requests_total', status='200', **labels)
+        latency = sample('http_request_duration_seconds_count', **labels)
+        queries = sample('db_queries_total', view='PetViewSet.list')
+        self.assertEqual(self.client.get('/api/pets/').status_code, 200)
+        self.assertEqual(sample('http_requests_total', status='200', **labels), requests + 1)
+        self.assertEqual(sample('http_request_duration_seconds_count', **labels), latency + 1)
+        self.assertGreater(sample('db_queries_total', view='PetViewSet.list'), queries)
+
+        not_found = sample('http_requests_total', view='PetViewSet.retrieve', method='GET', status='404')
+        self.client.get('/api/pets/999999/')
+        self.assertEqual(sample('http_requests_total', view='PetViewSet.retrieve', method='GET', status='404'), not_found + 1)
+        self.assertEqual(sample('http_requests_in_flight'), 0)
+        self.assertGreater(sample('worker_resident_memory_bytes'), 0)
+
+    def test_overview_cache_lookups(self):
+        HealthStatus.objects.create(pet=self.pet, attribute_name='Weight', value=4)
+        misses = sample('cache_requests_total', cache='dashboard_overview', result='miss')
+        hits = sample('cache_requests_total', cache='dashboard_overview', result='hit')
+        for _ in range(3):
+            self.client.get('/api/dashboard/overview/')
+        self.assertEqual(sample('cache_requests_total', cache='dashboard_overview', result='miss'), misses + 1)
+        self.assertEqual(sample('cache_requests_total', cache='dashboard_overview', result='hit'), hits + 2)
+
+    def test_scrape(self):
+        self.client.get('/api/pets/')
+        self.client.credentials()
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        content = response.content.decode()
+        self.assertIn('http_requests_total{method="GET",status="200",view="PetViewSet.list"}', content)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', content)
+        self.assertEqual(self.client.post('/metrics').status_code, 405)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            MetricsMiddleware(lambda request: None)
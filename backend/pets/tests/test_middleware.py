@@ -0,0 +1,59 @@
+import json
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from ..middleware import QueryInstrumentationMiddleware
+from ..models import Pet
+from .base import PetsAPITestCase
+
+
+def run_queries(count, distinct=True):
+    def get_response(request):
+        for i in range(count):
+            # The same statement with a different parameter each time, or distinct statements
+            queryset = Pet.objects.filter(pk=i)
+            list(queryset.filter(name=f'Pet {i}') if distinct and i % 2 else queryset)
+        return HttpResponse()
+    return get_response
+
+
+@override_settings(SQL_INSTRUMENTATION_ENABLED=True, SQL_INSTRUMENTATION_REPEAT_THRESHOLD=5)
+class QueryInstrumentationTests(TestCase):
+    def call(self, get_response, level='INFO'):
+        middleware = QueryInstrumentationMiddleware(get_response)
+        with self.assertLogs('pets.middleware', level) as logs:
+            response = middleware(RequestFactory().get('/api/pets/'))
+        [line] = logs.output
+        return response, json.loads(line.split(': ', 1)[1])
+
+    def test_counts_queries(self):
+        response, record = self.call(run_queries(3))
+        self.assertEqual((record['path'], record['status'], record['queries'], record['repeated_queries']), ('/api/pets/', 200, 3, []))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('desc="3 queries"', response['Server-Timing'])
+
+    def test_flags_repeated_statements(self):
+        response, record = self.call(run_queries(6, distinct=False), level='WARNING')
+        [repeated] = record['repeated_queries']
+        self.assertEqual((record['queries'], repeated['count']), (6, 6))
+
+    @override_settings(SQL_INSTRUMENTATION_ENABLED=False)
+    def test_disabled(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryInstrumentationMiddleware(run_queries(1))
+
+
+class QueryInstrumentationRequestTests(PetsAPITestCase):
+    def test_off_by_default(self):
+        with self.assertNoLogs('pets.middleware'):
+            response = self.client.get('/api/dashboard/overview/')
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(SQL_INSTRUMENTATION_ENABLED=True)
+    def test_enabled(self):
+        with self.assertLogs('pets.middleware', 'INFO') as logs:
+            response = self.client.get('/api/dashboard/overview/')
+        self.assertIn('queries"', response['Server-Timing'])
+        record = json.loads(logs.output[0].split(': ', 1)[1])
+        self.assertEqual((record['path'], record['status']), ('/api/dashboard/overview/', 200))
+        self.assertGreater(record['queries'], 0)
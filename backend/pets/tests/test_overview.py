@@ -0,0 +1,59 @@
+import json
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.utils import timezone
+from .. import caching
+from ..models import HealthStatus, Pet
+from .base import PetsAPITestCase
+
+
+class StreamedOverviewTests(PetsAPITestCase):
+    """?stream=1 sends the same document as the buffered dashboard overview."""
+
+    def setUp(self):
+        super().setUp()
+        self.pet.name = 'Milk "Mimi" Ñandú'
+        self.pet.save()
+        now = timezone.now()
+        for day in range(20):
+            measured_at = now - timedelta(days=day, hours=1)
+            HealthStatus.objects.create(pet=self.pet, attribute_name='Weight', unit='kg', value=4 + day / 10, measured_at=measured_at)
+            HealthStatus.objects.create(pet=self.pet, attribute_name='Mood', mood='Happy', measured_at=measured_at)
+            if day % 3 == 0:
+                HealthStatus.objects.create(pet=self.other_pet, attribute_name='Water Intake', value=200 + day, measured_at=measured_at)
+        stranger = User.objects.create_user(username='stranger')
+        HealthStatus.objects.create(
+            pet=Pet.objects.create(name='Stray', species='Dog', owner=stranger, gender='Male'), attribute_name='Weight', value=20, measured_at=now,
+        )
+
+    def overview(self, **params):
+        response = self.client.get('/api/dashboard/overview/', params)
+        self.assertEqual(response.status_code, 200)
+        if response.streaming:
+            self.assertEqual(response['Content-Type'], 'application/json')
+            return json.loads(b''.join(response.streaming_content))
+        return json.loads(response.content)
+
+    def test_same_document(self):
+        for filter_option in ('all', 'last7', 'last30'):
+            with self.subTest(filter=filter_option):
+                buffered = self.overview(filter=filter_option)
+                self.assertEqual(set(buffered), {str(self.pet.id), str(self.other_pet.id)})
+                self.assertEqual(self.overview(filter=filter_option, stream='1'), buffered)
+
+    def test_small_chunks(self):
+        buffered = self.overview()
+        with mock.patch('pets.views.overview.STREAM_CHUNK_SIZE', 3):
+            response = self.client.get('/api/dashboard/overview/', {'stream': 'true'})
+            chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual(json.loads(b''.join(chunks)), buffered)
+
+    def test_no_readings(self):
+        HealthStatus.objects.all().delete()
+        self.assertEqual(self.overview(stream='1'), {})
+
+    def test_streamed_responses_are_not_cached(self):
+        self.overview(stream='1')
+        self.assertIsNone(caching.get_overview(self.user.id, 'all', None))
@@ -0,0 +1,54 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from ..models import HealthStatus, Vaccination
+from .base import PetsAPITestCase
+
+
+class CursorPaginationTests(PetsAPITestCase):
+    """Following the cursor links visits every row exactly once, in order."""
+
+    def setUp(self):
+        super().setUp()
+        start = datetime(2026, 3, 1, tzinfo=dt_timezone.utc)
+        # Several readings share a measured_at, so pages have to break ties on id
+        for i in range(23):
+            HealthStatus.objects.create(
+                pet=(self.pet, self.other_pet)[i % 2], attribute_name='Weight', value=i, measured_at=start + timedelta(hours=i // 3)
+            )
+        for i in range(12):
+            Vaccination.objects.create(
+                pet=self.pet, vaccination_name=f'Vaccine {i}', vaccination_status='Pending', schedule_at=date(2026, 3, 1) + timedelta(days=i // 2)
+            )
+
+    def test_health_status_walk(self):
+        for ordering, order_by in [
+            (None, ('measured_at', 'id')),
+            ('measured_at', ('measured_at', 'id')),
+            ('-measured_at', ('-measured_at', '-id')),
+            ('created_at', ('created_at', 'id')),
+            ('-created_at', ('-created_at', '-id')),
+        ]:
+            with self.subTest(ordering=ordering):
+                params = {'pagination': 'cursor', 'page_size': 4}
+                if ordering:
+                    params['ordering'] = ordering
+                ids = self.walk('/api/health-status/', params)
+                self.assertEqual(ids, list(HealthStatus.objects.order_by(*order_by).values_list('id', flat=True)))
+
+    def test_health_status_walk_for_pet(self):
+        ids = self.walk('/api/health-status/', {'pagination': 'cursor', 'page_size': 4, 'pet': self.pet.id})
+        self.assertEqual(ids, list(HealthStatus.objects.filter(pet=self.pet).order_by('measured_at', 'id').values_list('id', flat=True)))
+
+    def test_vaccination_walk(self):
+        # Without a schedule a vaccination has no place in the cursor order
+        Vaccination.objects.create(pet=self.pet, vaccination_name='Undated', vaccination_status='Unknown')
+        ids = self.walk('/api/vaccination/', {'pagination': 'cursor', 'page_size': 5})
+        self.assertEqual(ids, list(Vaccination.objects.filter(schedule_at__isnull=False).order_by('schedule_at', 'id').values_list('id', flat=True)))
+
+    def test_cursor_page_has_no_count(self):
+        response = self.client.get('/api/health-status/', {'pagination': 'cursor'})
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_page_numbers_stay_the_default(self):
+        response = self.client.get('/api/health-status/')
+        self.assertEqual(response.data['count'], 23)
@@ -0,0 +1,126 @@
+import unittest
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.utils import timezone
+from .. import partitions, rollups
+from ..models import HealthAlert, HealthStatus, HealthStatusRollup
+from ..partitions import add_months, month_start, partition_name
+from ..tasks import manage_health_partitions
+from .base import PetsAPITestCase
+
+
+def table_rows(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(name)}')
+        return cursor.fetchone()[0]
+
+
+def table_exists(name):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [name])
+        return cursor.fetchone()[0]
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'The readings table is only partitioned on PostgreSQL')
+class PartitionTests(PetsAPITestCase):
+    """Monthly partitions are created ahead of time, filled from the default partition and dropped whole."""
+
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.now()
+        self.current = month_start(self.now)
+
+    def reading(self, month, days=3, **fields):
+        return HealthStatus.objects.create(pet=self.pet, attribute_name='Weight', value=4, measured_at=month + timedelta(days=days), **fields)
+
+    def maintain(self, *args, **kwargs):
+        with self.assertLogs('pets.partitions', 'INFO'):
+            return partitions.maintain(*args, now=self.now, **kwargs)
+
+    def test_migration_partitions_ahead(self):
+        self.assertTrue(partitions.is_partitioned())
+        self.assertTrue(partitions.has_default_partition())
+        self.assertEqual(partitions.partitions()[-4:], [add_months(self.current, offset) for offset in range(4)])
+
+    def test_create_moves_readings_out_of_the_default_partition(self):
+        month = add_months(self.current, 12)
+        reading = self.reading(month)
+        self.assertEqual(partitions.default_months(), [month])
+
+        created, dropped = self.maintain(3)
+        self.assertEqual((created, dropped), ([partition_name(month)], []))
+        self.assertIn(month, partitions.partitions())
+        self.assertEqual(partitions.default_months(), [])
+        self.assertEqual(table_rows(partition_name(month)), 1)
+        self.assertEqual(HealthStatus.objects.get(pk=reading.pk).measured_at, reading.measured_at)
+        # Nothing left to do on the next run
+        self.assertEqual(self.maintain(3), ([], []))
+
+    def test_months_ahead(self):
+        created, _ = self.maintain(5)
+        self.assertEqual(created, [partition_name(add_months(self.current, offset)) for offset in (4, 5)])
+        self.assertEqual(partitions.partitions()[-6:], [add_months(self.current, offset) for offset in range(6)])
+
+    def test_detach(self):
+        month = add_months(self.current, 1)
+        reading = self.reading(month)
+        partitions.detach_partition(month)
+        self.assertNotIn(month, partitions.partitions())
+        self.assertFalse(HealthStatus.objects.filter(pk=reading.pk).exists())
+        # Detached, not dropped
+        self.assertEqual(table_rows(partition_name(month)), 1)
+
+    def test_drop_expired_months(self):
+        old = add_months(self.current, -24)
+        expired = self.reading(old)
+        HealthAlert.objects.create(
+            pet=self.pet, attribute_name='Weight', kind='zscore', reading_id=expired.id, value=4,
+            measured_at=expired.measured_at, baseline=3, score=4,
+        )
+        kept = self.reading(self.current, days=0)
+        self.assertTrue(HealthStatusRollup.objects.filter(bucket_start__lt=add_months(old, 1)).exists())
+
+        created, dropped = self.maintain(3, retention_months=12)
+        self.assertEqual((created, dropped), ([partition_name(old)], [partition_name(old)]))
+        self.assertFalse(table_exists(partition_name(old)))
+        self.assertEqual(list(HealthStatus.objects.values_list('id', flat=True)), [kept.id])
+        self.assertFalse(HealthAlert.objects.exists())
+        # Hourly, daily and weekly rollups of the month are gone, the rest still match the readings
+        self.assertFalse(HealthStatusRollup.objects.filter(bucket_start__lt=add_months(old, 1) + rollups.BUCKET_SPANS['week']).exists())
+        self.assertTrue(HealthStatusRollup.objects.filter(pet=self.pet).exists())
+
+    def test_dry_run(self):
+        month = add_months(self.current, 12)
+        self.reading(month)
+        before = partitions.partitions()
+        created, dropped = partitions.maintain(3, retention_months=1, dry_run=True, now=self.now)
+        self.assertEqual(created, [partition_name(month)])
+        self.assertEqual(dropped, [])
+        self.assertEqual(partitions.partitions(), before)
+        self.assertEqual(partitions.default_months(), [month])
+
+    def test_command(self):
+        self.reading(add_months(self.current, 12))
+        out = StringIO()
+        call_command('manage_health_partitions', '--dry-run', stdout=out)
+        self.assertIn(f'Would create 1 partitions ({partition_name(add_months(self.current, 12))})', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('manage_health_partitions', '--months-ahead', '-1')
+
+        with self.assertLogs('pets.partitions', 'INFO'):
+            manage_health_partitions.delay()
+        self.assertEqual(partitions.default_months(), [])
+
+
+@unittest.skipIf(connection.vendor == 'postgresql', 'The readings table is partitioned on PostgreSQL')
+class UnpartitionedTests(PetsAPITestCase):
+    def test_nothing_to_do(self):
+        self.assertFalse(partitions.is_partitioned())
+        out = StringIO()
+        call_command('manage_health_partitions', stdout=out)
+        self.assertIn('not partitioned', out.getvalue())
+        with self.assertNoLogs('pets.partitions'):
+            manage_health_partitions.delay()
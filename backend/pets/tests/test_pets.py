@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from ..models import HealthStatus, Pet
+from .base import PetsAPITestCase
+
+START = datetime(2026, 3, 1, tzinfo=dt_timezone.utc)
+
+
+class PetHealthAttributesTests(PetsAPITestCase):
+    """Pets carry only their latest readings per attribute, fetched in one query for the whole page."""
+
+    def add_readings(self, pet, days=10):
+        for day in range(days):
+            HealthStatus.objects.create(pet=pet, attribute_name='Weight', value=4 + day / 10, measured_at=START + timedelta(days=day))
+            HealthStatus.objects.create(pet=pet, attribute_name='Mood', mood='Happy', measured_at=START + timedelta(days=day, hours=1))
+
+    def nested(self, data):
+        return [(reading['attribute_name'], reading['measured_at']) for reading in data['health_attributes']]
+
+    def test_latest_reading_per_attribute(self):
+        self.add_readings(self.pet)
+        response = self.client.get(f'/api/pets/{self.pet.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.nested(response.data), [('Mood', '2026-03-10T01:00:00Z'), ('Weight', '2026-03-10T00:00:00Z')])
+
+    def test_health_limit(self):
+        self.add_readings(self.pet)
+        response = self.client.get('/api/pets/', {'health_limit': 3})
+        [milk] = [pet for pet in response.data['results'] if pet['id'] == self.pet.id]
+        self.assertEqual([attribute for attribute, _ in self.nested(milk)], ['Mood'] * 3 + ['Weight'] * 3)
+        self.assertEqual(self.nested(milk)[3:], [('Weight', f'2026-03-{day:02}T00:00:00Z') for day in (10, 9, 8)])
+        for value in ('0', 'all', '-2'):
+            with self.subTest(health_limit=value):
+                self.assertIn('health_limit', self.client.get('/api/pets/', {'health_limit': value}).data)
+        # Capped rather than rejected
+        self.assertEqual(self.client.get('/api/pets/', {'health_limit': 1000}).status_code, 200)
+
+    def test_query_count_does_not_grow_with_pets(self):
+        self.add_readings(self.pet)
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/api/pets/', {'health_limit': 2})
+            self.assertEqual(response.status_code, 200)
+            # Authentication may or may not hit the user cache; only the pet list's own queries count
+            return len([query for query in queries if 'auth_user' not in query['sql']])
+
+        few = count_queries()
+        for i in range(5):
+            self.add_readings(Pet.objects.create(name=f'Pet {i}', species='Cat', owner=self.user, gender='Unknown'), days=3)
+        self.assertEqual(count_queries(), few)
+
+    def test_other_actions_look_the_readings_up(self):
+        # Actions without the prefetch, like update, still nest the latest readings
+        self.add_readings(self.pet, days=2)
+        response = self.client.patch(f'/api/pets/{self.pet.id}/', {'color': 'White'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([attribute for attribute, _ in self.nested(response.data)], ['Mood', 'Weight'])
@@ -0,0 +1,140 @@
+import os
+import threading
+from datetime import timedelta
+from unittest import mock
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from .. import probes
+from ..probes import ProbeRunner
+
+
+def healthy():
+    pass
+
+
+def failing():
+    raise RuntimeError('connection refused')
+
+
+def snapshot(age=0, **statuses):
+    checks = {name: {'status': 'healthy', 'latency_ms': 0.5} for name in probes.CHECKS}
+    for name, error in statuses.items():
+        checks[name] = {'status': 'unhealthy', 'latency_ms': 0.5, 'error': error}
+    return {'checked_at': timezone.now() - timedelta(seconds=age), 'checks': checks}
+
+
+@override_settings(PROBE_INTERVAL=10, PROBE_TIMEOUT=0.2)
+class ProbeEndpointTests(SimpleTestCase):
+    """The probes answer from the runner's latest round without touching a dependency."""
+
+    def setUp(self):
+        self.runner = ProbeRunner({'up': healthy}, interval=10, timeout=0.2)
+        for patch in (mock.patch.object(probes, '_runner', self.runner), mock.patch.object(probes, '_runner_pid', os.getpid())):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def set_snapshot(self, value):
+        self.runner.snapshot = value
+        self.runner.first_round.set()
+
+    def test_healthy(self):
+        self.set_snapshot(snapshot())
+        response = self.client.get('/api/health/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['status'], data['database'], data['cache'], data['media_storage'], data['stale']), ('healthy', 'healthy', 'healthy', 'healthy', False))
+        self.assertEqual(set(data['checks']), set(probes.CHECKS))
+        response = self.client.get('/api/ready/')
+        self.assertEqual((response.status_code, response.json()['status']), (200, 'ready'))
+
+    def test_unhealthy_check(self):
+        self.set_snapshot(snapshot(cache='connection refused'))
+        response = self.client.get('/api/health/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual((response.json()['status'], response.json()['cache']), ('unhealthy', 'unhealthy: connection refused'))
+        # The cache is not needed to serve traffic
+        self.assertEqual(self.client.get('/api/ready/').status_code, 200)
+
+        self.set_snapshot(snapshot(migrations='2 unapplied migration(s)'))
+        self.assertEqual(self.client.get('/api/health/').status_code, 200)
+        response = self.client.get('/api/ready/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['error'], {'migrations': '2 unapplied migration(s)'})
+
+    def test_stale_snapshot(self):
+        self.set_snapshot(snapshot(age=31))
+        response = self.client.get('/api/health/')
+        self.assertEqual((response.status_code, response.json()['stale']), (503, True))
+        response = self.client.get('/api/ready/')
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('probes', response.json()['error'])
+
+    def test_first_round_not_done(self):
+        response = self.client.get('/api/health/')
+        self.assertEqual((response.status_code, response.json()), (503, {'status': 'starting'}))
+        self.assertEqual(self.client.get('/api/ready/').status_code, 503)
+        # Liveness does not depend on the probes
+        self.assertEqual(self.client.get('/api/live/').status_code, 200)
+
+    def test_get_only(self):
+        self.set_snapshot(snapshot())
+        for url in ('/api/health/', '/api/ready/', '/api/live/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.post(url).status_code, 405)
+
+
+class ProbeRunnerTests(SimpleTestCase):
+    def test_results(self):
+        runner = ProbeRunner({'up': healthy, 'down': failing}, interval=10, timeout=1)
+        runner.run_once()
+        self.assertTrue(runner.first_round.is_set())
+        checks = runner.snapshot['checks']
+        self.assertEqual(checks['up']['status'], 'healthy')
+        self.assertEqual((checks['down']['status'], checks['down']['error']), ('unhealthy', 'connection refused'))
+
+    def test_timed_out_check_is_not_started_again(self):
+        release = threading.Event()
+        calls = []
+
+        def stuck():
+            calls.append(1)
+            release.wait(5)
+
+        runner = ProbeRunner({'up': healthy, 'stuck': stuck}, interval=10, timeout=0.1)
+        self.addCleanup(release.set)
+        runner.run_once()
+        runner.run_once()
+        checks = runner.snapshot['checks']
+        self.assertEqual(checks['stuck'], {'status': 'unhealthy', 'latency_ms': None, 'error': 'timed out after 0.1s'})
+        self.assertEqual(checks['up']['status'], 'healthy')
+        self.assertEqual(len(calls), 1)
+
+        release.set()
+        runner.running['stuck'].result(timeout=5)
+        runner.run_once()
+        self.assertEqual(runner.snapshot['checks']['stuck']['status'], 'healthy')
+        self.assertEqual(len(calls), 2)
+
+    @override_settings(PROBE_INTERVAL=10, PROBE_TIMEOUT=2)
+    def test_stale_after_missed_rounds(self):
+        self.assertFalse(probes._with_age(snapshot(age=31))['stale'])
+        self.assertTrue(probes._with_age(snapshot(age=33))['stale'])
+
+
+class DependencyCheckTests(TransactionTestCase):
+    """The real checks, run on the probe threads like in production."""
+
+    def test_all_dependencies_up(self):
+        probes._migrations_applied.clear()
+        runner = ProbeRunner(probes.CHECKS, interval=10, timeout=30)
+        runner.run_once()
+        self.assertEqual({name: check['status'] for name, check in runner.snapshot['checks'].items()}, dict.fromkeys(probes.CHECKS, 'healthy'))
+        self.assertTrue(probes._migrations_applied.is_set())
+
+    def test_unapplied_migrations(self):
+        probes._migrations_applied.clear()
+        with mock.patch('pets.probes.MigrationExecutor') as executor:
+            executor.return_value.migration_plan.return_value = [object(), object()]
+            with self.assertRaisesMessage(RuntimeError, '2 unapplied migration(s)'):
+                probes.check_migrations()
+        self.assertFalse(probes._migrations_applied.is_set())
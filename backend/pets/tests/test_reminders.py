@@ -0,0 +1,130 @@
+import smtplib
+from datetime import date, timedelta
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from .. import reminders
+from ..models import Pet, Vaccination
+from .base import PetsAPITestCase
+
+TODAY = date(2026, 5, 10)
+REFUSED = 'refused@example.com'
+
+
+class RefusingEmailBackend(EmailBackend):
+    """The locmem backend, with a server that refuses one recipient."""
+
+    def send_messages(self, messages):
+        for message in messages:
+            if REFUSED in message.to:
+                raise smtplib.SMTPRecipientsRefused({REFUSED: (550, b'No such user')})
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    VACCINATION_REMINDER_DAYS=7,
+    VACCINATION_REMINDER_OVERDUE_DAYS=30,
+)
+class ReminderTests(TestCase):
+    def setUp(self):
+        self.pets = {}
+        for username in ('alice', 'bob', 'refused', 'nomail'):
+            user = User.objects.create_user(username=username, email='' if username == 'nomail' else f'{username}@example.com')
+            self.pets[username] = Pet.objects.create(name=f'{username} cat', species='Cat', owner=user, gender='Unknown')
+
+    def vaccinate(self, owner, days, status='Pending', name='Rabies'):
+        return Vaccination.objects.create(
+            pet=self.pets[owner], vaccination_name=name, vaccination_status=status, schedule_at=TODAY + timedelta(days=days),
+        )
+
+    def send(self, **kwargs):
+        with self.assertLogs('pets.reminders', 'INFO'):
+            return reminders.send_reminders(today=TODAY, **kwargs)
+
+    def test_selection(self):
+        due = [self.vaccinate('alice', 0), self.vaccinate('alice', 7), self.vaccinate('alice', -30), self.vaccinate('bob', -3, 'Overdue')]
+        self.vaccinate('alice', 8)  # Too far ahead
+        self.vaccinate('alice', -31)  # Missed too long ago
+        self.vaccinate('bob', 2, 'Completed')
+        self.vaccinate('nomail', 1)  # Nowhere to send it
+        self.assertEqual(
+            sorted(reminders.due_reminders(TODAY).values_list('id', flat=True)), sorted(vaccination.id for vaccination in due)
+        )
+
+    def test_one_message_per_owner(self):
+        self.vaccinate('alice', 1, name='Rabies')
+        self.vaccinate('alice', -2, name='FVRCP')
+        self.vaccinate('bob', 3)
+        self.assertEqual(self.send(), (1, 2, 3))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['alice@example.com', 'bob@example.com'])
+        [message] = [message for message in mail.outbox if message.to == ['alice@example.com']]
+        self.assertIn('FVRCP for alice cat, overdue since 2026-05-08', message.body)
+        self.assertIn('Rabies for alice cat, due on 2026-05-11', message.body)
+        self.assertEqual(Vaccination.objects.get(vaccination_name='FVRCP').vaccination_status, 'Overdue')
+
+    def test_stamped_vaccinations_are_not_sent_again(self):
+        self.vaccinate('alice', 1)
+        self.send()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(Vaccination.objects.filter(reminder_sent_at__isnull=True).exists())
+        self.assertEqual(self.send(), (0, 0, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_small_batches(self):
+        for owner in ('alice', 'bob'):
+            self.vaccinate(owner, 1)
+        self.assertEqual(self.send(batch_size=1), (0, 2, 2))
+        self.assertEqual(len(mail.outbox), 2)
+
+    @override_settings(EMAIL_BACKEND='pets.tests.test_reminders.RefusingEmailBackend')
+    def test_refused_recipient_does_not_block_the_others(self):
+        self.vaccinate('alice', 1)
+        refused = self.vaccinate('refused', 1)
+        self.vaccinate('bob', 1)
+        for _ in range(2):  # Every daily run
+            with self.assertLogs('pets.reminders', 'WARNING') as logs:
+                self.assertEqual(reminders.send_reminders(today=TODAY, batch_size=2), (0, 2, 2))
+            self.assertIn(f'Vaccination reminder to {REFUSED} failed', logs.output[0])
+            mail.outbox.clear()
+            Vaccination.objects.exclude(pk=refused.pk).update(reminder_sent_at=None)
+        refused.refresh_from_db()
+        self.assertIsNone(refused.reminder_sent_at)
+
+    def test_dry_run(self):
+        self.vaccinate('alice', -1)
+        out = StringIO()
+        with self.assertLogs('pets.reminders', 'INFO'):
+            call_command('send_vaccination_reminders', '--date', TODAY.isoformat(), '--dry-run', stdout=out)
+        self.assertIn('Would send 1 reminder emails covering 1 vaccinations; 1 marked overdue', out.getvalue())
+        self.assertEqual(mail.outbox, [])
+        self.assertFalse(Vaccination.objects.filter(vaccination_status='Overdue').exists())
+        self.assertFalse(Vaccination.objects.filter(reminder_sent_at__isnull=False).exists())
+
+
+class RescheduleTests(PetsAPITestCase):
+    def test_new_date_gets_its_own_reminder(self):
+        vaccination = Vaccination.objects.create(
+            pet=self.pet, vaccination_name='Rabies', vaccination_status='Overdue',
+            schedule_at=timezone.localdate() - timedelta(days=2), reminder_sent_at=timezone.now(),
+        )
+        response = self.client.patch(
+            f'/api/vaccination/{vaccination.id}/', {'schedule_at': (timezone.localdate() + timedelta(days=3)).isoformat()}, format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual((response.data['reminder_sent_at'], response.data['vaccination_status']), (None, 'Pending'))
+
+    def test_upcoming(self):
+        today = timezone.localdate()
+        due = [
+            Vaccination.objects.create(pet=self.pet, vaccination_name=name, vaccination_status=status, schedule_at=today + timedelta(days=days))
+            for name, status, days in [('Overdue', 'Overdue', -5), ('Soon', 'Pending', 3)]
+        ]
+        Vaccination.objects.create(pet=self.pet, vaccination_name='Later', vaccination_status='Pending', schedule_at=today + timedelta(days=20))
+        response = self.client.get('/api/vaccination/upcoming/', {'days': 7})
+        self.assertEqual([item['id'] for item in response.data['results']], [vaccination.id for vaccination in due])
+        self.assertEqual(self.client.get('/api/vaccination/upcoming/', {'days': -1}).status_code, 400)
@@ -0,0 +1,85 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from .. import retention, rollups
+from ..models import HealthStatus, Pet
+from .base import PetsAPITestCase, rollup_snapshot, rounded
+
+
+class CompactionTests(PetsAPITestCase):
+    """Compacting old readings into daily aggregates keeps what the dashboard and stats report."""
+
+    def setUp(self):
+        super().setUp()
+        start = rollups.bucket_start('day', timezone.now()) - timedelta(days=90)
+        readings = []
+        for day in range(45):
+            for i in range(1 + day % 4):
+                measured_at = start + timedelta(days=day, hours=6 + 5 * i, minutes=day)
+                readings.append(HealthStatus(pet=self.pet, attribute_name='Weight', unit='kg', value=4 + (day * 7 + i * 3) % 11 / 10, measured_at=measured_at))
+                readings.append(HealthStatus(pet=self.pet, attribute_name='Mood', mood=('Normal', 'Clingy')[i % 2], measured_at=measured_at))
+        HealthStatus.objects.bulk_create(readings)
+        rollups.rebuild()
+
+    def compact(self):
+        with self.assertLogs('pets.retention', 'INFO'):
+            return retention.compact(months=1)
+
+    def dashboard(self, resolution):
+        response = self.client.get('/api/dashboard/overview/', {'resolution': resolution})
+        self.assertEqual(response.status_code, 200, response.content)
+        # The last value of a compacted bucket is its day's mean, so only the aggregates are compared
+        return {
+            attribute_name: [
+                (bucket['bucket_start'], bucket['count'], *map(rounded, (bucket['min'], bucket['max'], bucket['mean'])))
+                for bucket in buckets
+            ]
+            for attribute_name, buckets in response.data[self.pet.id].items() if attribute_name != 'pet_name'
+        }
+
+    def stats(self):
+        response = self.client.get(f'/api/pets/{self.pet.id}/stats/', {'window': 'all,last90'})
+        self.assertEqual(response.status_code, 200, response.content)
+        # The spread inside a compacted day is lost, so std and trend are not kept exactly
+        return {
+            window: (
+                figures['count'], *map(rounded, (figures['mean'], figures['min'], figures['max'])),
+                [[day, rounded(mean)] for day, mean in figures['rolling_mean']],
+            )
+            for window, figures in response.data['attributes']['Weight'].items()
+        }
+
+    def test_dashboard_and_stats_unchanged(self):
+        before = {resolution: self.dashboard(resolution) for resolution in ('day', 'week')}, self.stats()
+        pets, readings, aggregates = self.compact()
+        self.assertEqual(pets, 1)
+        self.assertLess(aggregates, readings)
+        self.assertEqual(({resolution: self.dashboard(resolution) for resolution in ('day', 'week')}, self.stats()), before)
+
+    def test_one_aggregate_per_attribute_and_day(self):
+        total = HealthStatus.objects.count()
+        self.compact()
+        self.assertEqual(HealthStatus.objects.count(), 90)
+        aggregate = HealthStatus.objects.filter(attribute_name='Weight', sample_count=4).first()
+        self.assertEqual(aggregate.measured_at, rollups.bucket_start('day', aggregate.measured_at))
+        self.assertLessEqual(aggregate.min_value, aggregate.value)
+        self.assertLessEqual(aggregate.value, aggregate.max_value)
+        self.assertEqual(sum(HealthStatus.objects.values_list('sample_count', flat=True)), total)
+
+    def test_rollups_match_rebuild(self):
+        self.compact()
+        kept = rollup_snapshot()
+        rollups.rebuild()
+        self.assertEqual(kept, rollup_snapshot())
+
+    def test_later_runs_skip_compacted_days(self):
+        self.compact()
+        self.assertEqual(self.compact(), (0, 0, 0))
+        self.assertEqual(Pet.objects.get(pk=self.pet.pk).compacted_before, retention.cutoff(1))
+
+    def test_dry_run_changes_nothing(self):
+        total = HealthStatus.objects.count()
+        call_command('compact_health_data', '--months', '1', '--dry-run', stdout=StringIO())
+        self.assertEqual(HealthStatus.objects.count(), total)
+        self.assertIsNone(Pet.objects.get(pk=self.pet.pk).compacted_before)
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from .. import rollups
+from ..models import HealthStatusRollup
+from .base import PetsAPITestCase, rollup_snapshot
+
+
+class RollupConsistencyTests(PetsAPITestCase):
+    """The rollups kept up to date on every write match a full rebuild."""
+
+    def assertRollupsMatchRebuild(self):
+        kept = rollup_snapshot()
+        self.assertTrue(kept)
+        rollups.rebuild()
+        self.assertEqual(kept, rollup_snapshot())
+
+    def post_reading(self, **fields):
+        response = self.client.post('/api/health-status/', {'pet': self.pet.id, **fields}, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.data['id']
+
+    def test_create(self):
+        self.post_reading(attribute_name='Weight', value=4.2, measured_at='2026-03-02T08:15:00Z')
+        self.post_reading(attribute_name='Weight', value=4.6, measured_at='2026-03-02T08:45:00Z')
+        self.post_reading(attribute_name='Mood', mood='Normal', measured_at='2026-03-03T10:00:00Z')
+        self.assertRollupsMatchRebuild()
+
+    def test_update_moves_reading_between_buckets(self):
+        reading_id = self.post_reading(attribute_name='Weight', value=4.2, measured_at='2026-03-02T08:15:00Z')
+        self.post_reading(attribute_name='Weight', value=4.4, measured_at='2026-03-02T09:15:00Z')
+        response = self.client.patch(
+            f'/api/health-status/{reading_id}/', {'value': 5.0, 'measured_at': '2026-03-12T08:15:00Z'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertRollupsMatchRebuild()
+
+    def test_delete(self):
+        self.post_reading(attribute_name='Weight', value=4.2, measured_at='2026-03-02T08:15:00Z')
+        reading_id = self.post_reading(attribute_name='Weight', value=4.4, measured_at='2026-03-02T08:30:00Z')
+        self.assertEqual(self.client.delete(f'/api/health-status/{reading_id}/').status_code, 204)
+        self.assertRollupsMatchRebuild()
+
+    def test_delete_last_reading_of_bucket(self):
+        self.post_reading(attribute_name='Weight', value=4.2, measured_at='2026-03-02T08:15:00Z')
+        reading_id = self.post_reading(attribute_name='Weight', value=4.4, measured_at='2020-01-01T08:00:00Z')
+        self.assertEqual(self.client.delete(f'/api/health-status/{reading_id}/').status_code, 204)
+        self.assertFalse(HealthStatusRollup.objects.filter(bucket_start__year=2020).exists())
+        self.assertRollupsMatchRebuild()
+
+    def test_batch(self):
+        start = datetime(2026, 3, 1, tzinfo=dt_timezone.utc)
+        items = [
+            {
+                'pet': (self.pet, self.other_pet)[i % 2].id,
+                'attribute_name': ('Weight', 'Water Intake')[i % 3 % 2],
+                'value': 1 + i * 0.37 % 5,
+                'measured_at': (start + timedelta(minutes=97 * i)).isoformat(),
+            }
+            for i in range(60)
+        ]
+        response = self.client.post('/api/health-status/batch/', items, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertRollupsMatchRebuild()
+
+    def test_dashboard_reads_rollups(self):
+        self.post_reading(attribute_name='Weight', value=4.0, measured_at='2026-03-02T08:15:00Z')
+        self.post_reading(attribute_name='Weight', value=5.0, measured_at='2026-03-02T20:15:00Z')
+        response = self.client.get('/api/dashboard/overview/', {'resolution': 'day'})
+        self.assertEqual(response.status_code, 200)
+        [bucket] = response.data[self.pet.id]['Weight']
+        self.assertEqual((bucket['count'], bucket['min'], bucket['max'], bucket['mean'], bucket['last_value']), (2, 4.0, 5.0, 4.5, 5.0))
+
+    def test_rejects_unknown_resolution(self):
+        self.assertEqual(self.client.get('/api/dashboard/overview/', {'resolution': 'month'}).status_code, 400)
@@ -0,0 +1,71 @@
+from datetime import timedelta
+from django.utils import timezone
+from ..models import HealthStatus
+from .base import PetsAPITestCase
+
+
+class StatsTests(PetsAPITestCase):
+    """A compacted daily aggregate counts as the sample_count readings it stands for."""
+
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        self.days = [timezone.localdate(now - timedelta(days=days)).isoformat() for days in (10, 5, 1)]
+        # Three readings compacted into their mean, followed by two raw ones
+        HealthStatus.objects.create(pet=self.pet, attribute_name='Weight', value=4, min_value=3.5, max_value=4.6, sample_count=3, measured_at=now - timedelta(days=10))
+        HealthStatus.objects.create(pet=self.pet, attribute_name='Weight', value=5, measured_at=now - timedelta(days=5))
+        HealthStatus.objects.create(pet=self.pet, attribute_name='Weight', value=6, measured_at=now - timedelta(days=1))
+        HealthStatus.objects.create(pet=self.pet, attribute_name='Mood', mood='Normal', measured_at=now - timedelta(days=1))
+        HealthStatus.objects.create(pet=self.other_pet, attribute_name='Length', value=40, measured_at=now - timedelta(days=40))
+
+    def stats(self, pet, **params):
+        response = self.client.get(f'/api/pets/{pet.id}/stats/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data['attributes']
+
+    def test_weighted_by_sample_count(self):
+        weight = self.stats(self.pet)['Weight']
+        self.assertEqual(set(weight), {'last7', 'last30', 'all'})
+        everything = weight['all']
+        self.assertEqual((everything['count'], everything['min'], everything['max']), (5, 3.5, 6.0))
+        self.assertAlmostEqual(everything['mean'], 4.6)
+        self.assertAlmostEqual(everything['std'], 0.8)
+        self.assertAlmostEqual(everything['trend_per_day'], 14.6 / 66.8)
+        self.assertEqual([day for day, _ in everything['rolling_mean']], self.days)
+        for (_, mean), expected in zip(everything['rolling_mean'], (4, 4.25, 5.5)):
+            self.assertAlmostEqual(mean, expected)
+        self.assertEqual(weight['last30'], everything)
+
+        last7 = weight['last7']
+        self.assertEqual((last7['count'], last7['min'], last7['max']), (2, 5.0, 6.0))
+        self.assertAlmostEqual(last7['mean'], 5.5)
+        self.assertAlmostEqual(last7['std'], 0.5)
+
+    def test_windows_and_attributes(self):
+        attributes = self.stats(self.other_pet, window='last7,last90', rolling_days=3)
+        self.assertEqual(attributes['Length']['last7'], {'count': 0, 'mean': None, 'min': None, 'max': None, 'std': None, 'trend_per_day': None, 'rolling_mean': []})
+        self.assertEqual(attributes['Length']['last90']['count'], 1)
+        # A single reading has no trend
+        self.assertIsNone(attributes['Length']['last90']['trend_per_day'])
+        # Attributes without numeric readings are left out
+        self.assertEqual(set(self.stats(self.pet)), {'Weight'})
+        self.assertEqual(self.stats(self.pet, attribute_name='Length'), {})
+
+    def test_all_pets(self):
+        response = self.client.get('/api/pets/stats/', {'window': 'all'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(pet['pet_id'], set(pet['attributes'])) for pet in response.data], [(self.pet.id, {'Weight'}), (self.other_pet.id, {'Length'})])
+        self.assertEqual(response.data[0]['attributes'], self.stats(self.pet, window='all'))
+
+    def test_invalid_parameters(self):
+        for params, name in [
+            ({'window': 'last365'}, 'window'),
+            ({'rolling_days': 'week'}, 'rolling_days'),
+            ({'rolling_days': 0}, 'rolling_days'),
+            ({'rolling_days': 91}, 'rolling_days'),
+            ({'attribute_name': 'Height'}, 'attribute_name'),
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get(f'/api/pets/{self.pet.id}/stats/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(name, response.data)
@@ -1,7 +1,8 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
-from .views.overview import DashboardOverviewView
-from .views.manage import GoogleLogin, PetViewSet, HealthStatusViewSet, OwnerViewSet, RegisterView, VaccinationViewSet
+from .views.overview import DashboardCacheStatsView, DashboardOverviewView
+from .views.manage import GoogleLogin, PetViewSet, HealthStatusViewSet, HealthAlertViewSet, OwnerViewSet, RegisterView, VaccinationViewSet
 from .views.manage import logout_view
 from .views.health import health_check, ready_check, live_check
 
@@ -10,6 +11,7 @@ router.register(r'pets', PetViewSet)
 router.register(r'health-status', HealthStatusViewSet)
 router.register(r'owners', OwnerViewSet)
 router.register(r'vaccination', VaccinationViewSet)
+router.register(r'health-alerts', HealthAlertViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -17,7 +19,22 @@ urlpatterns = [
     path('logout/', logout_view, name='logout'),
     path('auth/google/', GoogleLogin.as_view(), name='google_login'),
     path('dashboard/overview/', DashboardOverviewView.as_view(), name='dashboard-overview'),
+    path('dashboard/overview/cache-stats/', DashboardCacheStatsView.as_view(), name='dashboard-overview-cache-stats'),
     path('health/', health_check, name='health-check'),
     path('ready/', ready_check, name='ready-check'),
     path('live/', live_check, name='live-check'),
 ]
+
+if settings.ASYNC_VIEWS:
+    from .views.asynchronous import AsyncDashboardOverviewView, AsyncHealthStatusViewSet, AsyncPetViewSet, AsyncVaccinationViewSet
+    from .views.health import async_health_check, async_ready_check
+
+    # Listed first so they take over the same paths and URL names
+    urlpatterns = [
+        path('pets/', AsyncPetViewSet.as_async_view({'get': 'list', 'post': 'create'}), name='pet-list'),
+        path('health-status/', AsyncHealthStatusViewSet.as_async_view({'get': 'list', 'post': 'create'}), name='healthstatus-list'),
+        path('vaccination/', AsyncVaccinationViewSet.as_async_view({'get': 'list', 'post': 'create'}), name='vaccination-list'),
+        path('dashboard/overview/', AsyncDashboardOverviewView.as_async_view(), name='dashboard-overview'),
+        path('health/', async_health_check, name='health-check'),
+        path('ready/', async_ready_check, name='ready-check'),
+    ] + urlpatterns
@@ -0,0 +1,156 @@
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from .. import caching
+from .manage import HealthStatusViewSet, PetViewSet, VaccinationViewSet
+from .overview import DashboardOverviewView, GroupedJSONWriter, STREAM_CHUNK_SIZE, STREAM_FIELDS, group_readings, group_rollups
+
+
+class AsyncViewMixin:
+    """
+    Serve GET requests of a DRF view from coroutines under ASGI, so a worker
+    keeps answering other requests while one waits on the database.
+
+    Authentication, permissions and throttling (`initial`) still run on the
+    request's sync thread; the handler is `aget` for plain views and
+    `a<action>` (e.g. `alist`) for viewsets. Every other method is handed to
+    the regular sync view.
+    """
+
+    @classmethod
+    def as_async_view(cls, actions=None, **initkwargs):
+        sync_view = cls.as_view(**initkwargs) if actions is None else cls.as_view(actions, **initkwargs)
+
+        async def view(request, *args, **kwargs):
+            if request.method != 'GET':
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            if actions is not None:
+                self.action_map = actions
+            return await self.adispatch(request, *args, **kwargs)
+
+        # Same attributes as DRF's as_view(), e.g. for the metrics view label
+        view.cls = cls
+        view.initkwargs = initkwargs
+        view.actions = actions
+        view.csrf_exempt = True
+        return view
+
+    async def adispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = self.aget if getattr(self, 'action_map', None) is None else getattr(self, f'a{self.action}')
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncListModelMixin(AsyncViewMixin):
+    """ListModelMixin.list on the async ORM, with the same pagination and output."""
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
+
+    async def apaginate_queryset(self, queryset):
+        paginator = self.paginator
+        if paginator is None:
+            return None
+        if not isinstance(paginator, PageNumberPagination):
+            # Cursor pages are a single keyset query, not worth reimplementing
+            return await sync_to_async(paginator.paginate_queryset)(queryset, self.request, view=self)
+
+        # PageNumberPagination.paginate_queryset, with the COUNT and the page
+        # fetched through the async ORM
+        paginator.request = self.request
+        page_size = paginator.get_page_size(self.request)
+        if not page_size:
+            return None
+
+        django_paginator = paginator.django_paginator_class(queryset, page_size)
+        django_paginator.count = await queryset.acount()
+        page_number = paginator.get_page_number(self.request, django_paginator)
+        try:
+            paginator.page = django_paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = paginator.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+        paginator.page.object_list = [obj async for obj in paginator.page.object_list]
+
+        if django_paginator.num_pages > 1 and paginator.template is not None:
+            paginator.display_page_controls = True
+        return paginator.page.object_list
+
+
+class AsyncPetViewSet(AsyncListModelMixin, PetViewSet):
+    pass
+
+
+class AsyncHealthStatusViewSet(AsyncListModelMixin, HealthStatusViewSet):
+    pass
+
+
+class AsyncVaccinationViewSet(AsyncListModelMixin, VaccinationViewSet):
+    pass
+
+
+class AsyncDashboardOverviewView(AsyncViewMixin, DashboardOverviewView):
+    """DashboardOverviewView with the readings read and streamed through the async ORM."""
+
+    async def aget(self, request, *args, **kwargs):
+        filter_option, resolution, stream, error = self.get_options(request)
+        if error is not None:
+            return error
+
+        if not stream:
+            cached = await sync_to_async(caching.get_overview)(request.user.id, filter_option, resolution)
+            if cached is not None:
+                return Response(cached)
+
+        if resolution is not None:
+            rows = self.get_rollup_rows(request.user, resolution, filter_option)
+            data = group_rollups([row async for row in rows])
+            await sync_to_async(caching.set_overview)(request.user.id, filter_option, resolution, data)
+            return Response(data)
+
+        queryset = self.get_readings(request.user, filter_option)
+
+        if stream:
+            return StreamingHttpResponse(self.astream_grouped_data(queryset), content_type='application/json')
+
+        grouped_data = group_readings([row async for row in queryset.values_list(*STREAM_FIELDS)])
+
+        await sync_to_async(caching.set_overview)(request.user.id, filter_option, None, grouped_data)
+        return Response(grouped_data)
+
+    async def astream_grouped_data(self, queryset):
+        # Django 4.2's aiterator() runs a values_list() query in the event loop,
+        # so the chunks of the sync server-side cursor are fetched on the sync thread
+        rows = self.get_stream_rows(queryset).iterator(chunk_size=STREAM_CHUNK_SIZE)
+        fetch_chunk = sync_to_async(lambda: list(islice(rows, STREAM_CHUNK_SIZE)))
+        writer = GroupedJSONWriter()
+        while chunk := await fetch_chunk():
+            for row in chunk:
+                writer.add(row)
+            yield writer.flush()
+        yield writer.close()
@@ -1,44 +1,33 @@
-from django.http import JsonResponse
-from django.db import connection
-from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 import redis
 from django.conf import settings
 import os
+from prometheus_client import CONTENT_TYPE_LATEST
+from .. import metrics as prometheus_metrics
+from .. import probes
 
 
-@csrf_exempt
-@require_http_methods(["GET"])
-def health_check(request):
-    """
-    Health check endpoint for load balancer and monitoring
-    """
-    try:
-        # Check database connectivity
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-        
-        db_status = "healthy"
-    except Exception as e:
-        db_status = f"unhealthy: {str(e)}"
-    
-    # Check cache (Redis) connectivity
-    try:
-        cache.set('health_check', 'ok', 30)
-        cache_result = cache.get('health_check')
-        cache_status = "healthy" if cache_result == 'ok' else "unhealthy"
-    except Exception as e:
-        cache_status = f"unhealthy: {str(e)}"
-    
-    # Overall health status
-    overall_status = "healthy" if db_status == "healthy" and cache_status == "healthy" else "unhealthy"
-    
+def health_response(snapshot):
+    if snapshot is None:
+        return JsonResponse({"status": "starting"}, status=503)
+
+    checks = snapshot['checks']
+    overall_status = "healthy" if probes.passing(snapshot, probes.HEALTH_CHECKS) else "unhealthy"
+
+    def describe(name):
+        check = checks[name]
+        return check['status'] if check['status'] == "healthy" else f"unhealthy: {check['error']}"
+
     health_data = {
         "status": overall_status,
-        "database": db_status,
-        "cache": cache_status,
+        "database": describe('database'),
+        "cache": describe('cache'),
+        "media_storage": describe('media_storage'),
+        "checks": checks,
+        "checked_at": snapshot['checked_at'],
+        "stale": snapshot['stale'],
         "version": "1.0.0",
         "environment": os.getenv('DJANGO_SETTINGS_MODULE', 'unknown'),
     }
@@ -47,21 +36,59 @@ def health_check(request):
     return JsonResponse(health_data, status=status_code)
 
 
+def ready_response(snapshot):
+    if snapshot is None:
+        return JsonResponse({"status": "not ready", "error": "probes have not completed yet"}, status=503)
+
+    if probes.passing(snapshot, probes.READY_CHECKS):
+        return JsonResponse({"status": "ready", "checked_at": snapshot['checked_at']}, status=200)
+
+    errors = {
+        name: snapshot['checks'][name].get('error')
+        for name in probes.READY_CHECKS if snapshot['checks'][name]['status'] != "healthy"
+    }
+    if snapshot['stale']:
+        errors['probes'] = f"last probe round was {snapshot['age_seconds']}s ago"
+    return JsonResponse({"status": "not ready", "error": errors, "checked_at": snapshot['checked_at']}, status=503)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def health_check(request):
+    """
+    Health check endpoint for load balancer and monitoring.
+    Answers from the latest background probe round, see pets/probes.py
+    """
+    return health_response(probes.latest_snapshot())
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def ready_check(request):
     """
-    Readiness check endpoint
+    Readiness check endpoint: the database is reachable and fully migrated
+    """
+    return ready_response(probes.latest_snapshot())
+
+
+# Django 4.2's csrf_exempt and require_http_methods only wrap sync views,
+# so the async variants check the method themselves (GET is never CSRF-checked)
+async def async_health_check(request):
+    """
+    health_check for ASGI workers
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    return health_response(await probes.alatest_snapshot())
+
+
+async def async_ready_check(request):
+    """
+    ready_check for ASGI workers
     """
-    try:
-        # Check if we can perform basic operations
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT COUNT(*) FROM django_migrations")
-            cursor.fetchone()
-        
-        return JsonResponse({"status": "ready"}, status=200)
-    except Exception as e:
-        return JsonResponse({"status": "not ready", "error": str(e)}, status=503)
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    return ready_response(await probes.alatest_snapshot())
 
 
 @csrf_exempt
@@ -70,4 +97,13 @@ def live_check(request):
     """
     Liveness check endpoint
     """
-    return JsonResponse({"status": "alive"}, status=200) 
\ No newline at end of file
+    return JsonResponse({"status": "alive"}, status=200) 
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def metrics(request):
+    """
+    Prometheus metrics, added up across all worker processes
+    """
+    return HttpResponse(prometheus_metrics.render(), content_type=CONTENT_TYPE_LATEST)
@@ -5,21 +5,42 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, action
-from ..models import Pet, HealthStatus, Owner, Vaccination
-from ..serializers.manage import PetSerializer, HealthStatusSerializer, OwnerSerializer, RegisterSerializer, VaccinationSerializer
-from google.auth.transport import requests
-from google.oauth2 import id_token
+from rest_framework.exceptions import ValidationError
+from ..models import Pet, HealthStatus, HealthAlert, Owner, Vaccination
+from ..serializers.manage import PetSerializer, HealthStatusSerializer, HealthStatusBatchItemSerializer, HealthAlertSerializer, OwnerSerializer, RegisterSerializer, VaccinationSerializer
 from django.contrib.auth.models import User
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import IsAuthenticated
-from django.http import FileResponse
-import os
+from django.shortcuts import get_object_or_404
 from django.core.exceptions import PermissionDenied
 from django.utils import timezone
-from ..pagination.manage import VaccinationPagination, HealthStatusPagination  # Import the custom pagination
+from django.db import transaction
+from django.db.models import Prefetch
+from drf_spectacular.utils import extend_schema
+from django.conf import settings
+from ..pagination.manage import CursorPaginationMixin, VaccinationPagination, VaccinationCursorPagination, HealthStatusPagination, HealthStatusCursorPagination  # Import the custom pagination
+from .. import caching, export, google_auth, reminders, rollups, stats
+from ..images import pick_variant
+from ..media import serve_media
+from ..streaming import streaming_response
+from ..tasks import process_pet_avatar, process_tag_proof
+from ..filters.manage import END_PARAMS, START_PARAMS, HealthStatusFilter, HealthStatusOrderingFilter, parse_attribute_names, parse_bound
 
 
-class VaccinationViewSet(viewsets.ModelViewSet):
+def get_image_size(request):
+    # ?size= picks the smallest thumbnail at least that large; the full image by default
+    size = request.query_params.get('size')
+    if size is None:
+        return float('inf')
+    try:
+        size = int(size)
+    except ValueError:
+        raise ValidationError({'size': 'Must be a positive integer.'})
+    if size < 1:
+        raise ValidationError({'size': 'Must be a positive integer.'})
+    return size
+
+class VaccinationViewSet(CursorPaginationMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows users to view, create, update or delete vaccinations.
     """
@@ -27,12 +48,17 @@ class VaccinationViewSet(viewsets.ModelViewSet):
     queryset = Vaccination.objects.all()
     serializer_class = VaccinationSerializer
     pagination_class = VaccinationPagination
+    cursor_pagination_class = VaccinationCursorPagination
+    max_upcoming_days = 365  # Upper bound for ?days= of /upcoming/
 
     def get_queryset(self):
         queryset = Vaccination.objects.filter(pet__owner=self.request.user)
         pet_id = self.request.query_params.get('pet', None)
         if pet_id is not None:
             queryset = queryset.filter(pet=pet_id)
+        if self.action == 'list' and self.use_cursor_pagination():
+            # Vaccinations without any date have no position in a schedule-ordered cursor
+            queryset = queryset.filter(schedule_at__isnull=False)
         return queryset
 
     def get_object(self):
@@ -41,6 +67,58 @@ class VaccinationViewSet(viewsets.ModelViewSet):
         except Vaccination.DoesNotExist:
             return None
 
+    def perform_create(self, serializer):
+        self.save_with_tag_proof(serializer)
+
+    def perform_update(self, serializer):
+        changes = {}
+        schedule_at = serializer.validated_data.get('schedule_at', serializer.instance.schedule_at)
+        if schedule_at != serializer.instance.schedule_at:
+            # A new date gets its own reminder, and is no longer overdue unless it is in the past too
+            changes['reminder_sent_at'] = None
+            if (serializer.instance.vaccination_status == 'Overdue' and 'vaccination_status' not in serializer.validated_data
+                    and schedule_at is not None and schedule_at >= timezone.localdate()):
+                changes['vaccination_status'] = 'Pending'
+        self.save_with_tag_proof(serializer, **changes)
+
+    def save_with_tag_proof(self, serializer, **kwargs):
+        # New uploads are re-encoded and thumbnailed in the background
+        vaccination = serializer.save(**kwargs)
+        if serializer.validated_data.get('tag_proof'):
+            transaction.on_commit(lambda: process_tag_proof.delay(vaccination.pk))
+
+    @action(detail=False, methods=['get'])
+    def upcoming(self, request):
+        """
+        Pending and overdue vaccinations due within ?days= (default:
+        VACCINATION_REMINDER_DAYS), overdue ones first, paginated like the list.
+        """
+        days = request.query_params.get('days', settings.VACCINATION_REMINDER_DAYS)
+        try:
+            days = int(days)
+        except (TypeError, ValueError):
+            raise ValidationError({'days': 'Must be a non-negative integer.'})
+        if not 0 <= days <= self.max_upcoming_days:
+            raise ValidationError({'days': f'Must be between 0 and {self.max_upcoming_days}.'})
+
+        queryset = reminders.upcoming(self.get_queryset(), days)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    @action(detail=True, methods=['get'], url_path='tag-proof')
+    def get_tag_proof(self, request, pk=None):
+        vaccination = get_object_or_404(self.get_queryset(), pk=pk)
+        if not vaccination.tag_proof:
+            return Response({"error": "Tag proof not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        name = pick_variant(vaccination.tag_proof.name, vaccination.tag_proof_variants, get_image_size(request))
+        response = serve_media(request, name, storage=vaccination.tag_proof.storage)
+        if response is None:
+            return Response({"error": "Tag proof file does not exist."}, status=status.HTTP_404_NOT_FOUND)
+        return response
+
     # def get_serializer_context(self):
     #     return {'pet_pk': self.kwargs['pet']}
 
@@ -48,10 +126,36 @@ class PetViewSet(viewsets.ModelViewSet):
     queryset = Pet.objects.all()
     serializer_class = PetSerializer
     permission_classes = [IsAuthenticated, IsOwner]
+    max_health_limit = 100  # Upper bound for ?health_limit=
+    max_rolling_days = 90  # Upper bound for ?rolling_days= of /stats/
 
     def get_queryset(self):
         # Only return the pets that belong to the logged-in user (owner)
-        return Pet.objects.filter(owner=self.request.user)
+        queryset = Pet.objects.filter(owner=self.request.user)
+        if self.action in ('list', 'retrieve'):
+            # with their latest health readings fetched in one extra query; other actions
+            # either serialize no pet or a single one, which PetSerializer looks up itself
+            recent_health = HealthStatus.latest_per_attribute(self.get_health_limit())
+            queryset = queryset.prefetch_related(
+                Prefetch('health_attributes', queryset=recent_health, to_attr='recent_health_attributes')
+            )
+        return queryset
+
+    def get_health_limit(self):
+        # Number of latest readings per attribute to nest in each pet (default: 1)
+        limit = self.request.query_params.get('health_limit', 1)
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValidationError({'health_limit': 'Must be a positive integer.'})
+        if limit < 1:
+            raise ValidationError({'health_limit': 'Must be a positive integer.'})
+        return min(limit, self.max_health_limit)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['health_limit'] = self.get_health_limit()
+        return context
 
     def create(self, request, *args, **kwargs):
         # Log request data for debugging
@@ -69,7 +173,16 @@ class PetViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         # Automatically assign the logged-in user as the owner of the pet
-        serializer.save(owner=self.request.user)
+        self.save_with_avatar(serializer, owner=self.request.user)
+
+    def perform_update(self, serializer):
+        self.save_with_avatar(serializer)
+
+    def save_with_avatar(self, serializer, **kwargs):
+        # New avatars are re-encoded and thumbnailed in the background
+        pet = serializer.save(**kwargs)
+        if serializer.validated_data.get('avatar'):
+            transaction.on_commit(lambda: process_pet_avatar.delay(pet.pk))
 
     def get_object(self):
         pet = super().get_object()
@@ -83,17 +196,95 @@ class PetViewSet(viewsets.ModelViewSet):
         if not pet.avatar:
             return Response({"error": "Avatar not found."}, status=status.HTTP_404_NOT_FOUND)
         
-        avatar_path = pet.avatar.path
-        if os.path.exists(avatar_path):
-            return FileResponse(open(avatar_path, 'rb'), content_type='image/jpeg')
-        else:
+        name = pick_variant(pet.avatar.name, pet.avatar_variants, get_image_size(request))
+        response = serve_media(request, name, storage=pet.avatar.storage)
+        if response is None:
             return Response({"error": "Avatar file does not exist."}, status=status.HTTP_404_NOT_FOUND)
+        return response
+
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """
+        Per numeric attribute and window (?window=last7,last30,last90,all):
+        count, mean, min/max, standard deviation, trend per day and the
+        ?rolling_days= rolling mean. Optionally limited with ?attribute_name=.
+        """
+        pet = self.get_object()
+        results = stats.compute([pet.id], **self.get_stats_options())
+        return Response({'pet_id': pet.id, 'pet_name': pet.name, 'attributes': results[pet.id]})
+
+    @extend_schema(operation_id='api_pets_stats_all')
+    @action(detail=False, methods=['get'], url_path='stats')
+    def all_stats(self, request):
+        """The stats of every pet of the user, computed in one pass."""
+        pets = list(Pet.objects.filter(owner=request.user).order_by('id').values_list('id', 'name'))
+        results = stats.compute([pet_id for pet_id, _ in pets], **self.get_stats_options())
+        return Response([
+            {'pet_id': pet_id, 'pet_name': name, 'attributes': results[pet_id]}
+            for pet_id, name in pets
+        ])
+
+    def get_stats_options(self):
+        params = self.request.query_params
+        windows = [window for value in params.getlist('window') for window in value.split(',') if window]
+        if any(window not in stats.STATS_WINDOWS for window in windows):
+            raise ValidationError({'window': f"Must be one of: {', '.join(stats.STATS_WINDOWS)}"})
+
+        rolling_days = params.get('rolling_days', stats.DEFAULT_ROLLING_DAYS)
+        try:
+            rolling_days = int(rolling_days)
+        except (TypeError, ValueError):
+            raise ValidationError({'rolling_days': 'Must be a positive integer.'})
+        if not 1 <= rolling_days <= self.max_rolling_days:
+            raise ValidationError({'rolling_days': f'Must be between 1 and {self.max_rolling_days}.'})
+
+        return {
+            'attribute_names': parse_attribute_names(params),
+            'windows': list(dict.fromkeys(windows)) or stats.DEFAULT_WINDOWS,
+            'rolling_days': rolling_days,
+        }
 
-class HealthStatusViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'], url_path='export')
+    def export(self, request, pk=None):
+        """
+        Stream the pet's full health and vaccination history as CSV or NDJSON
+        (?output=csv|ndjson), optionally limited with ?start=, ?end=,
+        ?attribute= (or the list's ?measured_after=, ?measured_before=,
+        ?attribute_name=) and ?include=health,vaccination.
+        """
+        pet = self.get_object()
+        params = request.query_params
+
+        output = params.get('output', 'csv')
+        if output not in export.EXPORT_FORMATS:
+            raise ValidationError({'output': f"Must be one of: {', '.join(export.EXPORT_FORMATS)}"})
+        record_types = [value for value in params.get('include', ','.join(export.EXPORT_RECORD_TYPES)).split(',') if value]
+        if not record_types or any(value not in export.EXPORT_RECORD_TYPES for value in record_types):
+            raise ValidationError({'include': f"Must be a comma-separated list of: {', '.join(export.EXPORT_RECORD_TYPES)}"})
+
+        rows = export.export_rows(
+            pet,
+            start=parse_bound(params, START_PARAMS),
+            end=parse_bound(params, END_PARAMS, end=True),
+            attributes=parse_attribute_names(params),
+            record_types=record_types,
+        )
+
+        if output == 'csv':
+            response = streaming_response(request, export.stream_csv(rows), content_type='text/csv')
+        else:
+            response = streaming_response(request, export.stream_ndjson(rows), content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="pet-{pet.id}-history.{output}"'
+        return response
+
+class HealthStatusViewSet(CursorPaginationMixin, viewsets.ModelViewSet):
     queryset = HealthStatus.objects.all()
     serializer_class = HealthStatusSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = HealthStatusPagination
+    cursor_pagination_class = HealthStatusCursorPagination
+    filter_backends = [HealthStatusFilter, HealthStatusOrderingFilter]
+    max_batch_size = 1000  # Readings accepted by a single batch request
 
     def get_queryset(self):
         queryset = HealthStatus.objects.filter(pet__owner=self.request.user)
@@ -113,6 +304,83 @@ class HealthStatusViewSet(viewsets.ModelViewSet):
 
         serializer.save()
 
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch(self, request):
+        """
+        Create many readings at once. Accepts a list of readings (or
+        {"readings": [...]}); invalid items are reported by index and the
+        valid ones are still created.
+        """
+        items = request.data.get('readings') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({"error": "Expected a non-empty list of readings."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.max_batch_size:
+            return Response({"error": f"A batch may contain at most {self.max_batch_size} readings."}, status=status.HTTP_400_BAD_REQUEST)
+
+        errors = {}
+        valid = {}
+        for index, item in enumerate(items):
+            serializer = HealthStatusBatchItemSerializer(data=item)
+            if serializer.is_valid():
+                valid[index] = serializer.validated_data
+            else:
+                errors[index] = serializer.errors
+
+        # One ownership check for every pet referenced in the batch
+        pet_ids = {data['pet'] for data in valid.values()}
+        owned_pet_ids = set(Pet.objects.filter(owner=request.user, pk__in=pet_ids).values_list('pk', flat=True))
+
+        readings = []
+        for index, data in valid.items():
+            if data['pet'] not in owned_pet_ids:
+                errors[index] = {'pet': ["You do not have permission to add health data for this pet."]}
+                continue
+            fields = dict(data)
+            reading = HealthStatus(pet_id=fields.pop('pet'), **fields)
+            if reading.measured_at is None:
+                reading.measured_at = timezone.now()
+            reading.apply_default_unit()
+            readings.append(reading)
+
+        if readings:
+            with transaction.atomic():
+                HealthStatus.objects.bulk_create(readings)
+                # bulk_create skips the signals that keep rollups and caches current
+                rollups.refresh_readings((r.pet_id, r.attribute_name, r.measured_at) for r in readings)
+            caching.invalidate_overview(request.user.id)
+
+        if not errors:
+            response_status = status.HTTP_201_CREATED
+        elif readings:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+
+        return Response({
+            'created': HealthStatusSerializer(readings, many=True).data,
+            'errors': [{'index': index, 'errors': errors[index]} for index in sorted(errors)],
+        }, status=response_status)
+
+class HealthAlertViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Readings flagged by the anomaly detection job (see pets/anomalies.py),
+    newest first, optionally limited with ?pet= and ?attribute_name=.
+    """
+    queryset = HealthAlert.objects.all()
+    serializer_class = HealthAlertSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = HealthStatusPagination
+
+    def get_queryset(self):
+        queryset = HealthAlert.objects.filter(pet__owner=self.request.user)
+        pet_id = self.request.query_params.get('pet', None)
+        if pet_id is not None:
+            queryset = queryset.filter(pet=pet_id)
+        attribute_names = parse_attribute_names(self.request.query_params)
+        if attribute_names:
+            queryset = queryset.filter(attribute_name__in=attribute_names)
+        return queryset.order_by('-measured_at', '-id')
+
 class OwnerViewSet(viewsets.ModelViewSet):
     queryset = Owner.objects.all()
     serializer_class = OwnerSerializer
@@ -133,8 +401,8 @@ class GoogleLogin(APIView):
     def post(self, request):
         token = request.data.get('token')
         try:
-            # Verify the token using Google's API
-            idinfo = id_token.verify_oauth2_token(token, requests.Request(), "150416007830-pr16pii17ta44b6netma2qah4fp8rt1q.apps.googleusercontent.com")
+            # Verify the token locally against Google's cached signing certificates
+            idinfo = google_auth.get_verifier().verify(token)
             
             if 'email' not in idinfo:
                 return Response({'error': 'Email not provided'}, status=400)
@@ -149,6 +417,8 @@ class GoogleLogin(APIView):
             })
         except ValueError:
             return Response({'error': 'Invalid token'}, status=400)
+        except google_auth.CertificatesUnavailable:
+            return Response({'error': 'Could not verify token, please try again'}, status=503)
 
 @api_view(['POST'])
 def logout_view(request):
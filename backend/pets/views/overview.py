@@ -1,9 +1,105 @@
+import json
 from django.utils.timezone import now, timedelta
 from rest_framework import generics
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import status as http_status
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-from ..models import Pet, HealthStatus
+from rest_framework.utils.encoders import JSONEncoder
+from ..models import Pet, HealthStatus, HealthStatusRollup
+from .. import caching
+from ..rollups import RESOLUTIONS, bucket_start
 from ..serializers.overview import HealthStatusOverviewSerializer
+from ..streaming import streaming_response
+
+FILTER_DAYS = {'last7': 7, 'last30': 30}
+STREAM_CHUNK_SIZE = 2000  # Rows fetched per round trip of the server-side cursor
+
+
+def _dumps(value):
+    # Match the compact, unicode output of DRF's JSONRenderer
+    return json.dumps(value, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':'))
+
+class GroupedJSONWriter:
+    """
+    Incrementally write the grouped overview document from rows of
+    STREAM_FIELDS ordered by pet and attribute, so it can be streamed.
+    """
+    def __init__(self):
+        self.buffer = ['{']
+        self.current_pet = self.current_attribute = None
+
+    def add(self, row):
+        status_id, pet_id, pet_name, attribute_name, value, created_at, measured_at = row
+        if pet_id != self.current_pet:
+            if self.current_pet is not None:
+                self.buffer.append(']},')
+            self.buffer.append(f'{_dumps(str(pet_id))}:{{"pet_name":{_dumps(pet_name)}')
+            self.current_pet, self.current_attribute = pet_id, None
+
+        if attribute_name != self.current_attribute:
+            if self.current_attribute is not None:
+                self.buffer.append(']')
+            self.buffer.append(f',{_dumps(attribute_name)}:[')
+            self.current_attribute = attribute_name
+        else:
+            self.buffer.append(',')
+
+        self.buffer.append(_dumps({
+            'id': status_id,
+            'value': value,
+            'created_at': created_at,
+            'measured_at': measured_at,
+        }))
+
+    def flush(self):
+        chunk = ''.join(self.buffer)
+        self.buffer = []
+        return chunk
+
+    def close(self):
+        if self.current_pet is not None:
+            self.buffer.append(']}')
+        self.buffer.append('}')
+        return self.flush()
+
+
+STREAM_FIELDS = ('id', 'pet_id', 'pet__name', 'attribute_name', 'value', 'created_at', 'measured_at')
+ROLLUP_FIELDS = (
+    'pet_id', 'pet__name', 'attribute_name', 'bucket_start', 'count',
+    'min_value', 'max_value', 'mean_value', 'last_value', 'last_measured_at',
+)
+
+
+def group_readings(rows):
+    """Group rows of STREAM_FIELDS by pet and attribute name, keeping their order."""
+    grouped_data = {}
+    for status_id, pet_id, pet_name, attribute_name, value, created_at, measured_at in rows:
+        pet_data = grouped_data.setdefault(pet_id, {"pet_name": pet_name})
+        pet_data.setdefault(attribute_name, []).append({
+            'id': status_id,
+            'value': value,
+            'created_at': created_at,
+            'measured_at': measured_at,
+        })
+    return grouped_data
+
+
+def group_rollups(rows):
+    """Group rows of ROLLUP_FIELDS by pet and attribute name, one entry per bucket."""
+    grouped_data = {}
+    for pet_id, pet_name, attribute_name, start, count, min_value, max_value, mean_value, last_value, last_measured_at in rows:
+        pet_data = grouped_data.setdefault(pet_id, {"pet_name": pet_name})
+        pet_data.setdefault(attribute_name, []).append({
+            'bucket_start': start,
+            'count': count,
+            'min': min_value,
+            'max': max_value,
+            'mean': mean_value,
+            'last_value': last_value,
+            'last_measured_at': last_measured_at,
+        })
+    return grouped_data
+
 
 class DashboardOverviewView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
@@ -11,36 +107,98 @@ class DashboardOverviewView(generics.GenericAPIView):
     def get_queryset(self, user):
         return HealthStatus.objects.filter(pet__owner=user)
 
-    def get(self, request, *args, **kwargs):
+    def get_rollup_queryset(self, user, resolution):
+        return HealthStatusRollup.objects.filter(pet__owner=user, resolution=resolution)
+
+    def get_options(self, request):
+        """
+        Return (filter_option, resolution, stream, error_response) from the
+        query parameters; error_response is set when they are invalid.
+        """
         # Get the filter option from the query parameters
         filter_option = request.query_params.get('filter', 'all')  # default to 'all'
-        
+        resolution = request.query_params.get('resolution')
+        stream = request.query_params.get('stream', '').lower() in ('1', 'true', 'yes')
+
+        if resolution is not None and resolution not in RESOLUTIONS:
+            return filter_option, resolution, stream, Response(
+                {"error": f"Resolution must be one of: {', '.join(RESOLUTIONS)}"},
+                status=http_status.HTTP_400_BAD_REQUEST,
+            )
+        return filter_option, resolution, stream, None
+
+    def get_readings(self, user, filter_option):
         # Fetch health status of user's pets
-        queryset = self.get_queryset(request.user).order_by("measured_at")
-
-        if filter_option == 'last7':
-            queryset = queryset.filter(created_at__gte=now() - timedelta(days=7))
-        elif filter_option == 'last30':
-            queryset = queryset.filter(created_at__gte=now() - timedelta(days=30))
-
-        grouped_data = {}
-        
-        # Group by pet and attribute_name
-        for status in queryset:
-            pet_id = status.pet.id
-            if pet_id not in grouped_data:
-                grouped_data[pet_id] = {"pet_name": status.pet.name}
-            
-            if status.attribute_name not in grouped_data[pet_id]:
-                grouped_data[pet_id][status.attribute_name] = []
-
-            grouped_data[pet_id][status.attribute_name].append({
-                'id': status.id,
-                'value': status.value,
-                'created_at': status.created_at,
-                'measured_at': status.measured_at,
-
-            })
+        queryset = self.get_queryset(user).order_by("measured_at")
+
+        # Windows on measured_at, like the rollups, so only the recent partitions are read
+        if filter_option in FILTER_DAYS:
+            queryset = queryset.filter(measured_at__gte=now() - timedelta(days=FILTER_DAYS[filter_option]))
+        return queryset
+
+    def get_stream_rows(self, queryset):
+        return queryset.order_by('pet_id', 'attribute_name', 'measured_at', 'id').values_list(*STREAM_FIELDS)
+
+    def get(self, request, *args, **kwargs):
+        filter_option, resolution, stream, error = self.get_options(request)
+        if error is not None:
+            return error
+
+        if not stream:
+            cached = caching.get_overview(request.user.id, filter_option, resolution)
+            if cached is not None:
+                return Response(cached)
+
+        if resolution is not None:
+            data = self.get_rollup_data(request.user, resolution, filter_option)
+            caching.set_overview(request.user.id, filter_option, resolution, data)
+            return Response(data)
+
+        queryset = self.get_readings(request.user, filter_option)
 
+        if stream:
+            return streaming_response(request, self.stream_grouped_data(queryset), content_type='application/json')
+
+        # Group by pet and attribute_name; the pet name comes along in the same query
+        grouped_data = group_readings(queryset.values_list(*STREAM_FIELDS))
+
+        caching.set_overview(request.user.id, filter_option, None, grouped_data)
         return Response(grouped_data)
 
+    def stream_grouped_data(self, queryset):
+        """
+        Yield the same JSON document as the grouped response, one pet and
+        attribute at a time, walking the readings with a server-side cursor
+        so memory stays flat regardless of how much history there is.
+        """
+        writer = GroupedJSONWriter()
+        for row in self.get_stream_rows(queryset).iterator(chunk_size=STREAM_CHUNK_SIZE):
+            writer.add(row)
+            if len(writer.buffer) >= STREAM_CHUNK_SIZE:
+                yield writer.flush()
+        yield writer.close()
+
+    def get_rollup_rows(self, user, resolution, filter_option):
+        queryset = self.get_rollup_queryset(user, resolution).order_by('bucket_start')
+
+        if filter_option in FILTER_DAYS:
+            since = now() - timedelta(days=FILTER_DAYS[filter_option])
+            queryset = queryset.filter(bucket_start__gte=bucket_start(resolution, since))
+        return queryset.values_list(*ROLLUP_FIELDS)
+
+    def get_rollup_data(self, user, resolution, filter_option):
+        """
+        Same grouping as the raw view, but one entry per hour/day/week bucket
+        read from the pre-aggregated rollups instead of one per reading.
+        """
+        return group_rollups(self.get_rollup_rows(user, resolution, filter_option))
+
+
+class DashboardCacheStatsView(generics.GenericAPIView):
+    """
+    Hit/miss counters of the dashboard overview cache, shared by all workers.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(caching.overview_stats())
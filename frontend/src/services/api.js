@@ -10,8 +10,15 @@ export const updatePet = (id, updatedPet) => axiosInstance.patch(`/api/pets/${id
 export const deletePet = (id) => axiosInstance.delete(`/api/pets/${id}/`);
 
 // Health Status API functions
-export const fetchHealthStatus = (petId, page = 1, pageSize = 10) => 
-    axiosInstance.get(`/api/health-status/?pet=${petId}&page=${page}&page_size=${pageSize}`);
+// filters: { attribute_name: ['Weight', ...], measured_after, measured_before, value_min, value_max, ordering }
+export const fetchHealthStatus = (petId, page = 1, pageSize = 10, filters = {}) => {
+    const params = new URLSearchParams({ pet: petId, page, page_size: pageSize });
+    Object.entries(filters).forEach(([key, value]) => {
+        if (value === undefined || value === null || value === '') return;
+        (Array.isArray(value) ? value : [value]).forEach((item) => params.append(key, item));
+    });
+    return axiosInstance.get(`/api/health-status/?${params.toString()}`);
+};
 export const createHealthStatus = (healthData) => axiosInstance.post('/api/health-status/', healthData);
 export const updateHealthStatus = (id, healthData) => axiosInstance.patch(`/api/health-status/${id}/`, healthData);
 export const deleteHealthStatus = (id) => axiosInstance.delete(`/api/health-status/${id}/`);